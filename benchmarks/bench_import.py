@@ -0,0 +1,75 @@
+"""
+Measures how long it takes to import Orquestra's entry points.
+
+Each import runs in a fresh interpreter, so nothing is cached in
+`sys.modules`. The interpreter's own start-up time is measured separately
+and subtracted. Also reports whether a provider SDK was pulled in.
+
+Usage:
+    python -m benchmarks.bench_import [--repeat N]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+MODULES = (
+    "orquestra",
+    "orquestra.core",
+    "orquestra.parsers",
+    "orquestra.cli.main",
+)
+HEAVY_MODULES = ("openai", "anthropic", "httpx")
+
+_PROBE = (
+    "import sys; import {module}; "
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def _best_run(code: str, repeat: int) -> tuple:
+    best = float("inf")
+    output = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        best = min(best, time.perf_counter() - start)
+        output = result.stdout.strip()
+    return best, output
+
+
+def run_benchmark(repeat: int = 5) -> Dict[str, Any]:
+    """
+    Times importing each module in a fresh interpreter.
+
+    Returns:
+        The best import time in milliseconds for each module, net of
+        interpreter start-up, and the heavy modules each one loaded.
+    """
+    baseline, _ = _best_run("pass", repeat)
+    results: Dict[str, Any] = {"interpreter_ms": baseline * 1e3, "modules": {}}
+    for module in MODULES:
+        elapsed, loaded = _best_run(
+            _PROBE.format(module=module, heavy=HEAVY_MODULES), repeat
+        )
+        results["modules"][module] = {
+            "import_ms": max(0.0, elapsed - baseline) * 1e3,
+            "heavy_modules": loaded.split(",") if loaded else [],
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Measures planning cost for synthetic DAG shapes of up to 100k tasks.
+
+Each shape is timed for `TaskGraph` construction, `resolve_task_order`
+and a full `DataflowScheduler` drain. Results are printed as JSON and can be
+written to a file for tracking across versions.
+
+Usage:
+    python -m benchmarks.bench_scheduler [--sizes 1000 10000 100000]
+                                         [--output results.json]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from orquestra.core.scheduler import DataflowScheduler, TaskGraph, resolve_task_order
+from orquestra.models import Task
+
+SHAPES = ("wide", "deep", "random")
+
+
+def _task(name: str, deps: List[str]) -> Task:
+    # model_construct skips validation: we are timing the scheduler, not pydantic
+    return Task.model_construct(
+        name=name, agent="bench", instruction="bench", depends_on=deps
+    )
+
+
+def make_tasks(shape: str, size: int, seed: int = 0) -> List[Task]:
+    """
+    Builds a synthetic workflow.
+
+    "wide" has no dependencies, "deep" is a single chain and "random" gives
+    each task up to three dependencies on earlier tasks.
+    """
+    names = [f"task_{i:06d}" for i in range(size)]
+    if shape == "wide":
+        return [_task(name, []) for name in names]
+    if shape == "deep":
+        return [_task(names[0], [])] + [
+            _task(names[i], [names[i - 1]]) for i in range(1, size)
+        ]
+    if shape == "random":
+        rng = random.Random(seed)
+        tasks = []
+        for i, name in enumerate(names):
+            k = min(i, rng.randint(0, 3))
+            tasks.append(_task(name, [names[j] for j in rng.sample(range(i), k)]))
+        rng.shuffle(tasks)
+        return tasks
+    raise ValueError(f"Unknown shape '{shape}'.")
+
+
+def _drain(tasks: List[Task]) -> None:
+    scheduler = DataflowScheduler(tasks)
+    while not scheduler.is_finished():
+        for task in scheduler.get_ready():
+            scheduler.mark_complete(task.name)
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes: List[int], repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Times planning for every shape and size.
+
+    Returns:
+        One record per (shape, size) with the best time of `repeat` runs, in
+        seconds, for each phase.
+    """
+    results = []
+    for shape in SHAPES:
+        for size in sizes:
+            tasks = make_tasks(shape, size)
+            results.append(
+                {
+                    "shape": shape,
+                    "size": size,
+                    "graph_s": _time(lambda: TaskGraph(tasks), repeat),
+                    "resolve_task_order_s": _time(
+                        lambda: resolve_task_order(tasks), repeat
+                    ),
+                    "dataflow_drain_s": _time(lambda: _drain(tasks), repeat),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Optional path to write the JSON results.")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.repeat)
+    payload = json.dumps(results, indent=2)
+    print(payload)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+
+
+if __name__ == "__main__":
+    main()
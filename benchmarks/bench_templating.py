@@ -0,0 +1,66 @@
+"""
+Measures the per-render cost of `render_template`.
+
+Compares the previous behaviour (a fresh Environment and compilation on every
+call) against the shared environment with its compiled-template cache.
+
+Usage:
+    python -m benchmarks.bench_templating [--renders N]
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Dict
+
+from jinja2 import Environment, StrictUndefined
+
+from orquestra.core.templating import clear_template_cache, render_template
+
+TEMPLATE = (
+    "You are an editor. Review the draft below for clarity and tone.\n"
+    "{% for note in notes %}- {{ note }}\n{% endfor %}"
+    "Draft:\n{{ tasks.draft.output }}\n"
+    "Reply in {{ language | upper }}."
+)
+CONTEXT = {
+    "notes": ["Keep it short.", "Avoid jargon.", "Use active voice."],
+    "tasks": {"draft": {"output": "AI orchestration is the future. " * 20}},
+    "language": "english",
+}
+
+
+def _render_uncached(template_str: str, context: Dict[str, Any]) -> str:
+    env = Environment(undefined=StrictUndefined)
+    return env.from_string(template_str).render(context)
+
+
+def run_benchmark(renders: int = 2000) -> Dict[str, Any]:
+    """
+    Times `renders` renders of the same template with and without caching.
+
+    Returns:
+        Per-render costs in microseconds and the resulting speedup.
+    """
+    clear_template_cache()
+    uncached = timeit.timeit(
+        lambda: _render_uncached(TEMPLATE, CONTEXT), number=renders
+    )
+    cached = timeit.timeit(lambda: render_template(TEMPLATE, CONTEXT), number=renders)
+    return {
+        "renders": renders,
+        "uncached_us_per_render": uncached / renders * 1e6,
+        "cached_us_per_render": cached / renders * 1e6,
+        "speedup": uncached / cached,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.renders), indent=2))
+
+
+if __name__ == "__main__":
+    main()
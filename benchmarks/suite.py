@@ -0,0 +1,216 @@
+"""
+End-to-end benchmark suite running on the built-in fake provider.
+
+Covers YAML parsing, validation, planning, template rendering and full runs
+in every execution mode over synthetic workflows, without any API calls.
+Results are machine-readable JSON; pass a previous result file with
+--compare to fail (exit code 1) when any benchmark regresses.
+
+Usage:
+    python -m benchmarks.suite [--output results.json]
+                               [--compare baseline.json --threshold 0.25]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+from orquestra.core import Orchestrator, clear_template_cache, resolve_task_order
+from orquestra.core.templating import render_template
+from orquestra.models import Workflow
+from orquestra.parsers import WorkflowCache, parse_workflow_from_yaml
+from orquestra.parsers.yaml_parser import YAML_LOADER
+
+
+def synthetic_workflow(
+    layers: int, width: int, latency: float = 0.0, output_tokens: int = 16
+) -> Dict[str, Any]:
+    """
+    Builds a layered workflow definition on the fake provider.
+
+    Every task after the first layer depends on two tasks of the previous
+    layer and references their outputs in its instruction.
+    """
+    agent = {
+        "name": "fake_agent",
+        "provider": "fake",
+        "model": "fake-model",
+        "params": {"latency": latency, "output_tokens": output_tokens},
+    }
+    tasks = []
+    for layer in range(layers):
+        for i in range(width):
+            name = f"l{layer}_t{i}"
+            if layer == 0:
+                tasks.append(
+                    {"name": name, "agent": "fake_agent", "instruction": f"Seed {i}."}
+                )
+                continue
+            deps = sorted({f"l{layer - 1}_t{i}", f"l{layer - 1}_t{(i + 1) % width}"})
+            refs = " ".join(f"{{{{ tasks.{dep}.output }}}}" for dep in deps)
+            tasks.append(
+                {
+                    "name": name,
+                    "agent": "fake_agent",
+                    "instruction": f"Combine the following: {refs}",
+                    "depends_on": deps,
+                }
+            )
+    return {"name": f"Synthetic {layers}x{width}", "agents": [agent], "tasks": tasks}
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _run_workflow(workflow: Workflow, mode: str, max_workers: int) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        orchestrator = Orchestrator(
+            workflow,
+            mode="dataflow" if mode == "arun" else mode,
+            max_workers=max_workers,
+        )
+        if mode == "arun":
+            asyncio.run(orchestrator.arun())
+        else:
+            orchestrator.run()
+
+
+def run_suite(repeat: int = 3, quick: bool = False) -> Dict[str, float]:
+    """
+    Runs every benchmark.
+
+    Returns:
+        The best time of `repeat` runs, in seconds, keyed by benchmark name.
+    """
+    results: Dict[str, float] = {}
+    large = synthetic_workflow(layers=10, width=50 if quick else 200)
+
+    # 1. Loading: YAML parsing, validation, both together, and from the
+    # compiled workflow cache
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "workflow.yaml"
+        path.write_text(yaml.safe_dump(large))
+        results["yaml_load"] = _best_of(
+            lambda: yaml.load(path.read_text(), Loader=YAML_LOADER), repeat
+        )
+        results["validation"] = _best_of(lambda: Workflow.model_validate(large), repeat)
+        results["parse_workflow_from_yaml"] = _best_of(
+            lambda: parse_workflow_from_yaml(path), repeat
+        )
+        cache = WorkflowCache(Path(tmp) / "cache")
+        parse_workflow_from_yaml(path, cache=cache)
+        results["parse_workflow_cached"] = _best_of(
+            lambda: parse_workflow_from_yaml(path, cache=cache), repeat
+        )
+
+    # 2. Planning
+    workflow = Workflow.model_validate(large)
+    results["planning"] = _best_of(lambda: resolve_task_order(workflow.tasks), repeat)
+
+    # 3. Template rendering, cold and warm
+    context = {
+        "tasks": {t.name: {"output": "lorem ipsum " * 20} for t in workflow.tasks}
+    }
+
+    def render_all() -> None:
+        for task in workflow.tasks:
+            render_template(task.instruction, context)
+
+    def render_cold() -> None:
+        clear_template_cache()
+        render_all()
+
+    results["render_cold"] = _best_of(render_cold, repeat)
+    results["render_warm"] = _best_of(render_all, repeat)
+
+    # 4. Orchestrator overhead: zero-latency runs of the large workflow
+    for mode in ("sequential", "parallel", "dataflow", "arun"):
+        results[f"run_overhead_{mode}"] = _best_of(
+            lambda: _run_workflow(workflow, mode, max_workers=32), repeat
+        )
+
+    # 5. Parallel speedup: a small workflow with simulated latency
+    slow = Workflow.model_validate(synthetic_workflow(layers=4, width=16, latency=0.02))
+    for mode in ("sequential", "parallel", "dataflow", "arun"):
+        results[f"run_latency_{mode}"] = _best_of(
+            lambda: _run_workflow(slow, mode, max_workers=16), 1
+        )
+
+    return results
+
+
+def _metadata() -> Dict[str, Any]:
+    try:
+        version = metadata.version("orquestra")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return {
+        "orquestra_version": version,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """
+    Returns a description of every benchmark that is more than `threshold`
+    (a fraction, e.g. 0.25) slower than in `baseline`.
+    """
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before and seconds > before * (1 + threshold):
+            regressions.append(
+                f"{name}: {before:.6f}s -> {seconds:.6f}s "
+                f"(+{(seconds / before - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="Use smaller workflows.")
+    parser.add_argument("--output", help="Optional path to write the JSON results.")
+    parser.add_argument("--compare", help="A previous results file to compare to.")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    payload = {"metadata": _metadata(), "results": run_suite(args.repeat, args.quick)}
+    text = json.dumps(payload, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+        regressions = compare(payload["results"], baseline, args.threshold)
+        if regressions:
+            print("Regressions detected:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
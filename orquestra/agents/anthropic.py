@@ -1,33 +1,133 @@
-from anthropic import Anthropic
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from anthropic import Anthropic, AsyncAnthropic
 
 from orquestra.models import Agent
+from orquestra.tracing import annotate
 
-from .base import BaseAgentExecutor
+from .base import BaseAgentExecutor, BatchRequest, BatchResult
+from .prompts import split_prompt
 
 
 class AnthropicAgentExecutor(BaseAgentExecutor):
     """An agent executor for Anthropic's Claude models."""
 
+    supports_batches = True
+
     def __init__(self):
         # The client will automatically look for the ANTHROPIC_API_KEY
         # environment variable.
         self.client = Anthropic()
+        # The async client is created on first use by `aexecute`
+        self._async_client: Optional[AsyncAnthropic] = None
 
-    def execute(self, agent: Agent, instruction: str) -> str:
-        """Executes a task using the Anthropic API."""
-        message = self.client.messages.create(
-            model=agent.model,
-            max_tokens=1024,
-            messages=[
+    @property
+    def async_client(self) -> AsyncAnthropic:
+        """The lazily created asynchronous Anthropic client."""
+        if self._async_client is None:
+            self._async_client = AsyncAnthropic()
+        return self._async_client
+
+    def _build_request(self, agent: Agent, instruction: str) -> Dict[str, Any]:
+        # A prefix shared with other calls ends in a cache breakpoint, so
+        # later calls read it from Anthropic's prompt cache
+        prefix, rest = split_prompt(instruction)
+        content: Any = instruction
+        if prefix:
+            content = [
+                {
+                    "type": "text",
+                    "text": prefix,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+            if rest:
+                content.append({"type": "text", "text": rest})
+        return {
+            "model": agent.model,
+            "max_tokens": 1024,
+            **agent.params,
+            "messages": [
                 {
                     "role": "user",
-                    "content": instruction,
+                    "content": content,
                 }
             ],
-        )
+        }
+
+    def _parse_response(self, message: Any) -> str:
+        usage = getattr(message, "usage", None)
+        if usage is not None:
+            annotate(
+                input_tokens=getattr(usage, "input_tokens", None),
+                output_tokens=getattr(usage, "output_tokens", None),
+                cache_read_tokens=getattr(usage, "cache_read_input_tokens", None),
+                cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None),
+            )
 
         # Ensure we have a valid response before accessing content
         if message.content and message.content[0].text:
             return message.content[0].text
 
         raise ValueError("Received an empty response from Anthropic API.")
+
+    def execute(self, agent: Agent, instruction: str) -> str:
+        """Executes a task using the Anthropic API."""
+        message = self.client.messages.create(**self._build_request(agent, instruction))
+        return self._parse_response(message)
+
+    async def aexecute(self, agent: Agent, instruction: str) -> str:
+        """Executes a task using the asynchronous Anthropic client."""
+        message = await self.async_client.messages.create(
+            **self._build_request(agent, instruction)
+        )
+        return self._parse_response(message)
+
+    def stream(self, agent: Agent, instruction: str) -> Iterator[str]:
+        """Streams a message from the Anthropic API."""
+        with self.client.messages.stream(
+            **self._build_request(agent, instruction)
+        ) as message_stream:
+            yield from message_stream.text_stream
+
+    async def astream(self, agent: Agent, instruction: str) -> AsyncIterator[str]:
+        """Streams a message using the asynchronous Anthropic client."""
+        async with self.async_client.messages.stream(
+            **self._build_request(agent, instruction)
+        ) as message_stream:
+            async for text in message_stream.text_stream:
+                yield text
+
+    def submit_batch(self, requests: List[BatchRequest]) -> str:
+        """Creates a Message Batch with one request per call."""
+        batch = self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": request.custom_id,
+                    "params": self._build_request(request.agent, request.instruction),
+                }
+                for request in requests
+            ]
+        )
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        """Reads an ended Message Batch's results."""
+        batch = self.client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        results: Dict[str, BatchResult] = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type != "succeeded":
+                error = getattr(result, "error", None) or result.type
+                results[entry.custom_id] = BatchResult(error=str(error))
+                continue
+            try:
+                output = self._parse_response(result.message)
+            except ValueError as exc:
+                results[entry.custom_id] = BatchResult(error=str(exc))
+            else:
+                results[entry.custom_id] = BatchResult(output=output)
+        return results
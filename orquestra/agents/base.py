@@ -1,11 +1,47 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional
 
 from orquestra.models import Agent
 
 
+def join_chunks(chunks: List[Any]) -> Any:
+    """
+    Joins the chunks of a streamed output.
+
+    A non-text output, such as the list a "python" task returns, arrives
+    from the default `stream` as a single chunk and is returned unchanged.
+    """
+    if len(chunks) == 1 and not isinstance(chunks[0], str):
+        return chunks[0]
+    return "".join(chunks)
+
+
+class BatchRequest(NamedTuple):
+    """One call in a batch submission, identified by `custom_id`."""
+
+    custom_id: str
+    agent: Agent
+    instruction: str
+
+
+class BatchResult(NamedTuple):
+    """The outcome of one call in a batch: an output or an error message."""
+
+    output: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchCallError(RuntimeError):
+    """Raised when a call in a provider batch fails or is not processed."""
+
+
 class BaseAgentExecutor(ABC):
     """Abstract base class for all agent executors."""
 
+    # Whether the executor implements `submit_batch` and `poll_batch`
+    supports_batches: bool = False
+
     @abstractmethod
     def execute(self, agent: Agent, instruction: str) -> str:
         """
@@ -19,3 +55,78 @@ class BaseAgentExecutor(ABC):
             The string output from the agent.
         """
         pass
+
+    async def aexecute(self, agent: Agent, instruction: str) -> str:
+        """
+        Asynchronously executes a task with the given agent and instruction.
+
+        The default implementation runs `execute` in a worker thread so that
+        synchronous executors work unchanged on an event loop. Executors
+        backed by an async client should override this.
+
+        Args:
+            agent: The Agent model instance.
+            instruction: The rendered instruction for the agent.
+
+        Returns:
+            The string output from the agent.
+        """
+        return await asyncio.to_thread(self.execute, agent, instruction)
+
+    def stream(self, agent: Agent, instruction: str) -> Iterator[str]:
+        """
+        Executes a task and yields the output in chunks as it is generated.
+
+        The default implementation yields the complete output of `execute`
+        as a single chunk. Executors whose provider supports streaming
+        should override this.
+
+        Args:
+            agent: The Agent model instance.
+            instruction: The rendered instruction for the agent.
+
+        Yields:
+            Successive pieces of the output. Joined, they form the same
+            string `execute` would return.
+        """
+        yield self.execute(agent, instruction)
+
+    async def astream(self, agent: Agent, instruction: str) -> AsyncIterator[str]:
+        """
+        The asynchronous counterpart of `stream`.
+
+        The default implementation yields the complete output of `aexecute`
+        as a single chunk.
+        """
+        yield await self.aexecute(agent, instruction)
+
+    def shutdown(self) -> None:
+        """
+        Releases resources the executor holds, such as worker processes.
+
+        The executor stays usable and re-acquires them on its next call.
+        The default implementation does nothing.
+        """
+
+    def submit_batch(self, requests: List[BatchRequest]) -> str:
+        """
+        Submits calls to the provider's batch API without waiting for them.
+
+        Args:
+            requests: The calls, all to this executor's provider.
+
+        Returns:
+            The provider's id for the batch, to pass to `poll_batch`.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batches.")
+
+    def poll_batch(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        """
+        Checks on a submitted batch.
+
+        Returns:
+            None while the batch is processing; once it has ended, the
+            result of each call by `custom_id`. Calls the provider did not
+            process (e.g. because the batch expired) may be missing.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batches.")
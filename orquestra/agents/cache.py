@@ -0,0 +1,283 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple, Union
+
+from orquestra.models import Agent
+from orquestra.tracing import annotate
+
+from .base import BaseAgentExecutor, join_chunks
+
+
+def make_cache_key(agent: Agent, instruction: str) -> str:
+    """
+    Builds a content-addressed cache key for an agent call.
+
+    The key is a SHA-256 hash of the provider, model, request parameters and
+    rendered instruction. The agent's name is deliberately excluded, so two
+    agents with the same configuration share cache entries.
+    """
+    payload = json.dumps(
+        {
+            "provider": agent.provider,
+            "model": agent.model,
+            "params": agent.params,
+            "instruction": instruction,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BaseResponseCache(ABC):
+    """
+    Abstract base class for response cache backends.
+
+    Args:
+        max_entries: The maximum number of entries to keep. When exceeded,
+                     the least recently used entries are evicted.
+        ttl: Optional time-to-live in seconds. Expired entries are treated
+             as misses.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for `key`, or None on a miss."""
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache's hit and miss counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Looks up an unexpired entry without touching the counters."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Stores a response, evicting old entries if the cache is full."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        pass
+
+
+class MemoryResponseCache(BaseResponseCache):
+    """An in-process LRU response cache."""
+
+    def __init__(self, max_entries: Optional[int] = 1024, ttl: Optional[float] = None):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if self._is_expired(created_at):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(BaseResponseCache):
+    """
+    A persistent response cache stored in a local SQLite database.
+
+    Args:
+        path: The database file. Parent directories are created if needed.
+        max_entries: The maximum number of entries to keep (LRU eviction).
+        ttl: Optional time-to-live in seconds.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at"
+                " ON responses (accessed_at)"
+            )
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._is_expired(created_at):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+                )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY accessed_at DESC"
+                    " LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class CachingAgentExecutor(BaseAgentExecutor):
+    """
+    Wraps another executor and serves repeated requests from a cache.
+
+    Only string outputs are stored. Other values, such as the lists a
+    "python" task may return, are passed through uncached, since the cache
+    backends hold text.
+
+    Args:
+        executor: The executor that performs real calls on a cache miss.
+        cache: The cache backend to read from and write to.
+    """
+
+    def __init__(self, executor: BaseAgentExecutor, cache: BaseResponseCache):
+        self.executor = executor
+        self.cache = cache
+
+    def execute(self, agent: Agent, instruction: str) -> str:
+        key = make_cache_key(agent, instruction)
+        cached = self.cache.get(key)
+        annotate(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        output = self.executor.execute(agent, instruction)
+        if isinstance(output, str):
+            self.cache.set(key, output)
+        return output
+
+    async def aexecute(self, agent: Agent, instruction: str) -> str:
+        key = make_cache_key(agent, instruction)
+        cached = self.cache.get(key)
+        annotate(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        output = await self.executor.aexecute(agent, instruction)
+        if isinstance(output, str):
+            self.cache.set(key, output)
+        return output
+
+    def stream(self, agent: Agent, instruction: str) -> Iterator[str]:
+        """Replays a cached response as one chunk, or streams and stores it."""
+        key = make_cache_key(agent, instruction)
+        cached = self.cache.get(key)
+        annotate(cache_hit=cached is not None)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        for chunk in self.executor.stream(agent, instruction):
+            chunks.append(chunk)
+            yield chunk
+        output = join_chunks(chunks)
+        if isinstance(output, str):
+            self.cache.set(key, output)
+
+    async def astream(self, agent: Agent, instruction: str) -> AsyncIterator[str]:
+        key = make_cache_key(agent, instruction)
+        cached = self.cache.get(key)
+        annotate(cache_hit=cached is not None)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        async for chunk in self.executor.astream(agent, instruction):
+            chunks.append(chunk)
+            yield chunk
+        output = join_chunks(chunks)
+        if isinstance(output, str):
+            self.cache.set(key, output)
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from orquestra.models import Agent
+from orquestra.tracing import annotate
+
+from .base import BaseAgentExecutor, join_chunks
+from .cache import make_cache_key
+
+# Resolves a call whose leader gave up, telling waiters to join again
+_ABANDONED = object()
+
+
+class SingleFlight:
+    """
+    Shared table of agent calls in flight, keyed like the response cache.
+
+    Share one instance between orchestrators to coalesce identical calls
+    across concurrent runs.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: str) -> Tuple[Future, bool]:
+        """
+        Finds the call in flight for `key`, or registers a new one.
+
+        Returns:
+            The call's future, and whether the caller leads the call and
+            must resolve it with `finish`.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.calls += 1
+            return future, True
+
+    def finish(
+        self,
+        key: str,
+        future: Future,
+        output: Optional[str] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Hands a led call's output or error to every waiter."""
+        with self._lock:
+            del self._in_flight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(output)
+
+    def abandon(self, key: str, future: Future) -> None:
+        """
+        Gives up a led call without an outcome, e.g. when its leader is
+        cancelled. Waiters join again and one of them makes the call, so a
+        cancellation never reaches callers (possibly in other runs) that
+        were not cancelled themselves.
+        """
+        with self._lock:
+            del self._in_flight[key]
+        future.set_result(_ABANDONED)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the call and coalesced-hit counters."""
+        return {"calls": self.calls, "coalesced": self.coalesced}
+
+
+class CoalescingAgentExecutor(BaseAgentExecutor):
+    """
+    Wraps another executor and collapses identical concurrent calls into one.
+
+    The first caller for a provider, model, parameters and instruction makes
+    the call; callers arriving while it is in flight wait for it and get its
+    output (or its error). If the caller making the call is cancelled, a
+    waiting caller makes it instead. Nothing is stored once the call finishes, so,
+    unlike the response cache, this is safe for tasks with `cache` disabled
+    that must not reuse earlier responses. Waiters of a streamed call get
+    the output as a single chunk.
+
+    Args:
+        executor: The executor that performs the calls.
+        single_flight: The shared table of calls in flight.
+    """
+
+    def __init__(self, executor: BaseAgentExecutor, single_flight: SingleFlight):
+        self.executor = executor
+        self.single_flight = single_flight
+
+    def _join(self, key: str) -> Tuple[Optional[Future], Any]:
+        """
+        Waits for the call in flight for `key`, taking the lead if there is
+        none or its leader gave up.
+
+        Returns:
+            `(future, None)` when the caller leads the call, and
+            `(None, output)` when it waited for another caller's.
+        """
+        while True:
+            future, leader = self.single_flight.join(key)
+            annotate(coalesced=not leader)
+            if leader:
+                return future, None
+            output = future.result()
+            if output is not _ABANDONED:
+                return None, output
+
+    async def _ajoin(self, key: str) -> Tuple[Optional[Future], Any]:
+        """The asynchronous counterpart of `_join`."""
+        while True:
+            future, leader = self.single_flight.join(key)
+            annotate(coalesced=not leader)
+            if leader:
+                return future, None
+            # Shielded, so a cancelled waiter does not cancel the shared call
+            output = await asyncio.shield(asyncio.wrap_future(future))
+            if output is not _ABANDONED:
+                return None, output
+
+    def execute(self, agent: Agent, instruction: str) -> str:
+        key = make_cache_key(agent, instruction)
+        future, output = self._join(key)
+        if future is None:
+            return output
+
+        try:
+            output = self.executor.execute(agent, instruction)
+        except Exception as exc:
+            self.single_flight.finish(key, future, error=exc)
+            raise
+        except BaseException:
+            self.single_flight.abandon(key, future)
+            raise
+        self.single_flight.finish(key, future, output)
+        return output
+
+    async def aexecute(self, agent: Agent, instruction: str) -> str:
+        key = make_cache_key(agent, instruction)
+        future, output = await self._ajoin(key)
+        if future is None:
+            return output
+
+        try:
+            output = await self.executor.aexecute(agent, instruction)
+        except Exception as exc:
+            self.single_flight.finish(key, future, error=exc)
+            raise
+        except BaseException:
+            # Cancelled: waiters take over rather than being cancelled too
+            self.single_flight.abandon(key, future)
+            raise
+        self.single_flight.finish(key, future, output)
+        return output
+
+    def stream(self, agent: Agent, instruction: str) -> Iterator[str]:
+        key = make_cache_key(agent, instruction)
+        future, output = self._join(key)
+        if future is None:
+            yield output
+            return
+
+        chunks = []
+        try:
+            for chunk in self.executor.stream(agent, instruction):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as exc:
+            self.single_flight.finish(key, future, error=exc)
+            raise
+        except BaseException:
+            # Also reached when the stream is closed before it ends
+            self.single_flight.abandon(key, future)
+            raise
+        self.single_flight.finish(key, future, join_chunks(chunks))
+
+    async def astream(self, agent: Agent, instruction: str) -> AsyncIterator[str]:
+        key = make_cache_key(agent, instruction)
+        future, output = await self._ajoin(key)
+        if future is None:
+            yield output
+            return
+
+        chunks = []
+        try:
+            async for chunk in self.executor.astream(agent, instruction):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as exc:
+            self.single_flight.finish(key, future, error=exc)
+            raise
+        except BaseException:
+            self.single_flight.abandon(key, future)
+            raise
+        self.single_flight.finish(key, future, join_chunks(chunks))
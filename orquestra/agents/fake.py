@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from orquestra.models import Agent
+
+from .base import BaseAgentExecutor, BatchRequest, BatchResult
+
+# Words used to build deterministic fake outputs.
+_VOCABULARY = (
+    "agent orchestra model prompt token latency batch workflow context output "
+    "schedule signal review draft summary insight result vector cache stream"
+).split()
+
+
+class FakeProviderError(Exception):
+    """A simulated transient provider failure, shaped like an SDK error."""
+
+    def __init__(self, status_code: int = 503):
+        super().__init__(f"Simulated provider error (HTTP {status_code}).")
+        self.status_code = status_code
+
+
+class FakeAgentExecutor(BaseAgentExecutor):
+    """
+    An offline executor that simulates a provider without network calls.
+
+    Behaviour is configured through the agent's `params`:
+
+    - `latency`: mean latency in seconds (default 0).
+    - `latency_distribution`: "constant" (default), "uniform", "exponential"
+      or "lognormal".
+    - `latency_jitter`: spread of the distribution: the half-width for
+      "uniform" and sigma for "lognormal" (default 0.25).
+    - `output_tokens`: number of words in each output (default 16).
+    - `error_rate`: probability of raising a `FakeProviderError` (default 0).
+    - `seed`: seed for the executor's random number generator.
+    - `batch_latency`: seconds before a batch submission ends (default 0).
+
+    Outputs are deterministic for a given model and instruction, so fake
+    runs work with the response cache and checkpoints.
+
+    Batches are kept per process rather than per executor, like a provider's
+    batch endpoint, so a new executor can poll a batch an earlier one
+    submitted.
+    """
+
+    # Submitted batches by id: when each ends and its requests
+    _batches: Dict[str, Tuple[float, List[BatchRequest]]] = {}
+    _batches_lock = threading.Lock()
+    supports_batches = True
+
+    def __init__(self):
+        self._rng = random.Random()
+        self._seeded = False
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def sample_latency(self, agent: Agent) -> float:
+        """Draws a latency, in seconds, from the agent's distribution."""
+        params = agent.params
+        mean = float(params.get("latency", 0.0))
+        if mean <= 0:
+            return 0.0
+        distribution = params.get("latency_distribution", "constant")
+        jitter = float(params.get("latency_jitter", 0.25))
+
+        with self._lock:
+            if not self._seeded and "seed" in params:
+                self._rng.seed(params["seed"])
+                self._seeded = True
+            if distribution == "constant":
+                return mean
+            if distribution == "uniform":
+                return max(0.0, self._rng.uniform(mean - jitter, mean + jitter))
+            if distribution == "exponential":
+                return self._rng.expovariate(1 / mean)
+            if distribution == "lognormal":
+                # Parameterised so the distribution's mean is `mean`
+                mu = math.log(mean) - jitter**2 / 2
+                return self._rng.lognormvariate(mu, jitter)
+        raise ValueError(f"Unknown latency distribution '{distribution}'.")
+
+    def _maybe_fail(self, agent: Agent) -> None:
+        error_rate = float(agent.params.get("error_rate", 0.0))
+        if error_rate:
+            with self._lock:
+                failed = self._rng.random() < error_rate
+            if failed:
+                raise FakeProviderError()
+
+    def _tokens(self, agent: Agent, instruction: str) -> List[str]:
+        count = int(agent.params.get("output_tokens", 16))
+        digest = hashlib.sha256(f"{agent.model}\n{instruction}".encode()).digest()
+        return [
+            _VOCABULARY[digest[i % len(digest)] % len(_VOCABULARY)]
+            for i in range(count)
+        ]
+
+    def _output(self, agent: Agent, instruction: str) -> str:
+        with self._lock:
+            self.calls += 1
+        return " ".join(self._tokens(agent, instruction))
+
+    def execute(self, agent: Agent, instruction: str) -> str:
+        time.sleep(self.sample_latency(agent))
+        self._maybe_fail(agent)
+        return self._output(agent, instruction)
+
+    async def aexecute(self, agent: Agent, instruction: str) -> str:
+        await asyncio.sleep(self.sample_latency(agent))
+        self._maybe_fail(agent)
+        return self._output(agent, instruction)
+
+    def stream(self, agent: Agent, instruction: str) -> Iterator[str]:
+        time.sleep(self.sample_latency(agent))
+        self._maybe_fail(agent)
+        output = self._output(agent, instruction)
+        for i, token in enumerate(output.split(" ")):
+            yield token if i == 0 else " " + token
+
+    async def astream(self, agent: Agent, instruction: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self.sample_latency(agent))
+        self._maybe_fail(agent)
+        output = self._output(agent, instruction)
+        for i, token in enumerate(output.split(" ")):
+            yield token if i == 0 else " " + token
+
+    def submit_batch(self, requests: List[BatchRequest]) -> str:
+        batch_id = f"fakebatch_{uuid.uuid4().hex}"
+        latency = max(
+            (float(r.agent.params.get("batch_latency", 0.0)) for r in requests),
+            default=0.0,
+        )
+        with self._batches_lock:
+            self._batches[batch_id] = (time.monotonic() + latency, list(requests))
+        return batch_id
+
+    def poll_batch(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        with self._batches_lock:
+            if batch_id not in self._batches:
+                raise ValueError(f"Unknown batch '{batch_id}'.")
+            ends_at, requests = self._batches[batch_id]
+        if time.monotonic() < ends_at:
+            return None
+
+        results: Dict[str, BatchResult] = {}
+        for request in requests:
+            try:
+                self._maybe_fail(request.agent)
+            except FakeProviderError as exc:
+                results[request.custom_id] = BatchResult(error=str(exc))
+            else:
+                output = self._output(request.agent, request.instruction)
+                results[request.custom_id] = BatchResult(output=output)
+        return results
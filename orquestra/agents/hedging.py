@@ -0,0 +1,294 @@
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+from orquestra.models import Agent
+from orquestra.tracing import increment
+
+from .base import BaseAgentExecutor
+
+
+class AgentTimeoutError(TimeoutError):
+    """Raised when an agent call does not finish within its deadline."""
+
+
+# Marks a stream that ended without yielding a chunk.
+_END = object()
+
+
+class Hedger:
+    """
+    Shared hedging state: recent call latencies for each provider/model.
+
+    Once a model has `min_samples` recorded latencies, a call still running
+    after the `percentile` of them gets a duplicate request; whichever
+    finishes first wins.
+
+    Args:
+        percentile: The latency percentile (0-1) after which a call is hedged.
+        min_samples: Latencies needed before a model's calls are hedged.
+        max_hedges: Duplicate requests allowed per call.
+        window: How many recent latencies are kept per model.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        max_hedges: int = 1,
+        window: int = 500,
+    ):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1.")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedges = max_hedges
+        self.window = window
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, agent: Agent, seconds: float) -> None:
+        """Records the latency of a successful call."""
+        with self._lock:
+            self._latencies.setdefault(
+                (agent.provider, agent.model), deque(maxlen=self.window)
+            ).append(seconds)
+
+    def hedge_delay(self, agent: Agent) -> Optional[float]:
+        """
+        Returns how long to wait before hedging a call, or None while too
+        few latencies are known.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get((agent.provider, agent.model), ()))
+        if len(latencies) < self.min_samples:
+            return None
+        index = min(len(latencies) - 1, math.ceil(self.percentile * len(latencies)) - 1)
+        return latencies[index]
+
+    def record_hedge(self) -> None:
+        with self._lock:
+            self.hedges += 1
+
+    def record_hedge_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hedge and timeout counters."""
+        return {
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+        }
+
+
+class HedgingAgentExecutor(BaseAgentExecutor):
+    """
+    Wraps another executor with a deadline and hedged requests.
+
+    Synchronous calls run on daemon threads, so a stuck call cannot hold up
+    the caller or interpreter exit; losing and timed-out calls are
+    abandoned and their results ignored. Asynchronous calls are cancelled.
+
+    Streams keep their chunks but are not hedged, since chunks already
+    handed on cannot be taken back; for them the deadline bounds the time
+    to the first chunk.
+
+    Args:
+        executor: The executor that performs the calls.
+        hedger: Shared latency state; None disables hedging.
+        timeout: Seconds before the call fails with `AgentTimeoutError`.
+    """
+
+    def __init__(
+        self,
+        executor: BaseAgentExecutor,
+        hedger: Optional[Hedger] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.executor = executor
+        self.hedger = hedger
+        self.timeout = timeout
+
+    def _timed_out(self, agent: Agent) -> AgentTimeoutError:
+        if self.hedger is not None:
+            self.hedger.record_timeout()
+        increment("timeouts")
+        return AgentTimeoutError(
+            f"Call to {agent.provider}/{agent.model} (agent '{agent.name}') "
+            f"timed out after {self.timeout}s."
+        )
+
+    def _hedge(self) -> None:
+        self.hedger.record_hedge()
+        increment("hedges")
+
+    def _start(self, agent: Agent, instruction: str) -> "Future[str]":
+        """Runs one attempt on a daemon thread, in the caller's trace context."""
+        future: Future = Future()
+        context = contextvars.copy_context()
+        started = time.monotonic()
+
+        def attempt() -> None:
+            try:
+                output = context.run(self.executor.execute, agent, instruction)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                if self.hedger is not None:
+                    self.hedger.record(agent, time.monotonic() - started)
+                future.set_result(output)
+
+        threading.Thread(target=attempt, daemon=True).start()
+        return future
+
+    def _next_wait(
+        self, now: float, deadline: Optional[float], hedge_at: Optional[float]
+    ) -> Optional[float]:
+        waits = [at - now for at in (deadline, hedge_at) if at is not None]
+        return max(0.0, min(waits)) if waits else None
+
+    def execute(self, agent: Agent, instruction: str) -> str:
+        if self.timeout is None and self.hedger is None:
+            return self.executor.execute(agent, instruction)
+
+        started = time.monotonic()
+        deadline = started + self.timeout if self.timeout is not None else None
+        delay = self.hedger.hedge_delay(agent) if self.hedger is not None else None
+        hedge_at = started + delay if delay is not None else None
+        attempts: List[Future] = [self._start(agent, instruction)]
+        pending = set(attempts)
+        while True:
+            now = time.monotonic()
+            done, pending = wait(
+                pending,
+                timeout=self._next_wait(now, deadline, hedge_at),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                # A failed attempt only fails the call if no other is running
+                if future.exception() is None:
+                    if future is not attempts[0]:
+                        self.hedger.record_hedge_win()
+                    return future.result()
+                if not pending:
+                    return future.result()
+
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise self._timed_out(agent)
+            if hedge_at is not None and now >= hedge_at:
+                self._hedge()
+                attempt = self._start(agent, instruction)
+                attempts.append(attempt)
+                pending.add(attempt)
+                hedges = len(attempts) - 1
+                hedge_at = now + delay if hedges < self.hedger.max_hedges else None
+
+    async def aexecute(self, agent: Agent, instruction: str) -> str:
+        if self.timeout is None and self.hedger is None:
+            return await self.executor.aexecute(agent, instruction)
+
+        async def attempt() -> str:
+            attempt_started = time.monotonic()
+            output = await self.executor.aexecute(agent, instruction)
+            if self.hedger is not None:
+                self.hedger.record(agent, time.monotonic() - attempt_started)
+            return output
+
+        started = time.monotonic()
+        deadline = started + self.timeout if self.timeout is not None else None
+        delay = self.hedger.hedge_delay(agent) if self.hedger is not None else None
+        hedge_at = started + delay if delay is not None else None
+        attempts = [asyncio.ensure_future(attempt())]
+        pending = set(attempts)
+        try:
+            while True:
+                now = time.monotonic()
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self._next_wait(now, deadline, hedge_at),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not attempts[0]:
+                            self.hedger.record_hedge_win()
+                        return task.result()
+                    if not pending:
+                        return task.result()
+
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    raise self._timed_out(agent)
+                if hedge_at is not None and now >= hedge_at:
+                    self._hedge()
+                    task = asyncio.ensure_future(attempt())
+                    attempts.append(task)
+                    pending.add(task)
+                    hedges = len(attempts) - 1
+                    hedge_at = now + delay if hedges < self.hedger.max_hedges else None
+        finally:
+            # Cancel whichever attempts lost or are still running
+            for task in attempts:
+                task.cancel()
+
+    def stream(self, agent: Agent, instruction: str) -> Iterator[str]:
+        chunks = self.executor.stream(agent, instruction)
+        if self.timeout is None:
+            yield from chunks
+            return
+
+        # Wait for the first chunk on a daemon thread, so a stuck stream is
+        # abandoned like a stuck call
+        first: Future = Future()
+        context = contextvars.copy_context()
+
+        def pull() -> None:
+            try:
+                first.set_result(context.run(next, chunks, _END))
+            except BaseException as exc:
+                first.set_exception(exc)
+
+        threading.Thread(target=pull, daemon=True).start()
+        done, _ = wait([first], timeout=self.timeout)
+        if not done:
+            raise self._timed_out(agent)
+        chunk = first.result()
+        if chunk is _END:
+            return
+        yield chunk
+        yield from chunks
+
+    async def astream(self, agent: Agent, instruction: str) -> AsyncIterator[str]:
+        chunks = self.executor.astream(agent, instruction)
+        if self.timeout is None:
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        first = asyncio.ensure_future(chunks.__anext__())
+        done, _ = await asyncio.wait({first}, timeout=self.timeout)
+        if not done:
+            first.cancel()
+            raise self._timed_out(agent)
+        try:
+            chunk = first.result()
+        except StopAsyncIteration:
+            return
+        yield chunk
+        async for chunk in chunks:
+            yield chunk
@@ -1,32 +1,154 @@
-from openai import OpenAI
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from openai import AsyncOpenAI, OpenAI
 
 from orquestra.models import Agent
+from orquestra.tracing import annotate
+
+from .base import BaseAgentExecutor, BatchRequest, BatchResult
+from .prompts import split_prompt
 
-from .base import BaseAgentExecutor
+# The endpoint batched requests are sent to, and the batch statuses after
+# which no more results will appear.
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
 
 
 class OpenAIAgentExecutor(BaseAgentExecutor):
     """An agent executor for OpenAI models."""
 
+    supports_batches = True
+
     def __init__(self):
         # The client will automatically look for the OPENAI_API_KEY
         # environment variable.
         self.client = OpenAI()
+        # The async client is created on first use by `aexecute`
+        self._async_client: Optional[AsyncOpenAI] = None
 
-    def execute(self, agent: Agent, instruction: str) -> str:
-        """Executes a task using the OpenAI API."""
-        chat_completion = self.client.chat.completions.create(
-            messages=[
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """The lazily created asynchronous OpenAI client."""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI()
+        return self._async_client
+
+    def _build_request(self, agent: Agent, instruction: str) -> Dict[str, Any]:
+        request: Dict[str, Any] = {
+            "messages": [
                 {
                     "role": "user",
-                    "content": instruction,
+                    "content": str(instruction),
                 }
             ],
-            model=agent.model,
-        )
+            "model": agent.model,
+        }
+        # OpenAI caches long prompt prefixes automatically. The instruction
+        # already starts with the shared prefix; keying the request by it
+        # routes calls sharing it to the same cache.
+        prefix, _ = split_prompt(instruction)
+        if prefix:
+            digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+            request["prompt_cache_key"] = digest[:32]
+        request.update(agent.params)
+        return request
+
+    def _parse_response(self, chat_completion: Any) -> str:
+        usage = getattr(chat_completion, "usage", None)
+        if usage is not None:
+            annotate(
+                input_tokens=getattr(usage, "prompt_tokens", None),
+                output_tokens=getattr(usage, "completion_tokens", None),
+                cache_read_tokens=getattr(
+                    getattr(usage, "prompt_tokens_details", None),
+                    "cached_tokens",
+                    None,
+                ),
+            )
 
         # Ensure we have a valid response before accessing content
         if chat_completion.choices and chat_completion.choices[0].message:
             return chat_completion.choices[0].message.content or ""
 
         raise ValueError("Received an empty response from OpenAI API.")
+
+    def execute(self, agent: Agent, instruction: str) -> str:
+        """Executes a task using the OpenAI API."""
+        chat_completion = self.client.chat.completions.create(
+            **self._build_request(agent, instruction)
+        )
+        return self._parse_response(chat_completion)
+
+    async def aexecute(self, agent: Agent, instruction: str) -> str:
+        """Executes a task using the asynchronous OpenAI client."""
+        chat_completion = await self.async_client.chat.completions.create(
+            **self._build_request(agent, instruction)
+        )
+        return self._parse_response(chat_completion)
+
+    def stream(self, agent: Agent, instruction: str) -> Iterator[str]:
+        """Streams a completion from the OpenAI API."""
+        chunks = self.client.chat.completions.create(
+            **self._build_request(agent, instruction), stream=True
+        )
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def astream(self, agent: Agent, instruction: str) -> AsyncIterator[str]:
+        """Streams a completion using the asynchronous OpenAI client."""
+        chunks = await self.async_client.chat.completions.create(
+            **self._build_request(agent, instruction), stream=True
+        )
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def submit_batch(self, requests: List[BatchRequest]) -> str:
+        """Uploads the requests as a JSONL file and starts a Batch API job."""
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": self._build_request(request.agent, request.instruction),
+                }
+            )
+            for request in requests
+        ]
+        input_file = self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        """Reads a finished job's output and error files."""
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status not in BATCH_FINAL_STATUSES:
+            return None
+
+        results: Dict[str, BatchResult] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                body = response.get("body") or {}
+                if entry.get("error") or response.get("status_code") != 200:
+                    error = entry.get("error") or body.get("error")
+                    results[entry["custom_id"]] = BatchResult(error=str(error))
+                    continue
+                output = body["choices"][0]["message"]["content"] or ""
+                results[entry["custom_id"]] = BatchResult(output=output)
+        return results
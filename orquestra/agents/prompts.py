@@ -0,0 +1,157 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Providers only cache prompts of about 1024 tokens or more, so shorter
+# shared prefixes (in characters, at roughly four per token) are ignored.
+DEFAULT_MIN_PREFIX_LENGTH = 4096
+
+
+class CacheablePrompt(str):
+    """
+    An instruction whose first `prefix_length` characters are shared with
+    other calls to the same model.
+
+    It is an ordinary string to everything that does not know about prompt
+    caching (response caches, rate limiters, fakes). Executors that do use
+    `split_prompt` to place a provider-side cache breakpoint after the
+    prefix.
+    """
+
+    prefix_length: int
+
+    def __new__(cls, text: str, prefix_length: int) -> "CacheablePrompt":
+        prompt = super().__new__(cls, text)
+        prompt.prefix_length = prefix_length
+        return prompt
+
+    def __getnewargs__(self) -> Tuple[str, int]:
+        return str(self), self.prefix_length
+
+
+def split_prompt(instruction: str) -> Tuple[str, str]:
+    """
+    Splits an instruction into its shared prefix and the rest.
+
+    Returns:
+        A `(prefix, rest)` pair; the prefix is empty for plain strings.
+    """
+    prefix_length = getattr(instruction, "prefix_length", 0)
+    text = str(instruction)
+    return text[:prefix_length], text[prefix_length:]
+
+
+def _cut(text: str, length: int) -> int:
+    """
+    Moves a prefix boundary back to just after a line break or space.
+
+    Different pairs of prompts share prefixes of slightly different
+    lengths; cutting at a word boundary makes them agree on one breakpoint,
+    which is what lets the provider reuse the cached prefix.
+    """
+    for separator in ("\n", " "):
+        index = text.rfind(separator, 0, length)
+        if index >= 0:
+            return index + 1
+    return 0
+
+
+class PrefixDetector:
+    """
+    Finds rendered prefixes shared by calls to the same provider and model.
+
+    Each instruction is compared with the other items of its own `foreach`
+    task and with the last `window` instructions sent to the same model.
+    When the longest shared prefix is at least `min_length` characters, the
+    instruction is returned as a `CacheablePrompt` marking it.
+
+    Writing a prefix to the provider's cache costs more than an uncached
+    prompt, and calls sent together each write it: none can read what the
+    others have not finished writing. `warm_up` therefore lets the first
+    call with a new prefix go alone and holds the others until it has
+    answered. Tasks whose calls should never wait can opt out with
+    `prompt_cache=False`.
+
+    Args:
+        min_length: The shortest prefix worth a cache breakpoint.
+        window: How many recent instructions per model to compare against.
+    """
+
+    def __init__(self, min_length: int = DEFAULT_MIN_PREFIX_LENGTH, window: int = 32):
+        self.min_length = min_length
+        self.window = window
+        self._recent: Dict[Tuple[str, str], Deque[str]] = {}
+        self._warm_ups: "OrderedDict[Tuple[str, str, str], Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tag(self, provider: str, model: str, instructions: List[str]) -> List[str]:
+        """
+        Marks the shared prefix of a group of instructions for one task.
+
+        Args:
+            provider: The provider the instructions are sent to.
+            model: The model the instructions are sent to.
+            instructions: One instruction, or one per `foreach` item.
+
+        Returns:
+            The instructions, as `CacheablePrompt`s where a prefix was found.
+        """
+        if not instructions:
+            return instructions
+
+        # Only a prefix common to the whole group can be marked on each item
+        common = os.path.commonprefix(instructions)
+        shared = len(common) if len(instructions) > 1 else 0
+        with self._lock:
+            recent = self._recent.setdefault(
+                (provider, model), deque(maxlen=self.window)
+            )
+            for previous in recent:
+                shared = max(shared, len(os.path.commonprefix([common, previous])))
+            recent.extend(instructions[-self.window :])
+
+        if shared < self.min_length:
+            return instructions
+        length = _cut(common, shared)
+        if length < self.min_length:
+            return instructions
+        return [CacheablePrompt(text, length) for text in instructions]
+
+    def warm_up(
+        self, provider: str, model: str, instruction: str
+    ) -> Tuple[Optional[Future], bool]:
+        """
+        Claims the first call sending a marked prefix to a model.
+
+        The first caller leads: it sends its call at once and resolves the
+        future when the call has answered (whether or not it succeeded).
+        Later callers wait on the leader's future before sending theirs, so
+        they read the cached prefix instead of writing it again.
+
+        Args:
+            provider: The provider the instruction is sent to.
+            model: The model the instruction is sent to.
+            instruction: The instruction about to be sent.
+
+        Returns:
+            A `(future, leader)` pair. The future is None for instructions
+            without a marked prefix, which need not wait.
+        """
+        prefix, _ = split_prompt(instruction)
+        if not prefix:
+            return None, False
+
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        key = (provider, model, digest)
+        with self._lock:
+            future = self._warm_ups.get(key)
+            if future is not None:
+                self._warm_ups.move_to_end(key)
+                return future, False
+            future = self._warm_ups[key] = Future()
+            if len(self._warm_ups) > self.window:
+                self._warm_ups.popitem(last=False)
+        return future, True
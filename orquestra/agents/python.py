@@ -0,0 +1,125 @@
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from orquestra.models import Agent
+
+from .base import BaseAgentExecutor
+from .registry import load_object
+
+# How a callable runs, chosen per agent through `params["pool"]`.
+POOL_KINDS = ("process", "thread")
+
+
+@functools.lru_cache(maxsize=None)
+def load_function(import_path: str) -> Callable[..., Any]:
+    """
+    Imports a callable from a "package.module:function" path, once per
+    process.
+
+    Raises:
+        ValueError: If the path cannot be imported or is not callable.
+    """
+    function = load_object(import_path)
+    if not callable(function):
+        raise ValueError(f"'{import_path}' is not callable.")
+    return function
+
+
+def _call(import_path: str, instruction: str, kwargs: Dict[str, Any]) -> Any:
+    """Runs a callable by import path; the entry point of pool processes."""
+    return load_function(import_path)(instruction, **kwargs)
+
+
+def _process_context() -> multiprocessing.context.BaseContext:
+    # Forking a process that runs many threads can deadlock the child, so
+    # pool processes are started from a clean server process instead
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+class PythonAgentExecutor(BaseAgentExecutor):
+    """
+    Runs a local Python callable in place of a model call.
+
+    The agent's `model` is the callable's import path, e.g.
+    "my_pipeline.steps:extract_json". It is called with the rendered
+    instruction and the agent's `params` as keyword arguments, and its
+    return value becomes the task's output unchanged: a string, or any
+    JSON-serialisable value such as a list for a downstream `foreach`.
+
+    `params["pool"]` picks where the callable runs:
+
+    - "process" (default): a process pool with one process per core, for
+      CPU-bound work. Arguments and results are pickled across.
+    - "thread": the calling thread, or a thread pool under `arun`, for
+      I/O-bound work. Outputs are passed by reference, without copies.
+
+    Args:
+        max_workers: Size of the process pool; defaults to the core count.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self, kind: str) -> Executor:
+        """Returns the pool of a kind, creating it on first use."""
+        with self._lock:
+            if kind == "process":
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=_process_context()
+                    )
+                return self._process_pool
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    thread_name_prefix="orquestra-python"
+                )
+            return self._thread_pool
+
+    def _prepare(self, agent: Agent) -> Tuple[str, Callable[..., Any], Dict[str, Any]]:
+        kwargs = dict(agent.params)
+        kind = kwargs.pop("pool", "process")
+        if kind not in POOL_KINDS:
+            raise ValueError(
+                f"Unknown pool '{kind}' for agent '{agent.name}'. "
+                f"Expected one of: {', '.join(POOL_KINDS)}."
+            )
+        # Import in this process too, so a bad path fails before dispatch
+        return kind, load_function(agent.model), kwargs
+
+    def execute(self, agent: Agent, instruction: str) -> Any:
+        """Runs the agent's callable and waits for its result."""
+        kind, function, kwargs = self._prepare(agent)
+        if kind == "thread":
+            return function(instruction, **kwargs)
+        future = self._pool(kind).submit(_call, agent.model, str(instruction), kwargs)
+        return future.result()
+
+    async def aexecute(self, agent: Agent, instruction: str) -> Any:
+        """Runs the agent's callable without blocking the event loop."""
+        kind, function, kwargs = self._prepare(agent)
+        if kind == "thread":
+            future = self._pool(kind).submit(function, instruction, **kwargs)
+        else:
+            future = self._pool(kind).submit(
+                _call, agent.model, str(instruction), kwargs
+            )
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Stops the pools' workers; they are started again on the next call."""
+        with self._lock:
+            pools = [self._process_pool, self._thread_pool]
+            self._process_pool = self._thread_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown()
@@ -0,0 +1,461 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from orquestra.models import Agent
+from orquestra.tracing import increment
+
+from .base import BaseAgentExecutor
+
+# HTTP status codes worth retrying. 529 is Anthropic's "overloaded" status.
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class RateLimit(BaseModel):
+    """Throughput limits for a provider or a single model."""
+
+    requests_per_minute: Optional[float] = Field(
+        None, description="Maximum requests started per minute."
+    )
+    tokens_per_minute: Optional[float] = Field(
+        None, description="Maximum estimated tokens (prompt + max output) per minute."
+    )
+    max_concurrency: int = Field(
+        64, ge=1, description="Upper bound for the adaptive concurrency limit."
+    )
+    initial_concurrency: Optional[int] = Field(
+        None, ge=1, description="Starting concurrency; defaults to max_concurrency."
+    )
+    min_concurrency: int = Field(
+        1, ge=1, description="Lower bound for the adaptive concurrency limit."
+    )
+    decrease_factor: float = Field(
+        0.5, gt=0, lt=1, description="Multiplier applied to concurrency on a 429."
+    )
+
+
+class RetryPolicy(BaseModel):
+    """Jittered exponential backoff for retryable provider errors."""
+
+    max_retries: int = Field(5, ge=0, description="Retries after the first attempt.")
+    base_delay: float = Field(0.5, ge=0, description="Backoff for the first retry.")
+    max_delay: float = Field(60.0, ge=0, description="Upper bound for any backoff.")
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Returns how long to wait before retry number `attempt` (from 0).
+
+        Uses "full jitter": a uniform sample between zero and the exponential
+        backoff. A provider's `retry-after` hint is treated as a minimum.
+        """
+        backoff = min(self.max_delay, self.base_delay * 2**attempt)
+        delay = random.uniform(0, backoff)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class ErrorClassification(NamedTuple):
+    """How the rate limiter should react to an exception."""
+
+    retryable: bool
+    throttled: bool
+    retry_after: Optional[float]
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def classify_error(exc: Exception) -> ErrorClassification:
+    """
+    Decides whether an executor error is transient.
+
+    Works with the OpenAI and Anthropic SDK exceptions, which expose
+    `status_code` and the HTTP `response`, as well as with plain connection
+    and timeout errors.
+    """
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+
+    if isinstance(status_code, int):
+        return ErrorClassification(
+            retryable=status_code in RETRYABLE_STATUS_CODES,
+            throttled=status_code == 429,
+            retry_after=_retry_after(exc),
+        )
+
+    # Both SDKs name their network errors this way
+    connection_error = type(exc).__name__ in {"APIConnectionError", "APITimeoutError"}
+    if connection_error or isinstance(exc, (ConnectionError, TimeoutError)):
+        return ErrorClassification(True, False, None)
+    return ErrorClassification(False, False, None)
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def estimate_tokens(agent: Agent, instruction: str) -> int:
+    """Estimates the tokens a request counts against a tokens-per-minute quota."""
+    return len(instruction) // 4 + 1 + int(agent.params.get("max_tokens", 0))
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket refilled continuously at a per-minute rate.
+
+    Args:
+        per_minute: The refill rate, and the bucket's capacity.
+    """
+
+    def __init__(self, per_minute: float):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive.")
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Takes `amount` tokens, going into debt if necessary.
+
+        Returns:
+            The number of seconds the caller must wait before the reserved
+            tokens are actually available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.updated_at
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class ModelLimiter:
+    """
+    Rate and concurrency limits for a single provider/model pair.
+
+    Concurrency adapts with AIMD: every successful call grows the limit by
+    roughly one slot per window of calls, and every 429 multiplies it by
+    `decrease_factor` and pauses new calls for the provider's `retry-after`.
+
+    Threads wait on a condition; coroutines, possibly on several event
+    loops, wait in a queue and are woken one per freed slot.
+    """
+
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self.concurrency = float(limit.initial_concurrency or limit.max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._condition = threading.Condition()
+        self._async_waiters: Deque[
+            Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]
+        ] = deque()
+
+        self.request_bucket = (
+            TokenBucket(limit.requests_per_minute)
+            if limit.requests_per_minute
+            else None
+        )
+        self.token_bucket = (
+            TokenBucket(limit.tokens_per_minute) if limit.tokens_per_minute else None
+        )
+
+    def _has_free_slot(self) -> bool:
+        return self.in_flight < max(1, int(self.concurrency))
+
+    def _wake_waiters(self) -> None:
+        """Wakes a waiting thread or coroutine per free slot. Holds the lock."""
+        self._condition.notify_all()
+        free = max(1, int(self.concurrency)) - self.in_flight
+        while free > 0 and self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The waiter's loop is closed; nobody is left to wake
+                continue
+            free -= 1
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserves bucket capacity and returns how long to wait for it."""
+        delay = self.paused_until - time.monotonic()
+        if self.request_bucket is not None:
+            delay = max(delay, self.request_bucket.reserve(1))
+        if self.token_bucket is not None:
+            delay = max(delay, self.token_bucket.reserve(tokens))
+        return max(0.0, delay)
+
+    def acquire(self, tokens: int) -> None:
+        """Blocks until a concurrency slot and quota are available."""
+        with self._condition:
+            while not self._has_free_slot():
+                self._condition.wait()
+            self.in_flight += 1
+        try:
+            delay = self._reserve(tokens)
+            if delay:
+                time.sleep(delay)
+        except BaseException:
+            self.abandon()
+            raise
+
+    async def aacquire(self, tokens: int) -> None:
+        """
+        The asynchronous counterpart of `acquire`. A cancelled caller leaves
+        no slot behind, whether it was waiting for a slot or for quota.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._has_free_slot():
+                    self.in_flight += 1
+                    break
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except BaseException:
+                with self._condition:
+                    try:
+                        self._async_waiters.remove((loop, waiter))
+                    except ValueError:
+                        # Already woken for a free slot: pass it on
+                        self._wake_waiters()
+                raise
+
+        try:
+            delay = self._reserve(tokens)
+            if delay:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self.abandon()
+            raise
+
+    def abandon(self) -> None:
+        """
+        Frees the slot of a call that was cancelled or closed before it
+        finished, without adapting the concurrency limit.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._wake_waiters()
+
+    def release(
+        self, throttled: bool = False, retry_after: Optional[float] = None
+    ) -> None:
+        """Frees a slot and adapts the concurrency limit to the outcome."""
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.concurrency = max(
+                    self.limit.min_concurrency,
+                    self.concurrency * self.limit.decrease_factor,
+                )
+                if retry_after:
+                    self.paused_until = max(
+                        self.paused_until, time.monotonic() + retry_after
+                    )
+            else:
+                self.concurrency = min(
+                    self.limit.max_concurrency,
+                    self.concurrency + 1 / max(1.0, self.concurrency),
+                )
+            self._wake_waiters()
+
+
+class RateLimiter:
+    """
+    Shared limiter state for every provider/model a workflow talks to.
+
+    Args:
+        limits: Limits keyed by "provider/model" or by "provider". The most
+                specific key wins.
+        default: The limit for models without an entry in `limits`.
+        retry_policy: How transient errors are retried.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RateLimit]] = None,
+        default: Optional[RateLimit] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.limits = dict(limits or {})
+        self.default = default or RateLimit()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retries = 0
+        self.throttled = 0
+        self._model_limiters: Dict[Tuple[str, str], ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter_for(self, agent: Agent) -> ModelLimiter:
+        """Returns the limiter for an agent's provider and model."""
+        key = (agent.provider, agent.model)
+        with self._lock:
+            if key not in self._model_limiters:
+                limit = self.limits.get(
+                    f"{agent.provider}/{agent.model}",
+                    self.limits.get(agent.provider, self.default),
+                )
+                self._model_limiters[key] = ModelLimiter(limit)
+            return self._model_limiters[key]
+
+    def record_throttle(self) -> None:
+        with self._lock:
+            self.throttled += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the retry and throttle counters."""
+        return {"retries": self.retries, "throttled": self.throttled}
+
+
+class RateLimitedAgentExecutor(BaseAgentExecutor):
+    """
+    Wraps another executor with rate limiting and retries.
+
+    Args:
+        executor: The executor that performs the calls.
+        limiter: The shared limiter state.
+    """
+
+    def __init__(self, executor: BaseAgentExecutor, limiter: RateLimiter):
+        self.executor = executor
+        self.limiter = limiter
+
+    def _handle_failure(
+        self, model_limiter: ModelLimiter, exc: Exception, attempt: int
+    ) -> float:
+        """
+        Releases the slot for a failed call and decides whether to retry.
+
+        Returns:
+            The delay before the next attempt. Re-raises `exc` if the error
+            is not retryable or the retries are exhausted.
+        """
+        classification = classify_error(exc)
+        model_limiter.release(classification.throttled, classification.retry_after)
+        if classification.throttled:
+            self.limiter.record_throttle()
+            increment("throttled")
+
+        policy = self.limiter.retry_policy
+        if not classification.retryable or attempt >= policy.max_retries:
+            raise exc
+        self.limiter.record_retry()
+        increment("retries")
+        return policy.delay(attempt, classification.retry_after)
+
+    def execute(self, agent: Agent, instruction: str) -> str:
+        model_limiter = self.limiter.limiter_for(agent)
+        tokens = estimate_tokens(agent, instruction)
+        attempt = 0
+        while True:
+            model_limiter.acquire(tokens)
+            try:
+                output = self.executor.execute(agent, instruction)
+            except Exception as exc:
+                time.sleep(self._handle_failure(model_limiter, exc, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                model_limiter.abandon()
+                raise
+            model_limiter.release()
+            return output
+
+    async def aexecute(self, agent: Agent, instruction: str) -> str:
+        model_limiter = self.limiter.limiter_for(agent)
+        tokens = estimate_tokens(agent, instruction)
+        attempt = 0
+        while True:
+            await model_limiter.aacquire(tokens)
+            try:
+                output = await self.executor.aexecute(agent, instruction)
+            except Exception as exc:
+                await asyncio.sleep(self._handle_failure(model_limiter, exc, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled, e.g. a losing hedge or a timed-out call
+                model_limiter.abandon()
+                raise
+            model_limiter.release()
+            return output
+
+    def stream(self, agent: Agent, instruction: str) -> Iterator[str]:
+        """Streams with limits applied; retries only before the first chunk."""
+        model_limiter = self.limiter.limiter_for(agent)
+        tokens = estimate_tokens(agent, instruction)
+        attempt = 0
+        while True:
+            model_limiter.acquire(tokens)
+            started = False
+            try:
+                for chunk in self.executor.stream(agent, instruction):
+                    started = True
+                    yield chunk
+            except Exception as exc:
+                if started:
+                    model_limiter.release()
+                    raise
+                time.sleep(self._handle_failure(model_limiter, exc, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # Closed by the consumer before the stream ended
+                model_limiter.abandon()
+                raise
+            model_limiter.release()
+            return
+
+    async def astream(self, agent: Agent, instruction: str) -> AsyncIterator[str]:
+        model_limiter = self.limiter.limiter_for(agent)
+        tokens = estimate_tokens(agent, instruction)
+        attempt = 0
+        while True:
+            await model_limiter.aacquire(tokens)
+            started = False
+            try:
+                async for chunk in self.executor.astream(agent, instruction):
+                    started = True
+                    yield chunk
+            except Exception as exc:
+                if started:
+                    model_limiter.release()
+                    raise
+                await asyncio.sleep(self._handle_failure(model_limiter, exc, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                model_limiter.abandon()
+                raise
+            model_limiter.release()
+            return
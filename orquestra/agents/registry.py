@@ -0,0 +1,165 @@
+import importlib
+import threading
+from importlib import metadata
+from typing import Dict, List, Optional, Type, Union
+
+from .base import BaseAgentExecutor
+
+# The entry point group third-party packages register executors under, e.g.
+#
+#     [project.entry-points."orquestra.executors"]
+#     mistral = "orquestra_mistral:MistralAgentExecutor"
+ENTRY_POINT_GROUP = "orquestra.executors"
+
+# Built-in providers, as import paths so their SDKs load only when used.
+BUILTIN_EXECUTORS: Dict[str, str] = {
+    "openai": "orquestra.agents.openai:OpenAIAgentExecutor",
+    "anthropic": "orquestra.agents.anthropic:AnthropicAgentExecutor",
+    "fake": "orquestra.agents.fake:FakeAgentExecutor",
+    "python": "orquestra.agents.python:PythonAgentExecutor",
+}
+
+ExecutorSpec = Union[str, Type[BaseAgentExecutor]]
+
+
+def load_object(import_path: str) -> object:
+    """
+    Imports an object from a "package.module:attribute" path.
+
+    Raises:
+        ValueError: If the path is malformed or the object cannot be found.
+    """
+    module_name, _, attribute = import_path.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(
+            f"Invalid import path '{import_path}'; expected 'module:attribute'."
+        )
+    try:
+        obj = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            obj = getattr(obj, part)
+    except (ImportError, AttributeError) as exc:
+        raise ValueError(f"Could not import '{import_path}': {exc}") from exc
+    return obj
+
+
+class ExecutorRegistry:
+    """
+    Maps provider names to executor classes, importing them on first use.
+
+    A provider is looked up, in order, among executors registered
+    explicitly, the built-in executors, and the `orquestra.executors` entry
+    points of installed packages. A provider name containing a colon is
+    treated as an import path, so `provider: "my_pkg.executors:MyExecutor"`
+    works without any registration.
+
+    Args:
+        executors: Extra providers, as classes or "module:Class" paths.
+        entry_points: Whether to look up installed entry points.
+    """
+
+    def __init__(
+        self,
+        executors: Optional[Dict[str, ExecutorSpec]] = None,
+        entry_points: bool = True,
+    ):
+        self._specs: Dict[str, ExecutorSpec] = {**BUILTIN_EXECUTORS}
+        self._specs.update(executors or {})
+        self._use_entry_points = entry_points
+        self._entry_points: Optional[Dict[str, metadata.EntryPoint]] = None
+        self._resolved: Dict[str, Type[BaseAgentExecutor]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, provider: str, executor: ExecutorSpec) -> None:
+        """Registers, or replaces, the executor for a provider."""
+        with self._lock:
+            self._specs[provider] = executor
+            self._resolved.pop(provider, None)
+
+    def _installed_entry_points(self) -> Dict[str, metadata.EntryPoint]:
+        # Scanning installed distributions is slow, so only do it once, and
+        # only when a provider is not found anywhere else.
+        if self._entry_points is None:
+            self._entry_points = {
+                ep.name: ep for ep in metadata.entry_points(group=ENTRY_POINT_GROUP)
+            }
+        return self._entry_points
+
+    def providers(self) -> List[str]:
+        """Returns the names of every known provider."""
+        names = set(self._specs)
+        if self._use_entry_points:
+            names.update(self._installed_entry_points())
+        return sorted(names)
+
+    def resolve(self, provider: str) -> Type[BaseAgentExecutor]:
+        """
+        Returns the executor class for a provider, importing it if needed.
+
+        Raises:
+            ValueError: If no executor is found for the provider, or it is
+                        not a BaseAgentExecutor subclass.
+        """
+        with self._lock:
+            if provider in self._resolved:
+                return self._resolved[provider]
+
+            spec = self._specs.get(provider)
+            if spec is None and ":" in provider:
+                spec = provider
+            if spec is None and self._use_entry_points:
+                entry_point = self._installed_entry_points().get(provider)
+                if entry_point is not None:
+                    spec = entry_point.value
+            if spec is None:
+                raise ValueError(f"No executor found for provider: {provider}")
+
+            executor_class = load_object(spec) if isinstance(spec, str) else spec
+            if not (
+                isinstance(executor_class, type)
+                and issubclass(executor_class, BaseAgentExecutor)
+            ):
+                raise ValueError(
+                    f"Executor for provider '{provider}' must be a "
+                    "BaseAgentExecutor subclass."
+                )
+            self._resolved[provider] = executor_class
+            return executor_class
+
+
+# The registry orchestrators use unless they are given their own.
+default_registry = ExecutorRegistry()
+
+
+class ExecutorPool:
+    """
+    One executor instance per provider, shared by every orchestrator that
+    uses the pool.
+
+    Executors hold the SDK clients, and with them the HTTP connection
+    pools, so sharing a pool across runs reuses warm connections.
+
+    Args:
+        registry: Resolves provider names to executor classes. Defaults to
+                  the shared registry.
+    """
+
+    def __init__(self, registry: Optional[ExecutorRegistry] = None):
+        self.registry = registry or default_registry
+        self.instances: Dict[str, BaseAgentExecutor] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> BaseAgentExecutor:
+        """Returns the provider's executor, creating it on first use."""
+        # Guard instantiation so concurrent callers share a single executor
+        with self._lock:
+            if provider not in self.instances:
+                self.instances[provider] = self.registry.resolve(provider)()
+            return self.instances[provider]
+
+    def shutdown(self) -> None:
+        """Releases the resources of every executor in the pool."""
+        with self._lock:
+            instances = list(self.instances.values())
+        for instance in instances:
+            instance.shutdown()
@@ -1,10 +1,342 @@
 # orquestra/cli/main.py
-def app():
+"""
+The `orquestra-cli` command.
+
+Heavy modules (the orchestrator, Jinja, provider SDKs) are imported inside
+the command functions, so `--help` and argument errors return immediately
+and a run only imports the SDKs of the providers it uses.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def _provider_limit(value: str) -> tuple:
+    """Parses a `provider=N` concurrency limit."""
+    provider, sep, limit = value.partition("=")
+    if not sep or not provider:
+        raise argparse.ArgumentTypeError(f"expected PROVIDER=N, got '{value}'")
+    try:
+        return provider, int(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid limit in '{value}'") from None
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    # Options shared by every subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("workflow", type=Path, help="Path to the workflow YAML file.")
+    common.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the compiled workflow cache and the response cache.",
+    )
+    common.add_argument(
+        "--stats",
+        type=Path,
+        metavar="FILE",
+        help="Task latency history: updated by `run`, used to start long chains "
+        "first and for `plan` estimates (default: CACHE_DIR/stats.json).",
+    )
+    common.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-phase timings as JSON to stderr.",
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="orquestra-cli", description="Orchestrate AI agents."
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    run = subparsers.add_parser(
+        "run", parents=[common], help="Run a workflow.", description="Run a workflow."
+    )
+    run.add_argument(
+        "--mode",
+        choices=("sequential", "parallel", "dataflow", "bulk"),
+        default="dataflow",
+        help="Execution mode (default: dataflow).",
+    )
+    run.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="Maximum number of concurrent agent calls (default: 8).",
+    )
+    run.add_argument(
+        "--provider-limit",
+        type=_provider_limit,
+        action="append",
+        default=[],
+        metavar="PROVIDER=N",
+        help="Maximum concurrent calls to a provider. May be repeated.",
+    )
+    run.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="SQLite file to checkpoint task outputs to.",
+    )
+    run.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip tasks whose outputs are already checkpointed.",
+    )
+    run.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the final context as JSON instead of progress messages.",
+    )
+    run.add_argument(
+        "--trace",
+        type=Path,
+        help="Write a Chrome trace of the run (open with ui.perfetto.dev).",
+    )
+    run.add_argument(
+        "--target",
+        action="append",
+        metavar="TASK",
+        help="Run only this task and the upstream tasks it needs. May be repeated.",
+    )
+    run.add_argument(
+        "--known-outputs",
+        type=Path,
+        metavar="FILE",
+        help="Reuse upstream outputs from the JSON context of an earlier "
+        "`run --json` instead of running those tasks. Needs --target.",
+    )
+    run.add_argument(
+        "--queue",
+        type=Path,
+        help="Publish agent calls to this SQLite queue for `worker` processes "
+        "instead of calling providers from this process.",
+    )
+    run.set_defaults(handler=_run)
+
+    plan = subparsers.add_parser(
+        "plan",
+        parents=[common],
+        help="Show a workflow's batches and critical path.",
+        description="Show a workflow's batches and critical path.",
+    )
+    plan.add_argument(
+        "--max-workers",
+        type=int,
+        help="Estimate the makespan for this many concurrent tasks "
+        "(default: unlimited).",
+    )
+    plan.add_argument("--json", action="store_true", help="Print the plan as JSON.")
+    plan.set_defaults(handler=_plan)
+
+    worker = subparsers.add_parser(
+        "worker",
+        help="Execute agent calls published to a queue by `run --queue`.",
+        description="Execute agent calls published to a queue by `run --queue`.",
+    )
+    worker.add_argument("queue", type=Path, help="Path to the SQLite queue.")
+    worker.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of calls executed at once (default: 4).",
+    )
+    worker.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=30.0,
+        help="Seconds before an unrenewed job is re-delivered (default: 30).",
+    )
+    worker.add_argument(
+        "--idle-timeout",
+        type=float,
+        help="Exit after this many seconds without a job.",
+    )
+    worker.set_defaults(handler=_worker)
+
+    return parser
+
+
+def _load(args: argparse.Namespace, timings: Dict[str, float]):
+    start = time.perf_counter()
+    from orquestra.parsers import WorkflowCache, parse_workflow_from_yaml
+
+    cache = WorkflowCache(args.cache_dir / "workflows") if args.cache_dir else None
+    workflow = parse_workflow_from_yaml(args.workflow, cache=cache)
+    timings["load"] = time.perf_counter() - start
+    return workflow
+
+
+def _stats_path(args: argparse.Namespace) -> Optional[Path]:
+    if args.stats:
+        return args.stats
+    return args.cache_dir / "stats.json" if args.cache_dir else None
+
+
+def _plan(args: argparse.Namespace, timings: Dict[str, float]) -> int:
+    workflow = _load(args, timings)
+
+    start = time.perf_counter()
+    from orquestra.core import LatencyStats, TaskGraph
+
+    # Tasks without history are estimated at the default of one second
+    estimates = LatencyStats(_stats_path(args)).estimate_workflow(workflow)
+    graph = TaskGraph(workflow.tasks)
+    batches = [[task.name for task in batch] for batch in graph.batches()]
+    critical_path = [task.name for task in graph.critical_path(estimates)]
+    makespan = graph.estimate_makespan(estimates, args.max_workers)
+    timings["plan"] = time.perf_counter() - start
+
+    if args.json:
+        plan = {
+            "batches": batches,
+            "critical_path": critical_path,
+            "estimated_makespan": makespan,
+            "estimates": estimates,
+        }
+        print(json.dumps(plan, indent=2))
+        return 0
+
+    print(f"Workflow: '{workflow.name}' ({len(graph)} tasks)")
+    for i, batch in enumerate(batches):
+        print(f"--> Batch {i + 1}: {', '.join(batch)}")
+    print(f"Critical path ({len(critical_path)} tasks): {' -> '.join(critical_path)}")
+    workers = args.max_workers or "unlimited"
+    print(f"Estimated makespan: {makespan:.2f}s ({workers} workers)")
+    return 0
+
+
+def _run(args: argparse.Namespace, timings: Dict[str, float]) -> int:
+    if args.resume and args.checkpoint is None and args.cache_dir is None:
+        raise ValueError("--resume needs --checkpoint or --cache-dir.")
+    if args.known_outputs and not args.target:
+        raise ValueError("--known-outputs needs --target.")
+    workflow = _load(args, timings)
+
+    known_outputs = None
+    if args.known_outputs:
+        saved = json.loads(args.known_outputs.read_text(encoding="utf-8"))
+        known_outputs = {
+            name: entry["output"] for name, entry in saved.get("tasks", {}).items()
+        }
+
+    start = time.perf_counter()
+    from orquestra.agents.cache import SQLiteResponseCache
+    from orquestra.core import CheckpointStore, LatencyStats, Orchestrator
+    from orquestra.tracing import (
+        ChromeTraceExporter,
+        ConsoleExporter,
+        InMemoryExporter,
+        Tracer,
+    )
+
+    spans = InMemoryExporter()
+    exporters = [spans] if args.json else [spans, ConsoleExporter()]
+    if args.trace:
+        exporters.append(ChromeTraceExporter(args.trace))
+    tracer = Tracer(exporters)
+
+    response_cache = None
+    checkpoint_path = args.checkpoint
+    if args.cache_dir:
+        response_cache = SQLiteResponseCache(args.cache_dir / "responses.db")
+        checkpoint_path = checkpoint_path or args.cache_dir / "checkpoints.db"
+    checkpoint = CheckpointStore(checkpoint_path) if checkpoint_path else None
+
+    options = dict(
+        mode=args.mode,
+        max_workers=args.max_workers,
+        provider_limits=dict(args.provider_limit),
+        response_cache=response_cache,
+        checkpoint=checkpoint,
+        resume=args.resume,
+        tracer=tracer,
+        latency_stats=LatencyStats(_stats_path(args)),
+    )
+    queue = None
+    if args.queue:
+        from orquestra.distributed import Coordinator, SQLiteTaskQueue
+
+        queue = SQLiteTaskQueue(args.queue)
+        orchestrator = Coordinator(workflow, queue, **options)
+    else:
+        orchestrator = Orchestrator(workflow, **options)
+    timings["setup"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        context = orchestrator.run(args.target, known_outputs)
+    finally:
+        timings["run"] = time.perf_counter() - start
+        tracer.shutdown()
+        if queue is not None:
+            queue.close()
+        if checkpoint is not None:
+            checkpoint.close()
+        if response_cache is not None:
+            response_cache.close()
+        _add_span_timings(timings, spans.spans)
+
+    if args.json:
+        print(json.dumps(context, indent=2, default=str))
+    return 0
+
+
+def _worker(args: argparse.Namespace, timings: Dict[str, float]) -> int:
+    from orquestra.distributed import SQLiteTaskQueue, Worker
+
+    queue = SQLiteTaskQueue(args.queue)
+    worker = Worker(
+        queue, concurrency=args.concurrency, lease_seconds=args.lease_seconds
+    )
+    try:
+        worker.run(idle_timeout=args.idle_timeout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.close()
+    print(
+        f"Worker {worker.worker_id} processed {worker.processed} jobs "
+        f"({worker.failed} failed)."
+    )
+    return 0
+
+
+def _add_span_timings(timings: Dict[str, float], spans: List[Any]) -> None:
+    """Sums the time spent in each kind of span below the task level."""
+    for span in spans:
+        if span.kind in ("render", "queue", "call", "executor"):
+            key = f"{span.kind}_total"
+            timings[key] = timings.get(key, 0.0) + (span.duration or 0.0)
+
+
+def app(argv: Optional[List[str]] = None) -> int:
     """
     Main entrypoint for the Orquestra CLI.
     """
-    print("Welcome to Orquestra!")
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 0
+
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    try:
+        return args.handler(args, timings)
+    except (OSError, ValueError) as exc:
+        # Covers missing files, invalid workflows (pydantic's ValidationError
+        # is a ValueError) and dependency cycles
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        timings["total"] = time.perf_counter() - start
+        if getattr(args, "profile", False):
+            print(json.dumps({"timings": timings}, indent=2), file=sys.stderr)
 
 
 if __name__ == "__main__":
-    app()
+    sys.exit(app())
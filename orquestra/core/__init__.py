@@ -1,5 +1,29 @@
+from .artifacts import ArtifactStore, SpilledOutput
+from .checkpoint import CheckpointStore
 from .orchestrator import Orchestrator
-from .scheduler import resolve_task_order
-from .templating import render_template
+from .runner import RunResult, WorkflowRunner
+from .scheduler import (
+    DataflowScheduler,
+    FairShareLimiter,
+    TaskGraph,
+    resolve_task_order,
+)
+from .stats import LatencyStats
+from .templating import clear_template_cache, render_template, template_cache_info
 
-__all__ = ["Orchestrator", "resolve_task_order", "render_template"]
+__all__ = [
+    "ArtifactStore",
+    "CheckpointStore",
+    "DataflowScheduler",
+    "FairShareLimiter",
+    "LatencyStats",
+    "Orchestrator",
+    "RunResult",
+    "SpilledOutput",
+    "TaskGraph",
+    "WorkflowRunner",
+    "clear_template_cache",
+    "render_template",
+    "resolve_task_order",
+    "template_cache_info",
+]
@@ -0,0 +1,154 @@
+import hashlib
+import mmap
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+# Outputs at least this large (in UTF-8 bytes) are spilled to disk.
+DEFAULT_SPILL_THRESHOLD = 64 * 1024
+
+
+class SpilledOutput:
+    """
+    A task output stored in a file instead of in memory.
+
+    It stands in for the output's text: rendering, slicing, `in`, iteration,
+    concatenation and str methods (`.strip()`, `.split()`...) all act on the
+    decoded text, so templates and filters behave the same whether or not
+    an output was spilled. The file is read through a memory map, which
+    leaves the page cache, not the Python heap, holding the bytes between
+    reads.
+    """
+
+    def __init__(self, path: Path, size: int):
+        self.path = path
+        self.size = size
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> bytes:
+        """Returns a byte range of the output."""
+        if self.size == 0:
+            return b""
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[start:end]
+
+    def __str__(self) -> str:
+        return self.read().decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __getitem__(self, key: Union[int, slice]) -> str:
+        return str(self)[key]
+
+    def __contains__(self, item: str) -> bool:
+        return item in str(self)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(str(self))
+
+    def __add__(self, other: str) -> str:
+        return str(self) + other
+
+    def __radd__(self, other: str) -> str:
+        return other + str(self)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes a SpilledOutput lacks, i.e. str methods.
+        # Private names are refused so copying and pickling, which look them
+        # up before `path` is set, cannot recurse.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(str(self), name)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SpilledOutput):
+            return self.path == other.path
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __repr__(self) -> str:
+        return f"SpilledOutput({str(self.path)!r}, size={self.size})"
+
+
+class ArtifactStore:
+    """
+    Holds task outputs, spilling large string outputs to disk.
+
+    Outputs are stored under keys chosen by the caller; orchestrators
+    sharing a store prefix them with a key of their own run. File names are
+    unique per write, so stores sharing a directory never collide either.
+
+    Args:
+        directory: Where spilled outputs are written. Defaults to a private
+                   temporary directory, removed by `close` or when the
+                   store is garbage collected.
+        spill_threshold: The size in bytes from which string outputs are
+                         spilled. Smaller outputs and non-string outputs
+                         (e.g. foreach lists) stay in memory.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+    ):
+        self._owns_directory = directory is None
+        self.directory = Path(directory or tempfile.mkdtemp(prefix="orquestra-"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._owns_directory:
+            self._cleanup = weakref.finalize(
+                self, shutil.rmtree, self.directory, ignore_errors=True
+            )
+        self.spill_threshold = spill_threshold
+        self.spilled: Dict[str, SpilledOutput] = {}
+        self.spilled_bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, name: str, output: Any) -> Any:
+        """
+        Stores a task's output under a key, replacing any earlier output.
+
+        Returns:
+            The value to place in the run context: the output itself, or a
+            `SpilledOutput` standing in for it.
+        """
+        if not isinstance(output, str):
+            return output
+        data = output.encode("utf-8")
+        if len(data) < self.spill_threshold:
+            return output
+
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+        path = self.directory / f"{digest}-{uuid.uuid4().hex[:8]}.txt"
+        path.write_bytes(data)
+        spilled = SpilledOutput(path, len(data))
+        with self._lock:
+            replaced = self.spilled.get(name)
+            self.spilled[name] = spilled
+            self.spilled_bytes += len(data)
+        if replaced is not None:
+            replaced.path.unlink(missing_ok=True)
+        return spilled
+
+    def release(self, name: str) -> None:
+        """Deletes a task's spilled output, if it has one."""
+        with self._lock:
+            spilled = self.spilled.pop(name, None)
+        if spilled is not None:
+            spilled.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Deletes every spilled output."""
+        for name in list(self.spilled):
+            self.release(name)
+        if self._owns_directory:
+            self._cleanup()
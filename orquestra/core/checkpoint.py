@@ -0,0 +1,168 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Union
+
+from orquestra.models import Agent, Task
+
+
+class Checkpoint(NamedTuple):
+    """A task output persisted by a `CheckpointStore`."""
+
+    fingerprint: str
+    output: Any
+    completed_at: float
+
+
+def hash_output(output: Any) -> str:
+    """Returns a stable SHA-256 hash of a task output."""
+    payload = json.dumps(output, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def task_fingerprint(
+    task: Task,
+    agent: Agent,
+    rendered_instruction: str,
+    upstream_outputs: Dict[str, Any],
+) -> str:
+    """
+    Fingerprints everything that determines a task's output.
+
+    Args:
+        task: The task being fingerprinted.
+        agent: The agent the task runs on.
+        rendered_instruction: The instruction after templating.
+        upstream_outputs: The outputs of the task's dependencies, by name.
+
+    Returns:
+        A SHA-256 hex digest. If it matches the fingerprint stored with a
+        checkpoint, the checkpointed output can be reused.
+    """
+    payload = json.dumps(
+        {
+            "provider": agent.provider,
+            "model": agent.model,
+            "params": agent.params,
+            "instruction": rendered_instruction,
+            "inputs": task.inputs,
+            "upstream": {
+                name: hash_output(output)
+                for name, output in sorted(upstream_outputs.items())
+            },
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Durable storage for completed task outputs, backed by SQLite.
+
+    Outputs are stored per workflow name and task name, alongside the
+    task's fingerprint, so a later run can resume or re-execute only the
+    tasks that changed. The store also records the provider batch jobs of
+    bulk runs, so a resumed run polls them instead of submitting again.
+
+    Args:
+        path: The database file. Parent directories are created if needed.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " workflow TEXT NOT NULL,"
+                " task TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " output TEXT NOT NULL,"
+                " completed_at REAL NOT NULL,"
+                " PRIMARY KEY (workflow, task))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS batch_jobs ("
+                " workflow TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " batch_id TEXT NOT NULL,"
+                " submitted_at REAL NOT NULL,"
+                " PRIMARY KEY (workflow, key))"
+            )
+
+    def save(self, workflow: str, task: str, fingerprint: str, output: Any) -> None:
+        """Persists a task's output, replacing any earlier checkpoint."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints"
+                " (workflow, task, fingerprint, output, completed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (workflow, task, fingerprint, json.dumps(output), time.time()),
+            )
+
+    def get(self, workflow: str, task: str) -> Optional[Checkpoint]:
+        """Returns the checkpoint for a task, or None if there is none."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, output, completed_at FROM checkpoints"
+                " WHERE workflow = ? AND task = ?",
+                (workflow, task),
+            ).fetchone()
+        if row is None:
+            return None
+        return Checkpoint(row[0], json.loads(row[1]), row[2])
+
+    def load(self, workflow: str) -> Dict[str, Checkpoint]:
+        """Returns every checkpoint stored for a workflow, by task name."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task, fingerprint, output, completed_at FROM checkpoints"
+                " WHERE workflow = ?",
+                (workflow,),
+            ).fetchall()
+        return {row[0]: Checkpoint(row[1], json.loads(row[2]), row[3]) for row in rows}
+
+    def clear(self, workflow: str) -> None:
+        """Removes every checkpoint stored for a workflow."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE workflow = ?", (workflow,)
+            )
+            self._conn.execute("DELETE FROM batch_jobs WHERE workflow = ?", (workflow,))
+
+    def save_batch(self, workflow: str, key: str, batch_id: str) -> None:
+        """Records the provider batch job submitted for a group of requests."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO batch_jobs"
+                " (workflow, key, batch_id, submitted_at) VALUES (?, ?, ?, ?)",
+                (workflow, key, batch_id, time.time()),
+            )
+
+    def get_batch(self, workflow: str, key: str) -> Optional[str]:
+        """Returns the batch job recorded for a group of requests, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT batch_id FROM batch_jobs WHERE workflow = ? AND key = ?",
+                (workflow, key),
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def delete_batch(self, workflow: str, key: str) -> None:
+        """Forgets a batch job whose results have been collected."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM batch_jobs WHERE workflow = ? AND key = ?",
+                (workflow, key),
+            )
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        self._conn.close()
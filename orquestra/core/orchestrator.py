@@ -1,74 +1,1292 @@
-from typing import Any, Dict, Type
+import asyncio
+import contextlib
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
-from orquestra.agents.anthropic import AnthropicAgentExecutor
-from orquestra.agents.base import BaseAgentExecutor
-from orquestra.agents.openai import OpenAIAgentExecutor
-from orquestra.models import Agent, Workflow
+from orquestra.agents.base import (
+    BaseAgentExecutor,
+    BatchCallError,
+    BatchRequest,
+    BatchResult,
+    join_chunks,
+)
+from orquestra.agents.cache import (
+    BaseResponseCache,
+    CachingAgentExecutor,
+    make_cache_key,
+)
+from orquestra.agents.coalesce import CoalescingAgentExecutor, SingleFlight
+from orquestra.agents.hedging import Hedger, HedgingAgentExecutor
+from orquestra.agents.prompts import PrefixDetector
+from orquestra.agents.ratelimit import RateLimitedAgentExecutor, RateLimiter
+from orquestra.agents.registry import ExecutorPool, ExecutorRegistry
+from orquestra.models import Agent, Task, Workflow
+from orquestra.tracing import ConsoleExporter, Span, Tracer, annotate
 
-from .scheduler import resolve_task_order
-from .templating import render_template
+from .artifacts import ArtifactStore, SpilledOutput
+from .checkpoint import CheckpointStore, task_fingerprint
+from .scheduler import DataflowScheduler, TaskGraph
+from .stats import LatencyStats
+from .templating import evaluate_expression, find_task_references, render_template
+
+# Supported execution modes for `Orchestrator.run`.
+EXECUTION_MODES = ("sequential", "parallel", "dataflow", "bulk")
+
+
+class PreparedTask(NamedTuple):
+    """
+    A task whose agent is resolved and whose instruction is rendered.
+
+    For `foreach` tasks, `items` holds one rendered instruction per item
+    (or chunk of items) and `instruction` is unused. `span` is the task's
+    tracing span, started when the task is dispatched.
+    """
+
+    task: Task
+    agent: Agent
+    instruction: str
+    fingerprint: Optional[str]
+    items: Optional[List[str]] = None
+    span: Optional[Span] = None
+
+
+class SubmittedBatch(NamedTuple):
+    """
+    A provider batch in flight in the "bulk" mode. `key` identifies its
+    requests in the checkpoint store; `span` traces it until it ends.
+    """
+
+    executor: BaseAgentExecutor
+    requests: List[BatchRequest]
+    batch_id: str
+    key: str
+    span: Span
+
+
+def _resolve_foreach_items(task: Task, render_context: Dict[str, Any]) -> List[Any]:
+    """
+    Resolves the list a `foreach` task iterates over.
+
+    Expressions may evaluate to a list, or to a string holding a JSON array
+    or one item per line, which is what upstream agents usually produce.
+    """
+    if isinstance(task.foreach, list):
+        return task.foreach
+
+    value = evaluate_expression(task.foreach, render_context)
+    if isinstance(value, SpilledOutput):
+        value = str(value)
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            value = [line for line in value.splitlines() if line.strip()]
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(
+            f"foreach of task '{task.name}' must resolve to a list, "
+            f"got {type(value).__name__}."
+        )
+    return list(value)
+
+
+def _finish_warm_up(warm_up: Optional[Future]) -> None:
+    """Lets calls waiting on a prompt-cache warm-up go ahead."""
+    if warm_up is not None and not warm_up.done():
+        warm_up.set_result(None)
 
 
 class Orchestrator:
     """
     Manages the execution of a workflow.
+
+    Args:
+        workflow: The workflow to execute.
+        mode: "sequential" runs tasks one at a time; "parallel" runs the
+              tasks of each batch concurrently on a thread pool; "dataflow"
+              starts each task as soon as its own dependencies finish;
+              "bulk" sends each batch's calls through the providers' batch
+              APIs, one submission per provider and model, and waits for
+              them. Batch APIs are cheaper but may take hours; a resumed
+              run polls the batches it already submitted. Providers
+              without a batch API are called as in "parallel". Batched
+              calls are not retried, hedged, rate limited or streamed,
+              and do not fall back to other agents.
+        max_workers: The global number of worker threads in the concurrent
+                     modes, and the cap on in-flight calls, `foreach` item
+                     calls included, in both `run` and `arun`.
+        provider_limits: Optional per-provider caps on in-flight calls,
+                         e.g. {"openai": 8, "anthropic": 4}.
+        response_cache: Optional cache backend. When set, responses for tasks
+                        with `cache` enabled are served from and stored in it.
+        checkpoint: Optional durable store. Each task's output is saved to it
+                    as soon as the task completes.
+        resume: Skip tasks that already have a checkpointed output.
+        incremental: Skip tasks whose checkpointed fingerprint (instruction,
+                     agent/model and upstream outputs) is unchanged, and
+                     re-run only the ones that changed.
+        on_chunk: Optional callback receiving `(task_name, chunk)` for every
+                  streamed output chunk. Setting it switches execution to
+                  the executors' streaming methods and records
+                  time-to-first-token and throughput in `task_metrics`. In
+                  the threaded modes it is called from worker threads.
+        rate_limiter: Optional per-provider/per-model rate limiter. When set,
+                      every call is throttled to its quotas and transient
+                      errors (429s, 5xx) are retried with backoff.
+        tracer: Receives spans for the workflow, each batch, each task and
+                each call, including render, queueing and executor set-up
+                time. Defaults to a tracer that only prints progress; pass
+                `Tracer([])` to run silently.
+        executor_registry: Resolves provider names to executor classes.
+                           Defaults to the shared registry, which imports
+                           provider SDKs only when a workflow uses them.
+        executor_pool: Executor instances to share with other orchestrators,
+                       so concurrent runs reuse one client (and connection
+                       pool) per provider. Takes precedence over
+                       `executor_registry`. Whoever creates a shared pool
+                       shuts it down; without one, the orchestrator uses
+                       its own and shuts it down after every run, which
+                       stops e.g. the "python" provider's processes.
+        call_gate: Optional callable returning a context manager that is
+                   held for the duration of each agent call, e.g. a slot in
+                   a limit shared by many runs. Only supported by `run`.
+        artifact_store: Optional store that spills large outputs to disk.
+                        Templates read spilled outputs transparently. It
+                        may be shared by several orchestrators; each
+                        deletes its own files when its run ends.
+        prompt_caching: Detect long rendered prefixes shared by calls to the
+                        same model and mark them, so executors can structure
+                        requests for provider-side prompt caching. The first
+                        call with a new prefix is sent alone to write the
+                        cache, and calls sharing it wait for its answer.
+                        Tasks can opt out with `prompt_cache=False`.
+        hedger: Optional shared latency statistics. When set, a call slower
+                than the learned latency percentile of its model gets a
+                duplicate request and the first to finish wins. Deadlines
+                (`timeout` on tasks and agents) apply either way, and a call
+                that times out or fails moves on to the agent's `fallbacks`.
+        single_flight: Optional table of calls in flight. When set, identical
+                       concurrent calls (same provider, model, parameters
+                       and instruction) are made once and share the output.
+                       Share one table between orchestrators to coalesce
+                       calls across runs.
+        latency_stats: Optional task latency history. Completed tasks are
+                       recorded in it (and it is saved after each run), and
+                       ready tasks are started longest remaining path first,
+                       weighing each task by its expected latency. Without
+                       it every task weighs the same.
+        batch_poll_interval: Seconds between polls of submitted batches in
+                             the "bulk" mode.
     """
 
-    def __init__(self, workflow: Workflow):
+    def __init__(
+        self,
+        workflow: Workflow,
+        mode: str = "sequential",
+        max_workers: int = 8,
+        provider_limits: Optional[Dict[str, int]] = None,
+        response_cache: Optional[BaseResponseCache] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        resume: bool = False,
+        incremental: bool = False,
+        on_chunk: Optional[Callable[[str, str], None]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        tracer: Optional[Tracer] = None,
+        executor_registry: Optional[ExecutorRegistry] = None,
+        executor_pool: Optional[ExecutorPool] = None,
+        call_gate: Optional[Callable[[Agent], ContextManager[Any]]] = None,
+        artifact_store: Optional[ArtifactStore] = None,
+        prompt_caching: bool = True,
+        hedger: Optional[Hedger] = None,
+        single_flight: Optional[SingleFlight] = None,
+        latency_stats: Optional[LatencyStats] = None,
+        batch_poll_interval: float = 30.0,
+    ):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(
+                f"Unknown execution mode '{mode}'. "
+                f"Expected one of: {', '.join(EXECUTION_MODES)}."
+            )
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if (resume or incremental) and checkpoint is None:
+            raise ValueError("resume and incremental require a checkpoint store.")
+
         self.workflow = workflow
+        self.mode = mode
+        self.max_workers = max_workers
+        self.response_cache = response_cache
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.incremental = incremental
+        self.on_chunk = on_chunk
+        self.call_gate = call_gate
+        self.artifact_store = artifact_store
+        # Keeps this orchestrator's outputs apart from others in a shared store
+        self._run_key = uuid.uuid4().hex
+        self.rate_limiter = rate_limiter
+        self.hedger = hedger
+        self.single_flight = single_flight
+        self.latency_stats = latency_stats
+        self.batch_poll_interval = batch_poll_interval
+        self.prefix_detector = PrefixDetector() if prompt_caching else None
+        self.tracer = tracer if tracer is not None else Tracer([ConsoleExporter()])
         self.context: Dict[str, Any] = {"tasks": {}}
 
-        # Registry of executor *classes*, not instances
-        self.executor_classes: Dict[str, Type[BaseAgentExecutor]] = {
-            "openai": OpenAIAgentExecutor,
-            "anthropic": AnthropicAgentExecutor,
-        }
-        # Cache for instantiated executors (for lazy loading)
-        self.executor_instances: Dict[str, BaseAgentExecutor] = {}
+        # Per-task streaming metrics, keyed by task name
+        self.task_metrics: Dict[str, Dict[str, float]] = {}
+        self._metrics_lock = threading.Lock()
+        # When each running task's first call started, by task span
+        self._call_starts: Dict[Span, float] = {}
+
+        # Instantiated executors, one per provider, created on first use
+        self._owns_executor_pool = executor_pool is None
+        self.executor_pool = executor_pool or ExecutorPool(executor_registry)
+        self.executor_registry = self.executor_pool.registry
+        self.executor_instances = self.executor_pool.instances
+
+        # Bounds every call in flight, so foreach items, which run on pools
+        # of their own, still respect `max_workers`
+        self._call_slots = threading.BoundedSemaphore(max_workers)
+
+        # Per-provider semaphores bounding concurrent calls to each provider
+        self.provider_limits: Dict[str, int] = dict(provider_limits or {})
+        self._provider_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        for provider, limit in self.provider_limits.items():
+            if limit < 1:
+                raise ValueError(
+                    f"Concurrency limit for provider '{provider}' must be at least 1."
+                )
+            self._provider_semaphores[provider] = threading.BoundedSemaphore(limit)
 
         self.agent_map: Dict[str, Agent] = {
             agent.name: agent for agent in self.workflow.agents
         }
+        for agent in self.workflow.agents:
+            for fallback in agent.fallbacks:
+                if fallback not in self.agent_map:
+                    raise ValueError(
+                        f"Fallback agent '{fallback}' of agent '{agent.name}' "
+                        "is not defined."
+                    )
+
+        # The span new task spans are attached to: the workflow or a batch
+        self._parent_span: Optional[Span] = None
+
+        # Liveness of outputs, tracked only when the final outputs are declared
+        self._task_map: Dict[str, Task] = {
+            task.name: task for task in self.workflow.tasks
+        }
+        task_names = set(self._task_map)
+        for name in self.workflow.outputs or []:
+            if name not in task_names:
+                raise ValueError(f"Workflow output '{name}' is not a task.")
+        self._reads: Dict[str, Set[str]] = {}
+        self._consumers: Dict[str, Set[str]] = {}
+        # Outputs never dropped: the declared outputs and any run's targets
+        self._retained: Set[str] = set(self.workflow.outputs or [])
+        if self.workflow.outputs is not None:
+            self._plan_liveness()
+
+    def _task_reads(self, task: Task, names: Set[str]) -> Set[str]:
+        """
+        Returns the tasks whose outputs a task reads.
+
+        A task reads its dependencies (their outputs feed its checkpoint
+        fingerprint) and every task its instruction or `foreach` expression
+        references, whether or not it is listed in `depends_on`. A template
+        that reads `tasks` dynamically, or a name that is no task, is
+        assumed to read every upstream task: only those are sure to have
+        finished when it runs.
+        """
+        references = [find_task_references(task.instruction)]
+        if isinstance(task.foreach, str):
+            references.append(find_task_references(task.foreach, expression=True))
+
+        if any(found is None for found in references) or not set().union(
+            *references
+        ) <= set(self._task_map):
+            reads = self._ancestors(task) & names
+        else:
+            reads = set(task.depends_on).union(*references) & names
+        reads.discard(task.name)
+        return reads
+
+    def _ancestors(self, task: Task) -> Set[str]:
+        """Returns every task a task depends on, directly or transitively."""
+        ancestors: Set[str] = set()
+        pending = list(task.depends_on)
+        while pending:
+            name = pending.pop()
+            if name in ancestors or name not in self._task_map:
+                continue
+            ancestors.add(name)
+            pending.extend(self._task_map[name].depends_on)
+        return ancestors
+
+    def _plan_liveness(self) -> None:
+        """Works out which tasks read each task's output."""
+        names = {task.name for task in self.workflow.tasks}
+        self._consumers = {name: set() for name in names}
+        for task in self.workflow.tasks:
+            self._reads[task.name] = self._task_reads(task, names)
+            for producer in self._reads[task.name]:
+                self._consumers[producer].add(task.name)
+
+    def _plan_graph(
+        self,
+        targets: Optional[List[str]] = None,
+        known_outputs: Optional[Dict[str, Any]] = None,
+    ) -> TaskGraph:
+        """
+        Builds the graph of tasks a run executes.
+
+        Without targets, that is every task. With targets, it is the targets
+        and, transitively, every task they read that has no known output.
+        Reads implied only by templates count as dependencies, so a task is
+        never scheduled before an output its instruction references.
+
+        Args:
+            targets: The tasks whose outputs are wanted.
+            known_outputs: Outputs of upstream tasks, by name, placed in the
+                           context instead of running those tasks. Targets
+                           always run.
+
+        Raises:
+            ValueError: If a target or known output names no task.
+        """
+        if targets is None:
+            return TaskGraph(self.workflow.tasks)
+
+        task_map = {task.name: task for task in self.workflow.tasks}
+        for name in list(targets) + list(known_outputs or {}):
+            if name not in task_map:
+                raise ValueError(f"Task '{name}' is not in the workflow.")
+        known = {
+            name: output
+            for name, output in (known_outputs or {}).items()
+            if name not in targets
+        }
+
+        # 1. Walk back from the targets, stopping at known outputs
+        names = set(task_map)
+        reads: Dict[str, Set[str]] = {}
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name in reads or name in known:
+                continue
+            reads[name] = self._task_reads(task_map[name], names)
+            pending.extend(reads[name])
+
+        # 2. Seed the context with the known outputs the selected tasks read
+        for name in sorted(set().union(*reads.values()) & known.keys()):
+            self.context["tasks"][name] = {"output": known[name]}
+
+        self._retained.update(targets)
+        dependencies = {
+            name: sorted(found - known.keys()) for name, found in reads.items()
+        }
+        return TaskGraph([task_map[name] for name in reads], dependencies)
+
+    def _priorities(self, graph: TaskGraph) -> Dict[str, float]:
+        """Ranks tasks by their expected remaining path (HEFT's upward rank)."""
+        durations = None
+        if self.latency_stats is not None:
+            durations = self.latency_stats.estimate_workflow(self.workflow)
+        ranks = graph.upward_ranks(durations)
+        return {task.name: rank for task, rank in zip(graph.tasks, ranks)}
+
+    def _mark_call_start(self, prepared: PreparedTask) -> None:
+        """
+        Notes when a task's first call starts, past the pool and the provider
+        slots, so queueing is not recorded as the task's latency.
+        """
+        if self.latency_stats is not None and prepared.span is not None:
+            with self._metrics_lock:
+                self._call_starts.setdefault(prepared.span, time.time())
+
+    def _record_latency(self, prepared: PreparedTask, task_output: Any) -> None:
+        if self.latency_stats is not None:
+            with self._metrics_lock:
+                started = self._call_starts.pop(prepared.span, prepared.span.start)
+            self.latency_stats.record(
+                self.workflow.name,
+                prepared.task,
+                prepared.agent,
+                time.time() - started,
+                task_output,
+            )
+
+    def _release_output(self, name: str) -> None:
+        """Drops an output once no remaining task reads it."""
+        if self._consumers[name] or name in self._retained:
+            return
+        if self.context["tasks"].pop(name, None) is not None:
+            if self.artifact_store is not None:
+                self.artifact_store.release(self._artifact_key(name))
+
+    def _finalize_context(self) -> Dict[str, Any]:
+        """Reads spilled outputs back in for the returned context."""
+        for entry in self.context["tasks"].values():
+            if isinstance(entry.get("output"), SpilledOutput):
+                entry["output"] = str(entry["output"])
+        return self.context
+
+    def _artifact_key(self, name: str) -> str:
+        """Names a task's output in the artifact store, which runs may share."""
+        return f"{self._run_key}/{name}"
+
+    def _end_run(self) -> None:
+        """Saves the latency history and frees what the run no longer needs."""
+        if self.latency_stats is not None:
+            self.latency_stats.save()
+        if self._owns_executor_pool:
+            self.executor_pool.shutdown()
+        # Spilled outputs were read back into the returned context, or the
+        # run failed; either way their files are no longer needed
+        if self.artifact_store is not None:
+            for name in self.context["tasks"]:
+                self.artifact_store.release(self._artifact_key(name))
 
     def _get_executor(self, agent: Agent) -> BaseAgentExecutor:
         """Finds or creates the appropriate executor for a given agent."""
-        provider = agent.provider
+        # Check if we already have an instance in the pool
+        instance = self.executor_instances.get(agent.provider)
+        if instance is not None:
+            return instance
 
-        # Check if we already have an instance in our cache
-        if provider in self.executor_instances:
-            return self.executor_instances[provider]
+        # If not, the pool imports the class and instantiates it once, even
+        # when several tasks ask at the same time
+        with self.tracer.span(agent.provider, "executor"):
+            return self.executor_pool.get(agent.provider)
 
-        # If not, find the class and create a new instance
-        executor_class = self.executor_classes.get(provider)
-        if not executor_class:
-            raise ValueError(f"No executor found for provider: {provider}")
+    def _resolve_executor(self, task: Task, agent: Agent) -> BaseAgentExecutor:
+        """
+        Returns the executor for a task, wrapped in the rate limiter, the
+        deadline and hedging, call coalescing and the response cache if they
+        are enabled. Cache hits skip the limiter; hedged duplicates go
+        through it.
+        """
+        executor = self._get_executor(agent)
+        if self.rate_limiter is not None:
+            executor = RateLimitedAgentExecutor(executor, self.rate_limiter)
+        timeout = task.timeout or agent.timeout
+        if self.hedger is not None or timeout is not None:
+            executor = HedgingAgentExecutor(executor, self.hedger, timeout)
+        if self.single_flight is not None:
+            executor = CoalescingAgentExecutor(executor, self.single_flight)
+        if self.response_cache is not None and task.cache:
+            return CachingAgentExecutor(executor, self.response_cache)
+        return executor
 
-        # Instantiate, cache it, and then return it
-        instance = executor_class()
-        self.executor_instances[provider] = instance
-        return instance
+    def _prepare_task(self, task: Task) -> PreparedTask:
+        """
+        Resolves the agent for a task and renders its instruction.
 
-    def run(self) -> Dict[str, Any]:
-        execution_plan = resolve_task_order(self.workflow.tasks)
+        Instructions can reference upstream outputs through `tasks` and the
+        task's own `inputs`. A `foreach` task is expanded here into one
+        rendered instruction per item, with the item bound to `item`.
+        """
+        render_context = {**self.context, "inputs": task.inputs}
+        agent_model = self.agent_map[task.agent]
 
-        print(f"\nExecuting workflow: '{self.workflow.name}'")
-        for i, batch in enumerate(execution_plan):
-            print(f"--> Running Batch {i+1}...")
-            for task in batch:
-                rendered_instruction = render_template(task.instruction, self.context)
-                print(f"    - Executing task '{task.name}'...")
+        items = None
+        if task.foreach is None:
+            rendered_instruction = render_template(task.instruction, render_context)
+            if self.prefix_detector is not None and task.prompt_cache:
+                (rendered_instruction,) = self.prefix_detector.tag(
+                    agent_model.provider, agent_model.model, [rendered_instruction]
+                )
+        else:
+            values = _resolve_foreach_items(task, render_context)
+            if task.chunk_size > 1:
+                values = [
+                    values[i : i + task.chunk_size]
+                    for i in range(0, len(values), task.chunk_size)
+                ]
+            items = [
+                render_template(
+                    task.instruction, {**render_context, "item": value, "index": i}
+                )
+                for i, value in enumerate(values)
+            ]
+            if self.prefix_detector is not None and task.prompt_cache:
+                items = self.prefix_detector.tag(
+                    agent_model.provider, agent_model.model, items
+                )
+            rendered_instruction = json.dumps(items)
 
-                # 1. Find the agent model and its executor
-                agent_model = self.agent_map[task.agent]
-                executor = self._get_executor(agent_model)
+        fingerprint = None
+        if self.checkpoint is not None:
+            upstream_outputs = {
+                dep: self.context["tasks"][dep]["output"] for dep in task.depends_on
+            }
+            fingerprint = task_fingerprint(
+                task, agent_model, rendered_instruction, upstream_outputs
+            )
+        return PreparedTask(task, agent_model, rendered_instruction, fingerprint, items)
 
-                # 2. Execute the task
-                task_output = executor.execute(agent_model, rendered_instruction)
+    def _foreach_calls(self, prepared: PreparedTask) -> List[PreparedTask]:
+        """Splits a `foreach` task into one lightweight call per item."""
+        task = prepared.task
+        return [
+            prepared._replace(
+                task=task.model_copy(update={"name": f"{task.name}[{i}]"}),
+                instruction=instruction,
+                items=None,
+            )
+            for i, instruction in enumerate(prepared.items)
+        ]
 
-                # 3. Update context
-                if task.name not in self.context["tasks"]:
-                    self.context["tasks"][task.name] = {}
-                self.context["tasks"][task.name]["output"] = task_output
+    def _restore_checkpoint(self, prepared: PreparedTask) -> bool:
+        """
+        Reuses a checkpointed output for a task when resuming.
 
-        print("Workflow execution finished.")
-        return self.context
+        Returns:
+            True if the task's output was restored and it must not be run.
+        """
+        if not (self.resume or self.incremental):
+            return False
+
+        saved = self.checkpoint.get(self.workflow.name, prepared.task.name)
+        if saved is None:
+            return False
+        if self.incremental and saved.fingerprint != prepared.fingerprint:
+            return False
+
+        self._record_output(prepared.task, saved.output)
+        return True
+
+    def _begin_task(self, task: Task) -> Optional[PreparedTask]:
+        """
+        Prepares a ready task and starts its span.
+
+        Returns:
+            The prepared task, or None if its output was restored from a
+            checkpoint and it must not be run.
+        """
+        render_start = time.time()
+        prepared = self._prepare_task(task)
+        render_end = time.time()
+        restored = self._restore_checkpoint(prepared)
+
+        span = self.tracer.start_span(
+            task.name,
+            "task",
+            parent=self._parent_span,
+            start=render_start,
+            agent=prepared.agent.name,
+            provider=prepared.agent.provider,
+            model=prepared.agent.model,
+            restored=restored,
+        )
+        self.tracer.record("render", "render", render_start, render_end, parent=span)
+        if restored:
+            self.tracer.end_span(span)
+            return None
+        return prepared._replace(span=span)
+
+    def _save_checkpoint(self, prepared: PreparedTask, task_output: Any) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.save(
+                self.workflow.name,
+                prepared.task.name,
+                prepared.fingerprint,
+                task_output,
+            )
+
+    def _record_stream_metrics(
+        self, task_name: str, started: float, first_chunk: Optional[float], chunks: int
+    ) -> None:
+        """
+        Stores streaming metrics for a task.
+
+        Providers stream roughly one token per chunk, so the chunk count is
+        used as the token count for the throughput figure.
+        """
+        finished = time.perf_counter()
+        first_chunk = first_chunk if first_chunk is not None else finished
+        generation_time = finished - first_chunk
+        metrics = {
+            "time_to_first_token": first_chunk - started,
+            "duration": finished - started,
+            "chunks": chunks,
+            "tokens_per_second": chunks / generation_time if generation_time else 0.0,
+        }
+        with self._metrics_lock:
+            self.task_metrics[task_name] = metrics
+        annotate(**metrics)
+
+    def _call_executor(
+        self,
+        executor: BaseAgentExecutor,
+        prepared: PreparedTask,
+        warm_up: Optional[Future] = None,
+    ) -> str:
+        """
+        Executes a task, streaming it to `on_chunk` if a sink is set.
+
+        A prompt-cache `warm_up` this call leads is finished at the first
+        streamed chunk, by which time the provider has cached the prefix.
+        """
+        if self.on_chunk is None:
+            return executor.execute(prepared.agent, prepared.instruction)
+
+        task_name = prepared.task.name
+        chunks: List[str] = []
+        started, first_chunk = time.perf_counter(), None
+        for chunk in executor.stream(prepared.agent, prepared.instruction):
+            if first_chunk is None:
+                first_chunk = time.perf_counter()
+                _finish_warm_up(warm_up)
+            chunks.append(chunk)
+            if isinstance(chunk, str):
+                self.on_chunk(task_name, chunk)
+        self._record_stream_metrics(task_name, started, first_chunk, len(chunks))
+        return join_chunks(chunks)
+
+    async def _acall_executor(
+        self,
+        executor: BaseAgentExecutor,
+        prepared: PreparedTask,
+        warm_up: Optional[Future] = None,
+    ) -> str:
+        """The asynchronous counterpart of `_call_executor`."""
+        if self.on_chunk is None:
+            return await executor.aexecute(prepared.agent, prepared.instruction)
+
+        task_name = prepared.task.name
+        chunks: List[str] = []
+        started, first_chunk = time.perf_counter(), None
+        async for chunk in executor.astream(prepared.agent, prepared.instruction):
+            if first_chunk is None:
+                first_chunk = time.perf_counter()
+                _finish_warm_up(warm_up)
+            chunks.append(chunk)
+            if isinstance(chunk, str):
+                self.on_chunk(task_name, chunk)
+        self._record_stream_metrics(task_name, started, first_chunk, len(chunks))
+        return join_chunks(chunks)
+
+    def _fallback_calls(self, prepared: PreparedTask) -> List[PreparedTask]:
+        """The call on the task's agent followed by one per fallback agent."""
+        return [prepared] + [
+            prepared._replace(agent=self.agent_map[name])
+            for name in prepared.agent.fallbacks
+        ]
+
+    def _on_failed_attempt(
+        self, call: PreparedTask, exc: Exception, is_last: bool
+    ) -> None:
+        """Re-raises the error of the last attempt; notes a fallback otherwise."""
+        if is_last:
+            raise exc
+        if call.span is not None:
+            call.span.increment("fallbacks")
+
+    def _execute_call(self, prepared: PreparedTask) -> str:
+        """
+        Runs an agent call, moving on to the agent's fallbacks if it times
+        out or fails.
+        """
+        calls = self._fallback_calls(prepared)
+        for i, call in enumerate(calls):
+            try:
+                return self._execute_attempt(call)
+            except Exception as exc:
+                self._on_failed_attempt(call, exc, i == len(calls) - 1)
+
+    def _join_warm_up(self, prepared: PreparedTask) -> Tuple[Optional[Future], bool]:
+        """
+        Finds the call warming the provider's cache with this call's prompt
+        prefix, as a `(future, leader)` pair; see `PrefixDetector.warm_up`.
+        """
+        if self.prefix_detector is None:
+            return None, False
+        agent = prepared.agent
+        return self.prefix_detector.warm_up(
+            agent.provider, agent.model, prepared.instruction
+        )
+
+    def _execute_attempt(self, prepared: PreparedTask) -> str:
+        """
+        Runs a single agent call, honouring the provider's concurrency limit
+        and the global one.
+        """
+        agent = prepared.agent
+        semaphore = self._provider_semaphores.get(agent.provider)
+        warm_up, leader = self._join_warm_up(prepared)
+        if not leader:
+            if warm_up is not None and not warm_up.done():
+                with self.tracer.span("warm_up", "queue", parent=prepared.span):
+                    warm_up.result()
+            warm_up = None
+        with contextlib.ExitStack() as slots:
+            slots.callback(_finish_warm_up, warm_up)
+            # Only calls that may have to wait get a queue span
+            if (
+                semaphore is None
+                and self.call_gate is None
+                and self._call_slots.acquire(blocking=False)
+            ):
+                slots.callback(self._call_slots.release)
+            else:
+                with self.tracer.span("queue", "queue", parent=prepared.span):
+                    # Take the provider slot first, so a call waiting on a
+                    # busy provider does not hold a global slot other
+                    # providers could use
+                    if semaphore is not None:
+                        slots.enter_context(semaphore)
+                    slots.enter_context(self._call_slots)
+                    if self.call_gate is not None:
+                        slots.enter_context(self.call_gate(agent))
+
+            self._mark_call_start(prepared)
+            with self.tracer.span(
+                prepared.task.name,
+                "call",
+                parent=prepared.span,
+                agent=agent.name,
+                provider=agent.provider,
+                model=agent.model,
+            ):
+                executor = self._resolve_executor(prepared.task, agent)
+                return self._call_executor(executor, prepared, warm_up)
+
+    def _execute_foreach(self, prepared: PreparedTask) -> List[str]:
+        """Runs the calls of a `foreach` task and gathers their outputs in order."""
+        calls = self._foreach_calls(prepared)
+        if not calls:
+            return []
+        max_parallel = prepared.task.max_parallel or self.max_workers
+        # A dedicated pool, so item calls never wait on the pool running
+        # their parent task
+        with ThreadPoolExecutor(max_workers=min(max_parallel, len(calls))) as pool:
+            return list(pool.map(self._execute_call, calls))
+
+    def _execute_task(self, prepared: PreparedTask) -> Any:
+        """
+        Runs a task's agent call, or every item call for a `foreach` task.
+
+        The output is checkpointed as soon as the task finishes. This may be
+        called from worker threads, so it must not touch `self.context`.
+        """
+        try:
+            if prepared.items is None:
+                task_output = self._execute_call(prepared)
+            else:
+                task_output = self._execute_foreach(prepared)
+
+            self._save_checkpoint(prepared, task_output)
+            self._record_latency(prepared, task_output)
+            return task_output
+        except BaseException as exc:
+            prepared.span.set_attribute("error", repr(exc))
+            raise
+        finally:
+            self.tracer.end_span(prepared.span)
+
+    async def _aexecute_call(
+        self,
+        prepared: PreparedTask,
+        global_limit: asyncio.Semaphore,
+        provider_limits: Dict[str, asyncio.Semaphore],
+    ) -> str:
+        """The asynchronous counterpart of `_execute_call`."""
+        calls = self._fallback_calls(prepared)
+        for i, call in enumerate(calls):
+            try:
+                return await self._aexecute_attempt(call, global_limit, provider_limits)
+            except Exception as exc:
+                self._on_failed_attempt(call, exc, i == len(calls) - 1)
+
+    async def _aexecute_attempt(
+        self,
+        prepared: PreparedTask,
+        global_limit: asyncio.Semaphore,
+        provider_limits: Dict[str, asyncio.Semaphore],
+    ) -> str:
+        """The asynchronous counterpart of `_execute_attempt`."""
+        agent = prepared.agent
+        semaphore = provider_limits.get(agent.provider)
+        warm_up, leader = self._join_warm_up(prepared)
+        if not leader:
+            if warm_up is not None and not warm_up.done():
+                with self.tracer.span("warm_up", "queue", parent=prepared.span):
+                    await asyncio.shield(asyncio.wrap_future(warm_up))
+            warm_up = None
+        async with contextlib.AsyncExitStack() as slots:
+            slots.callback(_finish_warm_up, warm_up)
+            with self.tracer.span("queue", "queue", parent=prepared.span):
+                # As in `_execute_attempt`, the provider slot comes first
+                if semaphore is not None:
+                    await slots.enter_async_context(semaphore)
+                await slots.enter_async_context(global_limit)
+
+            self._mark_call_start(prepared)
+            with self.tracer.span(
+                prepared.task.name,
+                "call",
+                parent=prepared.span,
+                agent=agent.name,
+                provider=agent.provider,
+                model=agent.model,
+            ):
+                executor = self._resolve_executor(prepared.task, agent)
+                return await self._acall_executor(executor, prepared, warm_up)
+
+    async def _aexecute_task(
+        self,
+        prepared: PreparedTask,
+        global_limit: asyncio.Semaphore,
+        provider_limits: Dict[str, asyncio.Semaphore],
+    ) -> Any:
+        """The asynchronous counterpart of `_execute_task`."""
+        item_limit = asyncio.Semaphore(prepared.task.max_parallel or self.max_workers)
+
+        async def run_item(call: PreparedTask) -> str:
+            async with item_limit:
+                return await self._aexecute_call(call, global_limit, provider_limits)
+
+        try:
+            if prepared.items is None:
+                task_output = await self._aexecute_call(
+                    prepared, global_limit, provider_limits
+                )
+            else:
+                task_output = list(
+                    await asyncio.gather(*map(run_item, self._foreach_calls(prepared)))
+                )
+
+            self._save_checkpoint(prepared, task_output)
+            self._record_latency(prepared, task_output)
+            return task_output
+        except BaseException as exc:
+            prepared.span.set_attribute("error", repr(exc))
+            raise
+        finally:
+            self.tracer.end_span(prepared.span)
+
+    def _record_output(self, task: Task, task_output: Any) -> None:
+        """
+        Stores a task's output in the shared context, and drops outputs no
+        remaining task reads.
+        """
+        if self.artifact_store is not None:
+            task_output = self.artifact_store.put(
+                self._artifact_key(task.name), task_output
+            )
+        if task.name not in self.context["tasks"]:
+            self.context["tasks"][task.name] = {}
+        self.context["tasks"][task.name]["output"] = task_output
+
+        if self.workflow.outputs is not None:
+            for producer in self._reads[task.name]:
+                self._consumers[producer].discard(task.name)
+                self._release_output(producer)
+            self._release_output(task.name)
+
+    def _run_batch_sequential(self, batch: List[Task]) -> None:
+        for task in batch:
+            prepared = self._begin_task(task)
+            if prepared is not None:
+                self._record_output(task, self._execute_task(prepared))
+
+    def _run_batch_parallel(self, batch: List[Task], pool: ThreadPoolExecutor) -> None:
+        # 1. Render every instruction up front. Tasks in a batch only depend
+        #    on earlier batches, so the context is stable at this point.
+        prepared_tasks = [self._begin_task(task) for task in batch]
+
+        # 2. Fan the agent calls out to the pool
+        futures = []
+        for prepared in prepared_tasks:
+            if prepared is not None:
+                future = pool.submit(self._execute_task, prepared)
+                futures.append((prepared.task, future))
+
+        # 3. Update the context on this thread, in batch order, so the
+        #    result is deterministic regardless of completion order
+        for task, future in futures:
+            self._record_output(task, future.result())
+
+    def _dispatch_ready(self, scheduler: DataflowScheduler) -> List[PreparedTask]:
+        """
+        Prepares every ready task in a dataflow run.
+
+        Tasks restored from a checkpoint are completed immediately, which may
+        release further tasks, so this keeps going until nothing is ready.
+
+        Returns:
+            The prepared tasks that still need to be executed.
+        """
+        to_execute: List[PreparedTask] = []
+        ready = scheduler.get_ready()
+        while ready:
+            for task in ready:
+                prepared = self._begin_task(task)
+                if prepared is None:
+                    scheduler.mark_complete(task.name)
+                else:
+                    to_execute.append(prepared)
+            ready = scheduler.get_ready()
+        return to_execute
+
+    def _run_dataflow(self, graph: TaskGraph) -> None:
+        scheduler = DataflowScheduler(graph, self._priorities(graph))
+        in_flight: Dict[Future, Task] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while not scheduler.is_finished():
+                # 1. Dispatch every task whose dependencies are satisfied.
+                #    Their upstream outputs are already in the context.
+                for prepared in self._dispatch_ready(scheduler):
+                    future = pool.submit(self._execute_task, prepared)
+                    in_flight[future] = prepared.task
+                if not in_flight:
+                    continue
+
+                # 2. Wait for the next completion and release its dependents
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: in_flight[f].name):
+                    task = in_flight.pop(future)
+                    self._record_output(task, future.result())
+                    scheduler.mark_complete(task.name)
+
+    def _run_batches(self, graph: TaskGraph) -> None:
+        execution_plan = graph.batches()
+        workflow_span = self._parent_span
+
+        with contextlib.ExitStack() as stack:
+            pool = None
+            if self.mode == "parallel":
+                pool = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=self.max_workers)
+                )
+                # Submit long chains first, in case the batch fills the pool
+                priorities = self._priorities(graph)
+                execution_plan = [
+                    sorted(batch, key=lambda task: -priorities[task.name])
+                    for batch in execution_plan
+                ]
+            for i, batch in enumerate(execution_plan):
+                with self.tracer.span(
+                    f"Batch {i + 1}", "batch", parent=workflow_span, index=i
+                ) as batch_span:
+                    self._parent_span = batch_span
+                    if pool is not None:
+                        self._run_batch_parallel(batch, pool)
+                    else:
+                        self._run_batch_sequential(batch)
+        self._parent_span = workflow_span
+
+    def _end_task(
+        self,
+        prepared: PreparedTask,
+        task_output: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Checkpoints a batched task and ends its span. Batch turnaround is
+        not the model's latency, so it is not recorded in `latency_stats`.
+        """
+        if error is not None:
+            prepared.span.set_attribute("error", repr(error))
+        else:
+            self._save_checkpoint(prepared, task_output)
+        self.tracer.end_span(prepared.span)
+
+    def _submit_batch(
+        self, executor: BaseAgentExecutor, requests: List[BatchRequest]
+    ) -> SubmittedBatch:
+        """
+        Submits a batch, or finds the one an interrupted run submitted for
+        the same requests, and starts its span.
+        """
+        agent = requests[0].agent
+        key = hashlib.sha256(
+            json.dumps(
+                [make_cache_key(r.agent, r.instruction) for r in requests]
+            ).encode("utf-8")
+        ).hexdigest()
+        batch_id = None
+        if self.checkpoint is not None and (self.resume or self.incremental):
+            batch_id = self.checkpoint.get_batch(self.workflow.name, key)
+        resumed = batch_id is not None
+        if batch_id is None:
+            batch_id = executor.submit_batch(requests)
+            if self.checkpoint is not None:
+                self.checkpoint.save_batch(self.workflow.name, key, batch_id)
+
+        span = self.tracer.start_span(
+            f"{agent.provider}/{agent.model}",
+            "bulk",
+            parent=self._parent_span,
+            provider=agent.provider,
+            model=agent.model,
+            batch_id=batch_id,
+            requests=len(requests),
+            resumed=resumed,
+        )
+        return SubmittedBatch(executor, requests, batch_id, key, span)
+
+    def _wait_for_batches(
+        self, batches: List[SubmittedBatch]
+    ) -> Dict[str, BatchResult]:
+        """
+        Polls submitted batches until every one has ended.
+
+        Returns:
+            The result of every request, by cache key. Requests a batch did
+            not process get an error result.
+        """
+        results: Dict[str, BatchResult] = {}
+        pending = list(batches)
+        while True:
+            for batch in list(pending):
+                batch_results = batch.executor.poll_batch(batch.batch_id)
+                if batch_results is None:
+                    continue
+
+                pending.remove(batch)
+                failed = 0
+                for request in batch.requests:
+                    result = batch_results.get(request.custom_id)
+                    if result is None:
+                        result = BatchResult(
+                            error=f"Not processed by batch '{batch.batch_id}'."
+                        )
+                    failed += result.error is not None
+                    key = make_cache_key(request.agent, request.instruction)
+                    results[key] = result
+                batch.span.set_attribute("failed", failed)
+                self.tracer.end_span(batch.span)
+                # Its results are collected, so a resumed run must not reuse it
+                if self.checkpoint is not None:
+                    self.checkpoint.delete_batch(self.workflow.name, batch.key)
+            if not pending:
+                return results
+            time.sleep(self.batch_poll_interval)
+
+    def _run_batch_bulk(self, batch: List[Task], pool: ThreadPoolExecutor) -> None:
+        prepared_tasks = [self._begin_task(task) for task in batch]
+
+        # 1. Tasks on providers without a batch API start on the pool, and
+        #    run while the batches are processed
+        futures: Dict[str, Future] = {}
+        batched: List[PreparedTask] = []
+        for prepared in prepared_tasks:
+            if prepared is None:
+                continue
+            if self._get_executor(prepared.agent).supports_batches:
+                batched.append(prepared)
+            else:
+                futures[prepared.task.name] = pool.submit(self._execute_task, prepared)
+
+        # 2. Group the remaining calls by provider and model. Identical calls
+        #    are sent once, and cached responses are not sent at all.
+        outputs: Dict[str, BatchResult] = {}
+        groups: Dict[Tuple[str, str], Dict[str, BatchRequest]] = {}
+        calls: Dict[str, List[PreparedTask]] = {}
+        for prepared in batched:
+            if prepared.items is None:
+                calls[prepared.task.name] = [prepared]
+            else:
+                calls[prepared.task.name] = self._foreach_calls(prepared)
+            for call in calls[prepared.task.name]:
+                agent = call.agent
+                key = make_cache_key(agent, call.instruction)
+                if key in outputs:
+                    continue
+                if self.response_cache is not None and call.task.cache:
+                    cached = self.response_cache.get(key)
+                    if cached is not None:
+                        outputs[key] = BatchResult(output=cached)
+                        continue
+                requests = groups.setdefault((agent.provider, agent.model), {})
+                if key not in requests:
+                    requests[key] = BatchRequest(
+                        f"req-{len(requests)}", agent, call.instruction
+                    )
+
+        # 3. Submit one batch per group and wait for all of them
+        submitted = []
+        for requests in groups.values():
+            requests = list(requests.values())
+            executor = self._get_executor(requests[0].agent)
+            submitted.append(self._submit_batch(executor, requests))
+        if submitted:
+            outputs.update(self._wait_for_batches(submitted))
+
+        # 4. Map the results back to the tasks, then record every output in
+        #    batch order, as in the parallel mode
+        task_outputs: Dict[str, Any] = {}
+        errors: List[BatchCallError] = []
+        for prepared in batched:
+            try:
+                task_output = self._collect_batch_outputs(
+                    prepared, calls[prepared.task.name], outputs
+                )
+            except BatchCallError as exc:
+                self._end_task(prepared, error=exc)
+                errors.append(exc)
+            else:
+                self._end_task(prepared, task_output)
+                task_outputs[prepared.task.name] = task_output
+        for name, future in futures.items():
+            task_outputs[name] = future.result()
+        if errors:
+            raise errors[0]
+        for task in batch:
+            if task.name in task_outputs:
+                self._record_output(task, task_outputs[task.name])
+
+    def _collect_batch_outputs(
+        self,
+        prepared: PreparedTask,
+        calls: List[PreparedTask],
+        results: Dict[str, BatchResult],
+    ) -> Any:
+        """
+        Gathers a task's output from the results of its batched calls, and
+        stores them in the response cache.
+
+        Raises:
+            BatchCallError: If one of the task's calls failed.
+        """
+        task_output = []
+        for call in calls:
+            key = make_cache_key(call.agent, call.instruction)
+            result = results[key]
+            if result.error is not None:
+                raise BatchCallError(
+                    f"Call '{call.task.name}' to {call.agent.provider}/"
+                    f"{call.agent.model} failed: {result.error}"
+                )
+            if self.response_cache is not None and call.task.cache:
+                self.response_cache.set(key, result.output)
+            task_output.append(result.output)
+        return task_output if prepared.items is not None else task_output[0]
+
+    def _run_bulk(self, graph: TaskGraph) -> None:
+        workflow_span = self._parent_span
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for i, batch in enumerate(graph.batches()):
+                with self.tracer.span(
+                    f"Batch {i + 1}", "batch", parent=workflow_span, index=i
+                ) as batch_span:
+                    self._parent_span = batch_span
+                    self._run_batch_bulk(batch, pool)
+        self._parent_span = workflow_span
+
+    def run(
+        self,
+        targets: Optional[List[str]] = None,
+        known_outputs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Executes the workflow.
+
+        Args:
+            targets: Run only these tasks and the upstream tasks they need,
+                     instead of the whole workflow.
+            known_outputs: Outputs of upstream tasks, by name, to reuse
+                           instead of running those tasks. Only used with
+                           `targets`.
+
+        Returns:
+            The context, with each executed task's output under `tasks`.
+        """
+        graph = self._plan_graph(targets, known_outputs)
+        try:
+            with self.tracer.span(
+                self.workflow.name, "workflow", mode=self.mode
+            ) as workflow_span:
+                self._parent_span = workflow_span
+                if self.mode == "dataflow":
+                    self._run_dataflow(graph)
+                elif self.mode == "bulk":
+                    self._run_bulk(graph)
+                else:
+                    self._run_batches(graph)
+            return self._finalize_context()
+        finally:
+            self._end_run()
+
+    async def arun(
+        self,
+        targets: Optional[List[str]] = None,
+        known_outputs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Executes the workflow on the running event loop.
+
+        Tasks are dispatched as soon as their dependencies finish, as in the
+        "dataflow" mode, but each call is a coroutine on the executor's
+        `aexecute` rather than a thread, so thousands of calls can be in
+        flight at once. `max_workers` bounds the number of in-flight calls.
+
+        `targets` and `known_outputs` are as in `run`.
+
+        Raises:
+            ValueError: If a `call_gate` is set; gates may block the thread.
+        """
+        if self.call_gate is not None:
+            raise ValueError("call_gate is not supported by arun.")
+        graph = self._plan_graph(targets, known_outputs)
+        try:
+            with self.tracer.span(
+                self.workflow.name, "workflow", mode="arun"
+            ) as workflow_span:
+                self._parent_span = workflow_span
+                await self._arun_dataflow(graph)
+            return self._finalize_context()
+        finally:
+            self._end_run()
+
+    async def _arun_dataflow(self, graph: TaskGraph) -> None:
+        scheduler = DataflowScheduler(graph, self._priorities(graph))
+        global_limit = asyncio.Semaphore(self.max_workers)
+        provider_limits = {
+            provider: asyncio.Semaphore(limit)
+            for provider, limit in self.provider_limits.items()
+        }
+        in_flight: Dict[asyncio.Task, Task] = {}
+
+        try:
+            while not scheduler.is_finished():
+                # 1. Dispatch every task whose dependencies are satisfied
+                for prepared in self._dispatch_ready(scheduler):
+                    coroutine = self._aexecute_task(
+                        prepared, global_limit, provider_limits
+                    )
+                    in_flight[asyncio.create_task(coroutine)] = prepared.task
+                if not in_flight:
+                    continue
+
+                # 2. Wait for the next completion and release its dependents
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in sorted(done, key=lambda f: in_flight[f].name):
+                    task = in_flight.pop(future)
+                    self._record_output(task, future.result())
+                    scheduler.mark_complete(task.name)
+        finally:
+            # Don't leave orphaned calls behind if a task failed
+            for future in in_flight:
+                future.cancel()
@@ -0,0 +1,192 @@
+import contextlib
+import itertools
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+from orquestra.agents.cache import BaseResponseCache
+from orquestra.agents.coalesce import SingleFlight
+from orquestra.agents.ratelimit import RateLimiter
+from orquestra.agents.registry import ExecutorPool, ExecutorRegistry
+from orquestra.models import Agent, Workflow
+from orquestra.tracing import Tracer
+
+from .orchestrator import Orchestrator
+from .scheduler import FairShareLimiter
+
+
+class RunResult(NamedTuple):
+    """
+    The outcome of one workflow run.
+
+    `index` is the workflow's position in the input; exactly one of
+    `context` and `error` is set.
+    """
+
+    index: int
+    workflow: Workflow
+    context: Optional[Dict[str, Any]]
+    error: Optional[BaseException]
+
+
+class WorkflowRunner:
+    """
+    Runs many workflow instances concurrently with shared resources.
+
+    Every run draws on the same executor instances (one SDK client, and so
+    one HTTP connection pool, per provider), the same rate limiter and
+    response cache, and the same concurrency limits. Free call slots are
+    handed to runs round-robin, so one large run cannot starve the rest.
+
+    Workflows are consumed lazily and at most `max_in_flight` run at once,
+    which bounds the memory held by in-flight contexts however many
+    workflows are submitted.
+
+    Args:
+        max_concurrency: The cap on agent calls in flight across all runs.
+        max_in_flight: The number of workflows run at the same time.
+        provider_limits: Optional per-provider caps on in-flight calls,
+                         shared across all runs, e.g. {"openai": 8}.
+        mode: The execution mode of each run.
+        workers_per_run: Worker threads per run; defaults to
+                         `max_concurrency`. Calls beyond the shared caps
+                         wait for a slot.
+        response_cache: Optional cache backend shared by all runs.
+        rate_limiter: Optional rate limiter shared by all runs.
+        single_flight: Optional table of calls in flight shared by all runs,
+                       so identical concurrent calls are made once.
+        tracer: Receives every run's spans. Defaults to a silent tracer.
+        executor_registry: Resolves provider names to executor classes.
+        orchestrator_options: Extra keyword arguments for each Orchestrator,
+                              e.g. `on_chunk`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        max_in_flight: int = 8,
+        provider_limits: Optional[Dict[str, int]] = None,
+        mode: str = "dataflow",
+        workers_per_run: Optional[int] = None,
+        response_cache: Optional[BaseResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        single_flight: Optional[SingleFlight] = None,
+        tracer: Optional[Tracer] = None,
+        executor_registry: Optional[ExecutorRegistry] = None,
+        orchestrator_options: Optional[Dict[str, Any]] = None,
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+
+        self.max_in_flight = max_in_flight
+        self.mode = mode
+        self.workers_per_run = workers_per_run or max_concurrency
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.single_flight = single_flight
+        self.tracer = tracer if tracer is not None else Tracer([])
+        self.executor_pool = ExecutorPool(executor_registry)
+        self.orchestrator_options = dict(orchestrator_options or {})
+
+        self.call_limiter = FairShareLimiter(max_concurrency)
+        self.provider_limiters: Dict[str, FairShareLimiter] = {
+            provider: FairShareLimiter(limit)
+            for provider, limit in (provider_limits or {}).items()
+        }
+        self._run_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def executor_instances(self) -> Dict[str, Any]:
+        """The shared executors, by provider."""
+        return self.executor_pool.instances
+
+    def _call_gate(self, run_id: Hashable) -> Callable[[Agent], ContextManager[Any]]:
+        """Returns the gate a run's calls pass through."""
+
+        @contextlib.contextmanager
+        def gate(agent: Agent) -> Iterator[None]:
+            # Take the provider slot first, so a call waiting on a busy
+            # provider does not hold a global slot other providers could use
+            with contextlib.ExitStack() as slots:
+                provider_limiter = self.provider_limiters.get(agent.provider)
+                if provider_limiter is not None:
+                    slots.enter_context(provider_limiter.slot(run_id))
+                slots.enter_context(self.call_limiter.slot(run_id))
+                yield
+
+        return gate
+
+    def orchestrator_for(self, workflow: Workflow) -> Orchestrator:
+        """Builds an Orchestrator wired to the runner's shared resources."""
+        with self._lock:
+            run_id = next(self._run_ids)
+        return Orchestrator(
+            workflow,
+            mode=self.mode,
+            max_workers=self.workers_per_run,
+            response_cache=self.response_cache,
+            rate_limiter=self.rate_limiter,
+            single_flight=self.single_flight,
+            tracer=self.tracer,
+            executor_pool=self.executor_pool,
+            call_gate=self._call_gate(run_id),
+            **self.orchestrator_options,
+        )
+
+    def _run_one(self, workflow: Workflow) -> Dict[str, Any]:
+        return self.orchestrator_for(workflow).run()
+
+    def run_iter(self, workflows: Iterable[Workflow]) -> Iterator[RunResult]:
+        """
+        Runs workflows and yields each result as soon as its run finishes.
+
+        Failures are yielded as results with `error` set rather than
+        raised, so one bad workflow does not stop the others. Results come
+        in completion order; use `RunResult.index` to match them to inputs.
+        The shared executors are shut down once every run has finished.
+        """
+        pending = enumerate(workflows)
+        in_flight: Dict[Future, tuple] = {}
+
+        with contextlib.ExitStack() as stack:
+            stack.callback(self.executor_pool.shutdown)
+            pool = stack.enter_context(
+                ThreadPoolExecutor(max_workers=self.max_in_flight)
+            )
+
+            def submit_next() -> bool:
+                item = next(pending, None)
+                if item is None:
+                    return False
+                in_flight[pool.submit(self._run_one, item[1])] = item
+                return True
+
+            # 1. Fill the in-flight window
+            while len(in_flight) < self.max_in_flight and submit_next():
+                pass
+
+            # 2. Each time a run finishes, yield it and start the next one
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, workflow = in_flight.pop(future)
+                    error = future.exception()
+                    context = None if error is not None else future.result()
+                    submit_next()
+                    yield RunResult(index, workflow, context, error)
+
+    def run_all(self, workflows: Iterable[Workflow]) -> List[RunResult]:
+        """Runs every workflow and returns the results in input order."""
+        return sorted(self.run_iter(workflows), key=lambda result: result.index)
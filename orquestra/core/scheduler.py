@@ -1,9 +1,241 @@
-from collections import deque
-from typing import Dict, List, Set
+import heapq
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 from orquestra.models import Task
 
 
+class TaskGraph:
+    """
+    An integer-indexed dependency graph of a workflow's tasks.
+
+    Tasks are indexed by the rank of their name, so iterating indices in
+    ascending order visits tasks alphabetically. That gives deterministic
+    ordering everywhere without sorting again after construction.
+
+    Args:
+        tasks: A list of Task objects.
+        dependencies: Optional dependencies by task name, used instead of
+                      each task's `depends_on` for tasks listed in it.
+
+    Raises:
+        ValueError: If two tasks share a name or a task depends on a task
+                    that does not exist.
+    """
+
+    def __init__(
+        self,
+        tasks: List[Task],
+        dependencies: Optional[Dict[str, Iterable[str]]] = None,
+    ):
+        # The only sort: afterwards, index order is name order
+        self.tasks: List[Task] = sorted(tasks, key=lambda t: t.name)
+        self.index: Dict[str, int] = {}
+        for i, task in enumerate(self.tasks):
+            if task.name in self.index:
+                raise ValueError(f"Duplicate task name '{task.name}'.")
+            self.index[task.name] = i
+
+        # predecessors[i] are the tasks i depends on; successors[i] are the
+        # tasks that depend on i. Dependents are appended in index order, so
+        # every successor list is already sorted.
+        self.predecessors: List[List[int]] = [[] for _ in self.tasks]
+        self.successors: List[List[int]] = [[] for _ in self.tasks]
+        dependencies = dependencies or {}
+        for i, task in enumerate(self.tasks):
+            for dep in dict.fromkeys(dependencies.get(task.name, task.depends_on)):
+                dep_index = self.index.get(dep)
+                if dep_index is None:
+                    raise ValueError(
+                        f"Task '{task.name}' depends on non-existent task '{dep}'."
+                    )
+                # A depends on B means an edge from B to A
+                self.predecessors[i].append(dep_index)
+                self.successors[dep_index].append(i)
+
+        self._levels: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def in_degrees(self) -> List[int]:
+        """Returns a fresh list of in-degrees, indexed like `tasks`."""
+        return [len(preds) for preds in self.predecessors]
+
+    def levels(self) -> List[int]:
+        """
+        Returns each task's batch number: the length of the longest chain of
+        dependencies leading to it.
+
+        Raises:
+            ValueError: If a circular dependency is detected. The message
+                        names the tasks forming the cycle.
+        """
+        if self._levels is not None:
+            return self._levels
+
+        in_degree = self.in_degrees()
+        level = [0] * len(self.tasks)
+        queue: deque[int] = deque(i for i, d in enumerate(in_degree) if d == 0)
+        resolved_tasks_count = 0
+
+        while queue:
+            u = queue.popleft()
+            resolved_tasks_count += 1
+            next_level = level[u] + 1
+            for v in self.successors[u]:
+                if level[v] < next_level:
+                    level[v] = next_level
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    queue.append(v)
+
+        if resolved_tasks_count != len(self.tasks):
+            cycle = self._find_cycle(in_degree)
+            raise ValueError(
+                "Circular dependency detected in the workflow tasks: "
+                + " -> ".join(self.tasks[i].name for i in cycle)
+                + "."
+            )
+
+        self._levels = level
+        return level
+
+    def _find_cycle(self, in_degree: List[int]) -> List[int]:
+        """
+        Finds one cycle among the tasks Kahn's algorithm could not resolve.
+
+        Every unresolved task has an unresolved predecessor, so walking
+        predecessors from any of them must eventually revisit a task.
+        """
+        start = next(i for i, d in enumerate(in_degree) if d > 0)
+        position: Dict[int, int] = {}
+        path: List[int] = []
+        node = start
+        while node not in position:
+            position[node] = len(path)
+            path.append(node)
+            node = next(p for p in self.predecessors[node] if in_degree[p] > 0)
+
+        # The walk follows dependencies backwards; reverse it so the message
+        # reads in execution order, closing the loop on the first task.
+        cycle = path[position[node] :][::-1]
+        return cycle + [cycle[0]]
+
+    def batches(self) -> List[List[Task]]:
+        """Groups tasks into level-synchronous batches, each sorted by name."""
+        level = self.levels()
+        execution_plan: List[List[Task]] = [
+            [] for _ in range(max(level, default=-1) + 1)
+        ]
+        for i, task in enumerate(self.tasks):
+            execution_plan[level[i]].append(task)
+        return execution_plan
+
+    def critical_path(self, durations: Optional[Dict[str, float]] = None) -> List[Task]:
+        """
+        Returns the longest chain of dependent tasks, in execution order.
+
+        Args:
+            durations: Estimated duration of each task, by name. Without it,
+                       every task counts as 1, so the path is the longest
+                       chain by task count. Missing tasks count as 0.
+
+        Raises:
+            ValueError: If a circular dependency is detected.
+        """
+        level = self.levels()
+        if not self.tasks:
+            return []
+        weight = self._weights(durations)
+
+        # Visiting by level is a topological order, so every predecessor's
+        # finish time is known before its dependents are reached.
+        finish = [0.0] * len(self.tasks)
+        via = [-1] * len(self.tasks)
+        for v in sorted(range(len(self.tasks)), key=level.__getitem__):
+            start = 0.0
+            for u in self.predecessors[v]:
+                if finish[u] > start:
+                    start, via[v] = finish[u], u
+            finish[v] = start + weight[v]
+
+        path = [max(range(len(self.tasks)), key=finish.__getitem__)]
+        while via[path[-1]] != -1:
+            path.append(via[path[-1]])
+        return [self.tasks[i] for i in reversed(path)]
+
+    def _weights(self, durations: Optional[Dict[str, float]]) -> List[float]:
+        return [
+            1.0 if durations is None else durations.get(task.name, 0.0)
+            for task in self.tasks
+        ]
+
+    def upward_ranks(self, durations: Optional[Dict[str, float]] = None) -> List[float]:
+        """
+        Returns each task's upward rank, indexed like `tasks`: its own
+        duration plus the longest chain of durations after it.
+
+        Starting ready tasks in decreasing rank order (as HEFT does) starts
+        long chains first, which shortens the makespan when concurrency is
+        limited.
+
+        Args:
+            durations: Estimated duration of each task, by name, as in
+                       `critical_path`.
+
+        Raises:
+            ValueError: If a circular dependency is detected.
+        """
+        level = self.levels()
+        weight = self._weights(durations)
+        rank = [0.0] * len(self.tasks)
+        # Reverse level order visits every successor before its predecessors
+        for u in sorted(range(len(self.tasks)), key=level.__getitem__, reverse=True):
+            rank[u] = weight[u] + max(
+                (rank[v] for v in self.successors[u]), default=0.0
+            )
+        return rank
+
+    def estimate_makespan(
+        self,
+        durations: Optional[Dict[str, float]] = None,
+        max_workers: Optional[int] = None,
+    ) -> float:
+        """
+        Estimates a run's duration by simulating rank-ordered dispatch.
+
+        Args:
+            durations: Estimated duration of each task, by name, as in
+                       `critical_path`.
+            max_workers: Tasks run at once; unlimited by default, in which
+                         case the estimate is the critical path's length.
+
+        Raises:
+            ValueError: If a circular dependency is detected.
+        """
+        weight = self._weights(durations)
+        rank = self.upward_ranks(durations)
+        in_degree = self.in_degrees()
+        ready = [(-rank[i], i) for i, d in enumerate(in_degree) if d == 0]
+        heapq.heapify(ready)
+        running: List[Tuple[float, int]] = []
+        now = 0.0
+        while ready or running:
+            # Start the highest-ranked ready tasks while workers are free
+            while ready and (max_workers is None or len(running) < max_workers):
+                _, u = heapq.heappop(ready)
+                heapq.heappush(running, (now + weight[u], u))
+            now, u = heapq.heappop(running)
+            for v in self.successors[u]:
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    heapq.heappush(ready, (-rank[v], v))
+        return now
+
+
 def resolve_task_order(tasks: List[Task]) -> List[List[Task]]:
     """
     Resolves the execution order of tasks based on their dependencies using
@@ -19,52 +251,149 @@ def resolve_task_order(tasks: List[Task]) -> List[List[Task]]:
     Raises:
         ValueError: If a circular dependency is detected in the tasks.
     """
-    # Create a mapping of task names to task objects for easy lookup
-    task_map: Dict[str, Task] = {task.name: task for task in tasks}
-
-    # Build the adjacency list and in-degree map
-    adj: Dict[str, Set[str]] = {name: set() for name in task_map}
-    in_degree: Dict[str, int] = {name: 0 for name in task_map}
-
-    for task in tasks:
-        for dep in task.depends_on:
-            if dep not in task_map:
-                raise ValueError(
-                    f"Task '{task.name}' depends on non-existent task '{dep}'."
-                )
-            # A depends on B means an edge from B to A
-            adj[dep].add(task.name)
-            in_degree[task.name] += 1
-
-    # Initialize the queue with all tasks that have no dependencies
-    queue: deque[str] = deque(
-        [name for name, degree in in_degree.items() if degree == 0]
-    )
-
-    execution_plan: List[List[Task]] = []
-    resolved_tasks_count = 0
-
-    while queue:
-        batch_size = len(queue)
-        current_batch: List[Task] = []
-
-        for _ in range(batch_size):
-            task_name = queue.popleft()
-            current_batch.append(task_map[task_name])
-            resolved_tasks_count += 1
+    return TaskGraph(tasks).batches()
+
+
+class DataflowScheduler:
+    """
+    Releases tasks as soon as their own dependencies have completed.
+
+    Unlike `resolve_task_order`, which groups tasks into level-synchronous
+    batches, this scheduler tracks in-degrees live: every call to
+    `mark_complete` decrements the in-degree of the finished task's
+    dependents and makes any that reach zero available immediately.
+
+    Args:
+        tasks: A list of Task objects, or a prebuilt TaskGraph.
+        priorities: Optional priority of each task, by name, e.g. from
+                    `TaskGraph.upward_ranks`. Ready tasks are handed out
+                    highest priority first; ties, and tasks without one,
+                    go in name order.
+
+    Raises:
+        ValueError: If a task depends on a non-existent task or a circular
+                    dependency is detected.
+    """
+
+    def __init__(
+        self,
+        tasks: Union[List[Task], TaskGraph],
+        priorities: Optional[Dict[str, float]] = None,
+    ):
+        self.graph = tasks if isinstance(tasks, TaskGraph) else TaskGraph(tasks)
+        # Validates the graph and rejects cycles up front
+        self.graph.levels()
+
+        self.task_map: Dict[str, Task] = {t.name: t for t in self.graph.tasks}
+        self._priority = [
+            -(priorities or {}).get(task.name, 0.0) for task in self.graph.tasks
+        ]
+        self._in_degree = self.graph.in_degrees()
+        # A heap of (negated priority, index): highest priority, then name
+        self._ready: List[Tuple[float, int]] = [
+            (self._priority[i], i)
+            for i, degree in enumerate(self._in_degree)
+            if degree == 0
+        ]
+        heapq.heapify(self._ready)
+        self._running: Set[int] = set()
+        self._completed_count = 0
+
+    def get_ready(self) -> List[Task]:
+        """
+        Returns every task that is ready to run and marks them as running.
+
+        Tasks are returned by priority, then in name order.
+        """
+        ready: List[Task] = []
+        while self._ready:
+            _, i = heapq.heappop(self._ready)
+            self._running.add(i)
+            ready.append(self.graph.tasks[i])
+        return ready
+
+    def mark_complete(self, task_name: str) -> List[str]:
+        """
+        Records that a running task has finished.
+
+        Returns:
+            The names of the tasks that became ready as a result.
+
+        Raises:
+            ValueError: If the task is not currently running.
+        """
+        u = self.graph.index.get(task_name)
+        if u not in self._running:
+            raise ValueError(f"Task '{task_name}' is not running.")
+        self._running.remove(u)
+        self._completed_count += 1
+
+        released: List[str] = []
+        for v in self.graph.successors[u]:
+            self._in_degree[v] -= 1
+            if self._in_degree[v] == 0:
+                heapq.heappush(self._ready, (self._priority[v], v))
+                released.append(self.graph.tasks[v].name)
+        return released
+
+    @property
+    def running(self) -> Set[str]:
+        """The names of tasks handed out but not yet completed."""
+        return {self.graph.tasks[i].name for i in self._running}
+
+    def is_finished(self) -> bool:
+        """Whether every task has completed."""
+        return self._completed_count == len(self.graph)
+
+
+class FairShareLimiter:
+    """
+    A concurrency limit shared by many workflow runs, granted fairly.
+
+    When every slot is taken, waiting calls queue per run, and each freed
+    slot goes to the next run in round-robin order. A run with a thousand
+    ready calls therefore cannot starve a run with one.
+
+    Args:
+        capacity: The number of calls allowed in flight at once.
+    """
 
-            for neighbor_name in sorted(
-                list(adj[task_name])
-            ):  # sort for deterministic order
-                in_degree[neighbor_name] -= 1
-                if in_degree[neighbor_name] == 0:
-                    queue.append(neighbor_name)
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self.capacity = capacity
+        self.in_use = 0
+        # Runs with waiting calls, in the order they will next be served
+        self._waiting: "OrderedDict[Hashable, deque[threading.Event]]" = OrderedDict()
+        self._lock = threading.Lock()
 
-        # Sort the batch by name for deterministic output
-        current_batch.sort(key=lambda t: t.name)
-        execution_plan.append(current_batch)
+    def acquire(self, run_id: Hashable) -> None:
+        """Blocks until `run_id` is granted a slot."""
+        with self._lock:
+            if self.in_use < self.capacity and not self._waiting:
+                self.in_use += 1
+                return
+            granted = threading.Event()
+            self._waiting.setdefault(run_id, deque()).append(granted)
+        granted.wait()
 
-    if resolved_tasks_count != len(tasks):
-        raise ValueError("Circular dependency detected in the workflow tasks.")
+    def release(self) -> None:
+        """Frees a slot, handing it straight to the next waiting run."""
+        with self._lock:
+            if not self._waiting:
+                self.in_use -= 1
+                return
+            run_id, queue = self._waiting.popitem(last=False)
+            granted = queue.popleft()
+            # The run goes to the back of the line if it is still waiting
+            if queue:
+                self._waiting[run_id] = queue
+        granted.set()
 
-    return execution_plan
+    @contextmanager
+    def slot(self, run_id: Hashable) -> Iterator[None]:
+        self.acquire(run_id)
+        try:
+            yield
+        finally:
+            self.release()
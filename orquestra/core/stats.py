@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Union
+
+from orquestra.models import Agent, Task, Workflow
+
+# Bumped when the file layout changes; files of other versions are ignored.
+STATS_FORMAT_VERSION = 1
+
+
+class TaskStats(NamedTuple):
+    """Smoothed history of a task, or of every task on a model."""
+
+    latency: float
+    output_size: float
+    count: int
+
+
+class LatencyStats:
+    """
+    Historical task latencies and output sizes, persisted between runs.
+
+    Each completed task updates an exponentially weighted average for the
+    task itself (keyed by workflow and task name) and for its provider and
+    model. Estimates prefer the task's own history, then the model's, then
+    `default_latency`.
+
+    Args:
+        path: Optional JSON file the statistics are loaded from and saved
+              to. Without one they last for the process only.
+        smoothing: Weight of the newest observation in the averages.
+        default_latency: The estimate for tasks and models never seen.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        smoothing: float = 0.3,
+        default_latency: float = 1.0,
+    ):
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1].")
+        self.path = Path(path) if path is not None else None
+        self.smoothing = smoothing
+        self.default_latency = default_latency
+        self.tasks: Dict[str, TaskStats] = {}
+        self.models: Dict[str, TaskStats] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            # A corrupt or unreadable file only costs the history
+            return
+        if data.get("version") != STATS_FORMAT_VERSION:
+            return
+        self.tasks = {key: TaskStats(*value) for key, value in data["tasks"].items()}
+        self.models = {key: TaskStats(*value) for key, value in data["models"].items()}
+
+    def save(self) -> None:
+        """Writes the statistics to `path`, atomically. A no-op without one."""
+        if self.path is None:
+            return
+        with self._lock:
+            data = {
+                "version": STATS_FORMAT_VERSION,
+                "tasks": {key: list(value) for key, value in self.tasks.items()},
+                "models": {key: list(value) for key, value in self.models.items()},
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _update(
+        self, table: Dict[str, TaskStats], key: str, latency: float, size: float
+    ) -> None:
+        previous = table.get(key)
+        if previous is None:
+            table[key] = TaskStats(latency, size, 1)
+            return
+        alpha = self.smoothing
+        table[key] = TaskStats(
+            previous.latency + alpha * (latency - previous.latency),
+            previous.output_size + alpha * (size - previous.output_size),
+            previous.count + 1,
+        )
+
+    def record(
+        self, workflow: str, task: Task, agent: Agent, latency: float, output: Any
+    ) -> None:
+        """Records a completed task's latency in seconds and output size."""
+        if isinstance(output, str):
+            size = len(output)
+        else:
+            size = len(json.dumps(output, default=str))
+        with self._lock:
+            self._update(self.tasks, f"{workflow}/{task.name}", latency, size)
+            self._update(self.models, f"{agent.provider}/{agent.model}", latency, size)
+
+    def get(self, workflow: str, task: Task, agent: Agent) -> Optional[TaskStats]:
+        """Returns the history a task's estimates are based on, if any."""
+        with self._lock:
+            return self.tasks.get(f"{workflow}/{task.name}") or self.models.get(
+                f"{agent.provider}/{agent.model}"
+            )
+
+    def estimate(self, workflow: str, task: Task, agent: Agent) -> float:
+        """Returns a task's expected latency in seconds."""
+        stats = self.get(workflow, task, agent)
+        return stats.latency if stats is not None else self.default_latency
+
+    def estimate_workflow(self, workflow: Workflow) -> Dict[str, float]:
+        """Returns the expected latency of each of a workflow's tasks, by name."""
+        agents = {agent.name: agent for agent in workflow.agents}
+        return {
+            task.name: self.estimate(workflow.name, task, agents[task.agent])
+            for task in workflow.tasks
+        }
@@ -1,12 +1,51 @@
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional
 
-from jinja2 import Environment, StrictUndefined
+from jinja2 import Environment, StrictUndefined, Template, nodes
+from jinja2.environment import TemplateExpression
+
+from .artifacts import SpilledOutput
+
+# Maximum number of compiled templates kept in the cache.
+TEMPLATE_CACHE_SIZE = 1024
+
+
+def _json_default(value: Any) -> Any:
+    """Lets `tojson` serialise spilled outputs as the strings they stand for."""
+    if isinstance(value, SpilledOutput):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# A single shared environment. Using StrictUndefined makes rendering fail on
+# missing variables, which is safer for our use case.
+_environment = Environment(undefined=StrictUndefined)
+_environment.policies["json.dumps_kwargs"] = {
+    "sort_keys": True,
+    "default": _json_default,
+}
+# Spilled outputs stand in for strings, so `is string` holds for them too
+_environment.tests["string"] = lambda value: isinstance(value, (str, SpilledOutput))
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_template(template_str: str) -> Template:
+    """Compiles a template source once; later calls reuse the result."""
+    return _environment.from_string(template_str)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_expression(expression: str) -> TemplateExpression:
+    return _environment.compile_expression(expression, undefined_to_none=False)
 
 
 def render_template(template_str: str, context: Dict[str, Any]) -> str:
     """
     Renders a Jinja2 template string with the given context.
 
+    Compiled templates are cached by their source text, so rendering the same
+    instruction repeatedly only pays for compilation once.
+
     Args:
         template_str: The string containing Jinja2 template variables.
         context: A dictionary of values to render the template with.
@@ -18,8 +57,109 @@ def render_template(template_str: str, context: Dict[str, Any]) -> str:
         jinja2.exceptions.UndefinedError: If a variable in the template
                                           is not found in the context.
     """
-    # Using StrictUndefined makes rendering fail on missing variables,
-    # which is safer for our use case.
-    env = Environment(undefined=StrictUndefined)
-    template = env.from_string(template_str)
+    template = _compile_template(template_str)
     return template.render(context)
+
+
+def evaluate_expression(expression: str, context: Dict[str, Any]) -> Any:
+    """
+    Evaluates a Jinja2 expression, e.g. "tasks.split.output", in a context.
+
+    Args:
+        expression: The expression, without surrounding braces.
+        context: A dictionary of values to evaluate the expression with.
+
+    Returns:
+        The value of the expression, with its original type.
+
+    Raises:
+        jinja2.exceptions.UndefinedError: If the expression references a
+                                          variable that is not in the context.
+    """
+    value = _compile_expression(expression)(**context)
+    if isinstance(value, StrictUndefined):
+        # Accessing an undefined value raises the descriptive UndefinedError
+        str(value)
+    return value
+
+
+def _is_tasks(node: nodes.Node) -> bool:
+    return isinstance(node, nodes.Name) and node.name == "tasks"
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def find_task_references(
+    source: str, expression: bool = False
+) -> Optional[FrozenSet[str]]:
+    """
+    Finds the upstream tasks a template reads, without rendering it.
+
+    Looks for `tasks.<name>` and `tasks['<name>']` in the template's syntax
+    tree. Attributes of dicts (`tasks.get`, `tasks.items`...) are methods,
+    not tasks, so those and any call on `tasks` make the template
+    unresolvable.
+
+    Args:
+        source: A template, or an expression if `expression` is set.
+        expression: Whether `source` is a bare expression, like `foreach`.
+
+    Returns:
+        The referenced task names, or None if `tasks` is used in a way that
+        cannot be resolved statically, e.g. `tasks[name]` or a loop over
+        `tasks`. Callers must then assume every task may be read.
+    """
+    tree = _environment.parse("{{ " + source + " }}" if expression else source)
+    for call in tree.find_all(nodes.Call):
+        if _is_tasks(call.node) or (
+            isinstance(call.node, (nodes.Getattr, nodes.Getitem))
+            and _is_tasks(call.node.node)
+        ):
+            return None
+
+    referenced = set()
+    resolved = 0
+    for node in tree.find_all((nodes.Getattr, nodes.Getitem)):
+        if not _is_tasks(node.node):
+            continue
+        if isinstance(node, nodes.Getattr):
+            # Jinja resolves `tasks.get` to the dict method, not a task
+            if hasattr(dict, node.attr):
+                return None
+            referenced.add(node.attr)
+            resolved += 1
+        elif isinstance(node.arg, nodes.Const) and isinstance(node.arg.value, str):
+            referenced.add(node.arg.value)
+            resolved += 1
+
+    # Any other load of `tasks` could read any task
+    loads = sum(
+        1
+        for name in tree.find_all(nodes.Name)
+        if name.name == "tasks" and name.ctx == "load"
+    )
+    if loads != resolved:
+        return None
+    return frozenset(referenced)
+
+
+def template_cache_info() -> Dict[str, int]:
+    """
+    Returns statistics for the compiled-template cache.
+
+    Returns:
+        A dictionary with the cache's "hits", "misses", "size" and "maxsize".
+    """
+    info = _compile_template.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def clear_template_cache() -> None:
+    """Discards every compiled template and resets the cache statistics."""
+    _compile_template.cache_clear()
+    _compile_expression.cache_clear()
+    find_task_references.cache_clear()
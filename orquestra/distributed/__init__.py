@@ -0,0 +1,14 @@
+from .coordinator import Coordinator, RemoteAgentExecutor, RemoteTaskError
+from .queue import BaseTaskQueue, Job, JobResult, SQLiteTaskQueue
+from .worker import Worker
+
+__all__ = [
+    "BaseTaskQueue",
+    "Coordinator",
+    "Job",
+    "JobResult",
+    "RemoteAgentExecutor",
+    "RemoteTaskError",
+    "SQLiteTaskQueue",
+    "Worker",
+]
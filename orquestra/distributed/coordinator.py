@@ -0,0 +1,133 @@
+import contextlib
+import threading
+import uuid
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional
+
+from orquestra.agents.base import BaseAgentExecutor
+from orquestra.core import Orchestrator
+from orquestra.models import Agent, Workflow
+
+from .queue import BaseTaskQueue
+
+
+class RemoteTaskError(Exception):
+    """Raised by the coordinator when a worker reports a failed job."""
+
+
+class RemoteAgentExecutor(BaseAgentExecutor):
+    """
+    An executor that publishes each call as a job and waits for a worker.
+
+    Args:
+        coordinator: The coordinator whose queue and poller are used.
+    """
+
+    def __init__(self, coordinator: "Coordinator"):
+        self.coordinator = coordinator
+
+    def execute(self, agent: Agent, instruction: str) -> str:
+        return self.coordinator.submit(agent, instruction).result()
+
+
+class Coordinator(Orchestrator):
+    """
+    Runs a workflow's scheduler locally and its agent calls on workers.
+
+    Scheduling, templating, checkpoints, tracing, and any response cache or
+    rate limiter stay in this process: only the calls themselves go through
+    the queue, as jobs carrying the agent and the rendered instruction.
+    Workers execute them with their own executors and report outputs back.
+    A background thread polls the queue for results.
+
+    Args:
+        workflow: The workflow to execute.
+        queue: The queue shared with the workers.
+        mode: The execution mode; see `Orchestrator`.
+        max_workers: The number of jobs this coordinator keeps in flight.
+        poll_interval: Seconds between polls for results.
+        **options: Further `Orchestrator` arguments, e.g. `checkpoint`.
+    """
+
+    def __init__(
+        self,
+        workflow: Workflow,
+        queue: BaseTaskQueue,
+        mode: str = "dataflow",
+        max_workers: int = 64,
+        poll_interval: float = 0.05,
+        **options: Any,
+    ):
+        super().__init__(workflow, mode=mode, max_workers=max_workers, **options)
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.run_id = uuid.uuid4().hex
+        self._remote_executor = RemoteAgentExecutor(self)
+        self._waiters: Dict[str, Future] = {}
+        self._waiters_lock = threading.Lock()
+
+    def _get_executor(self, agent: Agent) -> BaseAgentExecutor:
+        return self._remote_executor
+
+    def submit(self, agent: Agent, instruction: str) -> "Future[str]":
+        """Publishes one agent call and returns a future for its output."""
+        future: Future = Future()
+        payload = {
+            "agent": agent.model_dump(),
+            "instruction": str(instruction),
+            "prefix_length": getattr(instruction, "prefix_length", 0),
+        }
+        with self._waiters_lock:
+            job_id = self.queue.put(self.run_id, payload)
+            self._waiters[job_id] = future
+        return future
+
+    def _poll(self, stop: threading.Event) -> None:
+        while not stop.wait(self.poll_interval):
+            with self._waiters_lock:
+                job_ids = list(self._waiters)
+            if not job_ids:
+                continue
+
+            finished = self.queue.results(job_ids)
+            for result in finished:
+                with self._waiters_lock:
+                    future = self._waiters.pop(result.job_id)
+                if result.status == "done":
+                    future.set_result(result.output)
+                else:
+                    future.set_exception(RemoteTaskError(result.error))
+            if finished:
+                self.queue.delete(result.job_id for result in finished)
+
+    @contextlib.contextmanager
+    def _polling(self) -> Iterator[None]:
+        stop = threading.Event()
+        poller = threading.Thread(target=self._poll, args=(stop,), daemon=True)
+        poller.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            poller.join()
+            # Jobs of a failed run are of no use to anyone any more
+            with self._waiters_lock:
+                abandoned = list(self._waiters)
+                self._waiters.clear()
+            self.queue.delete(abandoned)
+
+    def run(
+        self,
+        targets: Optional[List[str]] = None,
+        known_outputs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        with self._polling():
+            return super().run(targets, known_outputs)
+
+    async def arun(
+        self,
+        targets: Optional[List[str]] = None,
+        known_outputs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        with self._polling():
+            return await super().arun(targets, known_outputs)
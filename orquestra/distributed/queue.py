@@ -0,0 +1,231 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+
+class Job(NamedTuple):
+    """A unit of work leased from a queue."""
+
+    job_id: str
+    run_id: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class JobResult(NamedTuple):
+    """The outcome of a finished job. `status` is "done" or "failed"."""
+
+    job_id: str
+    status: str
+    output: Any
+    error: Optional[str]
+
+
+class BaseTaskQueue(ABC):
+    """
+    Abstract base class for the queue between a coordinator and workers.
+
+    Jobs are delivered at least once. A worker leases a job for a limited
+    time and must renew the lease with `heartbeat` while it works. If the
+    lease expires, e.g. because the worker died, the job is delivered to
+    another worker, up to `max_attempts` deliveries in total.
+
+    Args:
+        max_attempts: Deliveries before a job whose lease keeps expiring is
+                      marked as failed.
+    """
+
+    def __init__(self, max_attempts: int = 3):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def put(self, run_id: str, payload: Dict[str, Any]) -> str:
+        """Enqueues a job and returns its id."""
+        pass
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        """Takes the oldest available job, or returns None if there is none."""
+        pass
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extends a lease. Returns False if the worker no longer holds it, in
+        which case the job has been, or will be, delivered elsewhere.
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, output: Any) -> bool:
+        """Records a job's output. Ignored unless the worker holds the lease."""
+        pass
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Records a job's failure. Ignored unless the worker holds the lease."""
+        pass
+
+    @abstractmethod
+    def results(self, job_ids: Iterable[str]) -> List[JobResult]:
+        """Returns the results of whichever of the given jobs have finished."""
+        pass
+
+    @abstractmethod
+    def delete(self, job_ids: Iterable[str]) -> None:
+        """Removes jobs, e.g. once their results have been collected."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteTaskQueue(BaseTaskQueue):
+    """
+    A task queue in a local SQLite database, shared by processes on one host.
+
+    The database runs in WAL mode and every state change is a conditional
+    UPDATE, so concurrent coordinators and workers never both claim a job.
+
+    Args:
+        path: The database file. Parent directories are created if needed.
+        max_attempts: Deliveries before a job whose lease keeps expiring is
+                      marked as failed.
+    """
+
+    def __init__(self, path: Union[str, Path], max_attempts: int = 3):
+        super().__init__(max_attempts=max_attempts)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " run_id TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " worker_id TEXT,"
+                " lease_expires REAL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " output TEXT,"
+                " error TEXT,"
+                " created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)"
+            )
+
+    def put(self, run_id: str, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, run_id, payload, status, created_at)"
+                " VALUES (?, ?, ?, 'pending', ?)",
+                (job_id, run_id, json.dumps(payload), time.time()),
+            )
+        return job_id
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        now = time.time()
+        with self._lock, self._conn:
+            # 1. Give up on jobs whose every delivery expired
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', worker_id = NULL,"
+                " error = 'Lease expired on every delivery; the workers may have died.'"
+                " WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            # 2. Claim the oldest pending or expired job. The UPDATE re-checks
+            # the status, so a job claimed by another process is skipped.
+            while True:
+                row = self._conn.execute(
+                    "SELECT job_id, run_id, payload, attempts FROM jobs"
+                    " WHERE status = 'pending'"
+                    " OR (status = 'leased' AND lease_expires < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, run_id, payload, attempts = row
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = 'leased', worker_id = ?,"
+                    " lease_expires = ?, attempts = attempts + 1"
+                    " WHERE job_id = ? AND attempts = ? AND (status = 'pending'"
+                    " OR (status = 'leased' AND lease_expires < ?))",
+                    (worker_id, now + lease_seconds, job_id, attempts, now),
+                ).rowcount
+                if claimed:
+                    return Job(job_id, run_id, json.loads(payload), attempts + 1)
+
+    def _update_leased(self, job_id: str, worker_id: str, sql: str, args) -> bool:
+        with self._lock, self._conn:
+            return bool(
+                self._conn.execute(
+                    f"UPDATE jobs SET {sql}"
+                    " WHERE job_id = ? AND worker_id = ? AND status = 'leased'",
+                    (*args, job_id, worker_id),
+                ).rowcount
+            )
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return self._update_leased(
+            job_id, worker_id, "lease_expires = ?", (time.time() + lease_seconds,)
+        )
+
+    def complete(self, job_id: str, worker_id: str, output: Any) -> bool:
+        return self._update_leased(
+            job_id, worker_id, "status = 'done', output = ?", (json.dumps(output),)
+        )
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._update_leased(
+            job_id, worker_id, "status = 'failed', error = ?", (error,)
+        )
+
+    def results(self, job_ids: Iterable[str]) -> List[JobResult]:
+        job_ids = list(job_ids)
+        results: List[JobResult] = []
+        with self._lock:
+            # Stay well below SQLite's limit on query parameters
+            for i in range(0, len(job_ids), 500):
+                chunk = job_ids[i : i + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT job_id, status, output, error FROM jobs"
+                    f" WHERE job_id IN ({placeholders})"
+                    " AND status IN ('done', 'failed')",
+                    chunk,
+                ).fetchall()
+                for job_id, status, output, error in rows:
+                    value = json.loads(output) if output is not None else None
+                    results.append(JobResult(job_id, status, value, error))
+        return results
+
+    def delete(self, job_ids: Iterable[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids]
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs in each status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        self._conn.close()
@@ -0,0 +1,172 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from orquestra.agents.base import BaseAgentExecutor
+from orquestra.agents.cache import BaseResponseCache, CachingAgentExecutor
+from orquestra.agents.prompts import CacheablePrompt
+from orquestra.agents.ratelimit import RateLimitedAgentExecutor, RateLimiter
+from orquestra.agents.registry import ExecutorPool, ExecutorRegistry
+from orquestra.models import Agent
+
+from .queue import BaseTaskQueue, Job
+
+
+class Worker:
+    """
+    Leases jobs from a queue and executes them with local executors.
+
+    While a job runs, a heartbeat thread renews its lease every
+    `heartbeat_interval` seconds. If the worker dies the heartbeats stop,
+    the lease expires, and the job is delivered to another worker.
+
+    Args:
+        queue: The queue shared with the coordinators.
+        worker_id: A unique name; defaults to host, pid and a random suffix.
+        concurrency: The number of jobs executed at once.
+        lease_seconds: How long a lease lasts without a heartbeat.
+        heartbeat_interval: Seconds between heartbeats; defaults to a third
+                            of `lease_seconds`.
+        poll_interval: Seconds to wait before polling an empty queue again.
+        executor_registry: Resolves provider names to executor classes.
+        response_cache: Optional cache backend for this worker's calls.
+        rate_limiter: Optional rate limiter for this worker's calls.
+    """
+
+    def __init__(
+        self,
+        queue: BaseTaskQueue,
+        worker_id: Optional[str] = None,
+        concurrency: int = 1,
+        lease_seconds: float = 30.0,
+        heartbeat_interval: Optional[float] = None,
+        poll_interval: float = 0.1,
+        executor_registry: Optional[ExecutorRegistry] = None,
+        response_cache: Optional[BaseResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        self.queue = queue
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval or lease_seconds / 3
+        self.poll_interval = poll_interval
+        self.executor_pool = ExecutorPool(executor_registry)
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+
+        self.processed = 0
+        self.failed = 0
+        self.lost_leases = 0
+        self._held: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _executor_for(self, agent: Agent) -> BaseAgentExecutor:
+        executor = self.executor_pool.get(agent.provider)
+        if self.rate_limiter is not None:
+            executor = RateLimitedAgentExecutor(executor, self.rate_limiter)
+        if self.response_cache is not None:
+            executor = CachingAgentExecutor(executor, self.response_cache)
+        return executor
+
+    def execute_job(self, job: Job) -> None:
+        """Executes a leased job and reports its output or error."""
+        with self._lock:
+            self._held[job.job_id] = job
+        try:
+            agent = Agent.model_validate(job.payload["agent"])
+            instruction = job.payload["instruction"]
+            if job.payload.get("prefix_length"):
+                instruction = CacheablePrompt(instruction, job.payload["prefix_length"])
+            output = self._executor_for(agent).execute(agent, instruction)
+        except Exception as exc:
+            reported = self.queue.fail(job.job_id, self.worker_id, repr(exc))
+            failed = True
+        else:
+            reported = self.queue.complete(job.job_id, self.worker_id, output)
+            failed = False
+        finally:
+            with self._lock:
+                self._held.pop(job.job_id, None)
+
+        with self._lock:
+            self.processed += 1
+            self.failed += failed
+            self.lost_leases += not reported
+
+    def _heartbeat(self, stop: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_interval):
+            with self._lock:
+                job_ids = list(self._held)
+            for job_id in job_ids:
+                self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds)
+
+    def _work(
+        self,
+        stop: threading.Event,
+        max_jobs: Optional[int],
+        idle_timeout: Optional[float],
+    ) -> None:
+        idle_since = time.monotonic()
+        while not stop.is_set():
+            with self._lock:
+                if max_jobs is not None and self.processed >= max_jobs:
+                    return
+            job = self.queue.lease(self.worker_id, self.lease_seconds)
+            if job is None:
+                if (
+                    idle_timeout is not None
+                    and time.monotonic() - idle_since > idle_timeout
+                ):
+                    return
+                stop.wait(self.poll_interval)
+                continue
+            self.execute_job(job)
+            idle_since = time.monotonic()
+
+    def run(
+        self,
+        stop: Optional[threading.Event] = None,
+        max_jobs: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+    ) -> int:
+        """
+        Processes jobs until stopped.
+
+        Args:
+            stop: An event that, once set, stops the worker after its
+                  current jobs.
+            max_jobs: Stop after roughly this many jobs.
+            idle_timeout: Stop after this many seconds without a job.
+
+        Returns:
+            The number of jobs processed.
+        """
+        stop = stop or threading.Event()
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(heartbeat_stop,), daemon=True
+        )
+        heartbeat.start()
+
+        threads = [
+            threading.Thread(target=self._work, args=(stop, max_jobs, idle_timeout))
+            for _ in range(self.concurrency)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+            self.executor_pool.shutdown()
+        return self.processed
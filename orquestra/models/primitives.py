@@ -1,5 +1,5 @@
 # orquestra/models/primitives.py
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -17,6 +17,19 @@ class Agent(BaseModel):
         ...,
         description="The specific model name, e.g., 'gpt-5', 'claude-opus-4-1-20250805'.",
     )
+    params: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Extra request parameters passed to the provider, e.g., 'temperature'.",
+    )
+    timeout: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Seconds before a call is abandoned and counted as failed.",
+    )
+    fallbacks: List[str] = Field(
+        default_factory=list,
+        description="Agents to try, in order, when a call times out or fails.",
+    )
 
 
 class Task(BaseModel):
@@ -38,6 +51,39 @@ class Task(BaseModel):
         default_factory=list,
         description="A list of task names that must be completed before this one starts.",
     )
+    foreach: Optional[Union[List[Any], str]] = Field(
+        None,
+        description="Runs the task once per item: a list, or a Jinja expression "
+        "such as 'inputs.documents' or 'tasks.split.output' evaluated at run time. "
+        "The instruction can reference the current item as '{{ item }}'.",
+    )
+    max_parallel: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Maximum number of foreach items executed concurrently.",
+    )
+    chunk_size: int = Field(
+        1,
+        ge=1,
+        description="Number of foreach items per call. Above 1, '{{ item }}' is "
+        "a list of items.",
+    )
+    cache: bool = Field(
+        True,
+        description="Whether responses may be served from the response cache. "
+        "Disable for nondeterministic prompts.",
+    )
+    prompt_cache: bool = Field(
+        True,
+        description="Whether shared prompt prefixes are marked for provider-side "
+        "caching. The first call with a new prefix is then sent alone, and the "
+        "task's other calls wait for it; disable when they must not wait.",
+    )
+    timeout: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Seconds before a call is abandoned; overrides the agent's.",
+    )
 
 
 class Workflow(BaseModel):
@@ -51,3 +97,9 @@ class Workflow(BaseModel):
         ..., description="A list of all agents available in this workflow."
     )
     tasks: List[Task] = Field(..., description="The sequence of tasks to execute.")
+    outputs: Optional[List[str]] = Field(
+        None,
+        description="The tasks whose outputs are the workflow's result. When set, "
+        "other outputs are dropped as soon as no remaining task reads them, and "
+        "only these are returned.",
+    )
@@ -1,3 +1,7 @@
-from .yaml_parser import parse_workflow_from_yaml
+from .yaml_parser import (
+    WorkflowCache,
+    iter_workflows_from_yaml,
+    parse_workflow_from_yaml,
+)
 
-__all__ = ["parse_workflow_from_yaml"]
+__all__ = ["WorkflowCache", "iter_workflows_from_yaml", "parse_workflow_from_yaml"]
@@ -1,23 +1,143 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+import tempfile
 from pathlib import Path
+from typing import Iterator, Optional, Union
 
+import pydantic
 import yaml
 
 from orquestra.models import Workflow
 
+# libyaml's C loader is several times faster than the pure-Python one; fall
+# back when PyYAML was built without it.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def parse_workflow_from_yaml(file_path: Path) -> Workflow:
+# Bump when the cache layout or model behaviour changes in a way the model
+# schema does not show, e.g. a validator that rewrites fields
+_CACHE_FORMAT = 1
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_digest() -> str:
+    """Hashes the Workflow model's JSON schema, once per process."""
+    schema = json.dumps(Workflow.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
+
+class WorkflowCache:
+    """
+    A directory of validated workflows, keyed by the YAML file's content.
+
+    Entries are pickled `Workflow` models, so loading a cached workflow skips
+    both YAML parsing and validation. The key covers the file's bytes, the
+    cache format, the pydantic version and the Workflow model's schema, so
+    edited files, upgrades and model changes simply miss.
+
+    Only point this at a directory you trust: entries are unpickled.
+
+    Args:
+        directory: Where cache entries are stored. Created if missing.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, content: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(
+            f"{_CACHE_FORMAT}:{pydantic.VERSION}:{_schema_digest()}\n".encode()
+        )
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[Workflow]:
+        """Returns the cached workflow, or None if missing or unreadable."""
+        try:
+            with open(self._path(key), "rb") as f:
+                workflow = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            workflow = None
+        if not isinstance(workflow, Workflow):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return workflow
+
+    def set(self, key: str, workflow: Workflow) -> None:
+        # Write then rename, so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(workflow, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self) -> None:
+        for entry in self.directory.glob("*.pickle"):
+            entry.unlink()
+
+
+def parse_workflow_from_yaml(
+    file_path: Path, cache: Optional[WorkflowCache] = None
+) -> Workflow:
     """
     Parses a YAML file and validates it against the Workflow model.
 
     Args:
         file_path: The path to the YAML file.
+        cache: If given, a validated copy of the workflow is reused while
+               the file's content is unchanged.
 
     Returns:
         A validated Workflow object.
     """
-    with open(file_path, "r") as f:
-        data = yaml.safe_load(f)
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    if cache is not None:
+        key = cache.key(content)
+        workflow = cache.get(key)
+        if workflow is not None:
+            return workflow
+
+    data = yaml.load(content, Loader=YAML_LOADER)
 
     # Pydantic's `model_validate` will parse the dict and raise
     # a ValidationError if the data is invalid.
-    return Workflow.model_validate(data)
+    workflow = Workflow.model_validate(data)
+
+    if cache is not None:
+        cache.set(key, workflow)
+    return workflow
+
+
+def iter_workflows_from_yaml(file_path: Path) -> Iterator[Workflow]:
+    """
+    Lazily parses a multi-document YAML file, one workflow per document.
+
+    Documents are read and validated one at a time, so a file holding many
+    workflows never has to be held in memory as a whole. Empty documents
+    are skipped.
+
+    Args:
+        file_path: The path to the YAML file.
+
+    Yields:
+        A validated Workflow object for each document.
+    """
+    with open(file_path, "rb") as f:
+        for data in yaml.load_all(f, Loader=YAML_LOADER):
+            if data is not None:
+                yield Workflow.model_validate(data)
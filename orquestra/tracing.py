@@ -0,0 +1,300 @@
+import itertools
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+# The span that `annotate` and `increment` write to in the current thread or
+# asyncio task.
+_current_span: ContextVar[Optional["Span"]] = ContextVar(
+    "orquestra_current_span", default=None
+)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """
+    A timed unit of work, e.g. a workflow run, a batch, a task or a call.
+
+    Args:
+        name: A human-readable name, e.g. the task name.
+        kind: The type of work: "workflow", "batch", "task", "render",
+              "queue", "call" or "executor".
+        parent: The enclosing span, if any.
+        start: The start time as a Unix timestamp; defaults to now.
+        attributes: Initial attributes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        parent: Optional["Span"] = None,
+        start: Optional[float] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else self.span_id
+        self.start = start if start is not None else time.time()
+        self.end: Optional[float] = None
+        self.thread_id = threading.get_ident()
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self) -> Optional[float]:
+        """The span's duration in seconds, or None while it is open."""
+        return None if self.end is None else self.end - self.start
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        with self._lock:
+            self.attributes[key] = value
+
+    def increment(self, key: str, amount: float = 1) -> None:
+        """Adds `amount` to a numeric attribute, starting from zero."""
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "trace_id": self.trace_id,
+            "start": self.start,
+            "end": self.end,
+            "duration": self.duration,
+            "thread_id": self.thread_id,
+            "attributes": dict(self.attributes),
+        }
+
+
+def current_span() -> Optional[Span]:
+    """Returns the active span, if tracing is enabled."""
+    return _current_span.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """
+    Sets attributes on the active span. A no-op when tracing is disabled.
+
+    Executors and executor wrappers call this to report token usage, cache
+    hits and similar per-call details.
+    """
+    span = _current_span.get()
+    if span is not None:
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+
+
+def increment(key: str, amount: float = 1) -> None:
+    """Increments a numeric attribute on the active span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.increment(key, amount)
+
+
+class SpanExporter(ABC):
+    """Abstract base class for span sinks."""
+
+    def on_start(self, span: Span) -> None:
+        """Called when a span starts. Most exporters only need `on_end`."""
+        pass
+
+    @abstractmethod
+    def on_end(self, span: Span) -> None:
+        """Called when a span ends."""
+        pass
+
+    def shutdown(self) -> None:
+        """Flushes and closes the exporter."""
+        pass
+
+
+class InMemoryExporter(SpanExporter):
+    """Collects finished spans in a list, e.g. for tests."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def find(
+        self, kind: Optional[str] = None, name: Optional[str] = None
+    ) -> List[Span]:
+        """Returns the collected spans matching a kind and/or name."""
+        return [
+            span
+            for span in self.spans
+            if (kind is None or span.kind == kind)
+            and (name is None or span.name == name)
+        ]
+
+
+class JsonLinesExporter(SpanExporter):
+    """Appends each finished span to a file as one JSON object per line."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a")
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class ChromeTraceExporter(SpanExporter):
+    """
+    Writes spans in Chrome's `trace_event` format on shutdown.
+
+    The file can be opened in chrome://tracing or https://ui.perfetto.dev
+    for a flame-style timeline, with one row per thread.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        event = {
+            "name": span.name,
+            "cat": span.kind,
+            "ph": "X",
+            "ts": span.start * 1e6,
+            "dur": (span.duration or 0.0) * 1e6,
+            "pid": os.getpid(),
+            "tid": span.thread_id,
+            "args": span.attributes,
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def shutdown(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            payload = {"traceEvents": self._events, "displayTimeUnit": "ms"}
+            self.path.write_text(json.dumps(payload, default=str))
+
+
+class ConsoleExporter(SpanExporter):
+    """Prints workflow progress, as the orchestrator always has."""
+
+    def on_start(self, span: Span) -> None:
+        if span.kind == "workflow":
+            print(f"\nExecuting workflow: '{span.name}'")
+        elif span.kind == "batch":
+            print(f"--> Running Batch {span.attributes['index'] + 1}...")
+        elif span.kind == "task":
+            if span.attributes.get("restored"):
+                print(f"    - Skipping task '{span.name}' (restored from checkpoint)")
+            else:
+                print(f"    - Executing task '{span.name}'...")
+
+    def on_end(self, span: Span) -> None:
+        if span.kind == "workflow" and "error" not in span.attributes:
+            print("Workflow execution finished.")
+
+
+class Tracer:
+    """
+    Creates spans and forwards them to exporters.
+
+    Args:
+        exporters: The sinks that receive spans. An empty list disables all
+                   output while still timing work.
+    """
+
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None):
+        self.exporters: List[SpanExporter] = list(exporters or [])
+
+    def start_span(
+        self,
+        name: str,
+        kind: str,
+        parent: Optional[Span] = None,
+        start: Optional[float] = None,
+        **attributes: Any,
+    ) -> Span:
+        """
+        Starts a span without activating it. It may be ended from another
+        thread with `end_span`.
+        """
+        span = Span(name, kind, parent=parent, start=start, attributes=attributes)
+        for exporter in self.exporters:
+            exporter.on_start(span)
+        return span
+
+    def end_span(self, span: Span, end: Optional[float] = None) -> None:
+        span.end = end if end is not None else time.time()
+        for exporter in self.exporters:
+            exporter.on_end(span)
+
+    @contextmanager
+    def activate(self, span: Span) -> Iterator[Span]:
+        """Makes `span` the target of `annotate` within the block."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(
+        self, name: str, kind: str, parent: Optional[Span] = None, **attributes: Any
+    ) -> Iterator[Span]:
+        """
+        Starts, activates and ends a span around a block.
+
+        The parent defaults to the active span. Exceptions are recorded in
+        the span's "error" attribute and re-raised.
+        """
+        parent = parent if parent is not None else _current_span.get()
+        span = self.start_span(name, kind, parent=parent, **attributes)
+        try:
+            with self.activate(span):
+                yield span
+        except BaseException as exc:
+            span.set_attribute("error", repr(exc))
+            raise
+        finally:
+            self.end_span(span)
+
+    def record(
+        self,
+        name: str,
+        kind: str,
+        start: float,
+        end: float,
+        parent: Optional[Span] = None,
+        **attributes: Any,
+    ) -> Span:
+        """Records a span for work that has already happened."""
+        span = self.start_span(name, kind, parent=parent, start=start, **attributes)
+        self.end_span(span, end=end)
+        return span
+
+    def shutdown(self) -> None:
+        """Flushes every exporter, e.g. writes the Chrome trace file."""
+        for exporter in self.exporters:
+            exporter.shutdown()
@@ -0,0 +1,78 @@
+"""Workflow, orchestrator and executor builders shared by the test modules."""
+
+import asyncio
+import threading
+import time
+
+from orquestra.agents.base import BaseAgentExecutor
+from orquestra.core import Orchestrator
+from orquestra.models import Agent, Task, Workflow
+from orquestra.tracing import Tracer
+
+# The agent `make_task` assigns by default
+WRITER = Agent(name="writer", provider="fake", model="fake-model")
+
+
+class RecordingExecutor(BaseAgentExecutor):
+    """
+    A fake executor that records its calls and how many of them overlap.
+
+    Each call waits `delay` seconds and returns `outputs[instruction]`, or
+    the instruction in angle brackets; calls with an instruction in
+    `fail_on` raise a `RuntimeError` instead. It runs natively under both
+    `run` and `arun`.
+    """
+
+    def __init__(self, delay=0.0, outputs=None, fail_on=()):
+        self.delay = delay
+        self.outputs = outputs or {}
+        self.fail_on = fail_on
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def _start(self, instruction):
+        with self.lock:
+            self.calls.append(instruction)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def _finish(self, instruction):
+        with self.lock:
+            self.in_flight -= 1
+        if instruction in self.fail_on:
+            raise RuntimeError(f"{instruction}: provider crashed")
+        return self.outputs.get(instruction, f"<{instruction}>")
+
+    def execute(self, agent, instruction):
+        self._start(instruction)
+        time.sleep(self.delay)
+        return self._finish(instruction)
+
+    async def aexecute(self, agent, instruction):
+        self._start(instruction)
+        await asyncio.sleep(self.delay)
+        return self._finish(instruction)
+
+
+def make_task(name, instruction=None, agent="writer", **options):
+    """A task for `agent` whose instruction defaults to its name."""
+    return Task(name=name, agent=agent, instruction=instruction or name, **options)
+
+
+def make_workflow(tasks, agents=(WRITER,), name="Test Workflow", **options):
+    """A workflow of `tasks`, run by the `writer` agent unless told otherwise."""
+    return Workflow(name=name, agents=list(agents), tasks=tasks, **options)
+
+
+def make_orchestrator(workflow, executor=None, provider="fake", **options):
+    """
+    An orchestrator for `workflow`, silent unless given a tracer, whose
+    calls to `provider` go to `executor` when one is given.
+    """
+    options.setdefault("tracer", Tracer([]))
+    orchestrator = Orchestrator(workflow, **options)
+    if executor is not None:
+        orchestrator.executor_instances[provider] = executor
+    return orchestrator
@@ -0,0 +1,198 @@
+import pytest
+from conftest import RecordingExecutor, make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.base import BaseAgentExecutor
+from orquestra.core import ArtifactStore, Orchestrator, SpilledOutput
+from orquestra.core.templating import render_template
+
+
+class ContextRecordingExecutor(BaseAgentExecutor):
+    """Records which outputs are held in the run context at each call."""
+
+    def __init__(self, orchestrator, output_size=8):
+        self.orchestrator = orchestrator
+        self.output_size = output_size
+        self.live = {}
+
+    def execute(self, agent, instruction):
+        task = instruction.split(":")[0]
+        self.live[task] = set(self.orchestrator.context["tasks"])
+        return f"{task}:" + "x" * self.output_size
+
+
+def _workflow(outputs=None, final_instruction="final: {{ tasks.edit.output }}"):
+    return make_workflow(
+        [
+            make_task("draft"),
+            make_task("aside"),
+            make_task("edit", "edit: {{ tasks.draft.output }}", depends_on=["draft"]),
+            make_task("final", final_instruction, depends_on=["edit", "aside"]),
+        ],
+        outputs=outputs,
+    )
+
+
+def _run(workflow, mode="sequential", **kwargs):
+    orchestrator = make_orchestrator(workflow, mode=mode, **kwargs)
+    executor = ContextRecordingExecutor(orchestrator)
+    orchestrator.executor_instances["fake"] = executor
+    return orchestrator.run(), executor
+
+
+def test_outputs_are_released_once_no_task_reads_them():
+    for mode in ("sequential", "parallel", "dataflow"):
+        context, executor = _run(_workflow(outputs=["final"]), mode=mode)
+
+        # `draft` is dropped as soon as `edit`, its only reader, finishes
+        assert "draft" not in executor.live["final"]
+        assert "edit" in executor.live["final"]
+        assert list(context["tasks"]) == ["final"]
+
+
+def test_all_outputs_are_kept_without_declared_outputs():
+    context, _ = _run(_workflow())
+    assert set(context["tasks"]) == {"draft", "aside", "edit", "final"}
+
+
+def test_dynamic_references_keep_every_output_alive():
+    """A task reading `tasks` dynamically may read anything, so nothing is dropped."""
+    workflow = _workflow(
+        outputs=["final"], final_instruction="final: {{ tasks['ed' ~ 'it'].output }}"
+    )
+    context, executor = _run(workflow)
+    assert {"draft", "aside", "edit"} <= executor.live["final"]
+    assert list(context["tasks"]) == ["final"]
+
+
+def test_unknown_outputs_are_rejected():
+    with pytest.raises(ValueError, match="Workflow output 'missing' is not a task"):
+        Orchestrator(_workflow(outputs=["missing"]))
+
+
+def test_large_outputs_are_spilled_and_read_back(tmp_path):
+    store = ArtifactStore(tmp_path, spill_threshold=100)
+    orchestrator = make_orchestrator(_workflow(outputs=["final"]), artifact_store=store)
+    executor = ContextRecordingExecutor(orchestrator, output_size=200)
+    orchestrator.executor_instances["fake"] = executor
+
+    spilled_during_run = []
+    execute = executor.execute
+
+    def spying_execute(agent, instruction):
+        spilled_during_run.append(len(store.spilled))
+        return execute(agent, instruction)
+
+    executor.execute = spying_execute
+    context = orchestrator.run()
+
+    assert max(spilled_during_run) >= 1
+    # Downstream templates rendered the full spilled text
+    assert context["tasks"]["final"]["output"] == "final:" + "x" * 200
+    assert isinstance(context["tasks"]["final"]["output"], str)
+    # Outputs are read back into the context, so the run leaves no files
+    assert store.spilled == {}
+    assert not list(tmp_path.iterdir())
+
+
+def test_orchestrators_sharing_a_store_keep_their_files_apart(tmp_path):
+    store = ArtifactStore(tmp_path, spill_threshold=100)
+    workflow = _workflow(
+        outputs=["final"],
+        final_instruction="final: {{ tasks.edit.output }} {{ tasks.aside.output }}",
+    )
+    orchestrators = []
+    for _ in range(2):
+        orchestrator = make_orchestrator(workflow, artifact_store=store)
+        orchestrator.executor_instances["fake"] = ContextRecordingExecutor(
+            orchestrator, output_size=200
+        )
+        orchestrators.append(orchestrator)
+
+    # The second run starts and ends while the first holds a spilled `aside`
+    first, second = orchestrators
+    execute = first.executor_instances["fake"].execute
+    nested = []
+
+    instructions = []
+
+    def execute_with_nested_run(agent, instruction):
+        if instruction.startswith("edit"):
+            nested.append(second.run())
+        instructions.append(instruction)
+        return execute(agent, instruction)
+
+    first.executor_instances["fake"].execute = execute_with_nested_run
+    context = first.run()
+
+    assert context == nested[0]
+    assert instructions[-1].endswith(" aside:" + "x" * 200)
+    assert not list(tmp_path.iterdir())
+
+
+def test_stores_clean_up_their_own_directory():
+    store = ArtifactStore(spill_threshold=1)
+    store.put("a", "spilled")
+    directory = store.directory
+    assert directory.exists()
+
+    del store
+    assert not directory.exists()
+
+
+def test_spilled_output_reads_through_a_memory_map(tmp_path):
+    store = ArtifactStore(tmp_path, spill_threshold=4)
+    assert store.put("small", "abc") == "abc"
+    assert store.put("items", ["not", "spilled"]) == ["not", "spilled"]
+
+    spilled = store.put("big", "héllo world")
+    assert isinstance(spilled, SpilledOutput)
+    assert spilled == "héllo world"
+    assert str(spilled).upper() == "HÉLLO WORLD"
+    assert spilled.read(0, 1) == b"h"
+    assert len(spilled) == len("héllo world")
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{{ tasks.a.output[:10] }}",
+        "{{ tasks.a.output[-1] }}",
+        "{{ tasks.a.output | truncate(20) }}",
+        "{{ 'world' in tasks.a.output }}",
+        "{{ tasks.a.output.strip().split(',') }}",
+        "{{ tasks.a.output.replace('hello', 'bye') }}",
+        "{{ tasks.a.output + '!' }}",
+        "{{ tasks.a.output | list | length }}",
+        "{{ tasks.a.output | first }}{{ tasks.a.output | last }}",
+        "{{ tasks.a.output | upper }}",
+        "{{ tasks.a.output | tojson }}",
+        "{{ {'text': tasks.a.output} | tojson }}",
+        "{{ tasks.a.output is string }}",
+    ],
+)
+def test_spilled_outputs_render_like_strings(tmp_path, template):
+    text = "  hello, world, this output is long enough to truncate  "
+    spilled = ArtifactStore(tmp_path, spill_threshold=1).put("a", text)
+    assert isinstance(spilled, SpilledOutput)
+
+    expected = render_template(template, {"tasks": {"a": {"output": text}}})
+    assert render_template(template, {"tasks": {"a": {"output": spilled}}}) == (
+        expected
+    )
+
+
+def test_foreach_over_a_spilled_output(tmp_path):
+    workflow = make_workflow(
+        [
+            make_task("split"),
+            make_task(
+                "each", "{{ item }}", foreach="tasks.split.output", depends_on=["split"]
+            ),
+        ]
+    )
+    executor = RecordingExecutor(outputs={"split": "one\ntwo\nthree"})
+    store = ArtifactStore(tmp_path, spill_threshold=1)
+    orchestrator = make_orchestrator(workflow, executor, artifact_store=store)
+
+    context = orchestrator.run()
+    assert context["tasks"]["each"]["output"] == ["<one>", "<two>", "<three>"]
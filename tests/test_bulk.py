@@ -0,0 +1,237 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from conftest import (
+    WRITER,
+    RecordingExecutor,
+    make_orchestrator,
+    make_task,
+    make_workflow,
+)
+
+from orquestra.agents.base import BatchCallError, BatchRequest
+from orquestra.agents.cache import MemoryResponseCache
+from orquestra.agents.fake import FakeAgentExecutor
+from orquestra.core import CheckpointStore
+from orquestra.models import Agent
+from orquestra.tracing import InMemoryExporter, Tracer
+
+
+class CountingBatchExecutor(FakeAgentExecutor):
+    """The fake provider, counting batch submissions and polls."""
+
+    def __init__(self, crash_on_poll=False):
+        super().__init__()
+        self.submitted = []
+        self.polls = 0
+        self.crash_on_poll = crash_on_poll
+
+    def submit_batch(self, requests):
+        self.submitted.append(list(requests))
+        return super().submit_batch(requests)
+
+    def poll_batch(self, batch_id):
+        self.polls += 1
+        if self.crash_on_poll:
+            raise RuntimeError("interrupted")
+        return super().poll_batch(batch_id)
+
+
+def _workflow(**params):
+    return make_workflow(
+        [
+            make_task("topics", "List topics.", agent="small"),
+            make_task("intro", "Write an intro.", agent="large"),
+            make_task(
+                "sections",
+                "Section {{ item }} after {{ tasks.topics.output }}",
+                agent="small",
+                foreach=["a", "b", "a"],
+                depends_on=["topics"],
+            ),
+            make_task(
+                "summary",
+                "Summarise {{ tasks.sections.output }}",
+                agent="large",
+                depends_on=["sections", "intro"],
+            ),
+        ],
+        agents=[
+            Agent(name="small", provider="fake", model="small", params=params),
+            Agent(name="large", provider="fake", model="large", params=params),
+        ],
+        name="Bulk Workflow",
+    )
+
+
+def _orchestrator(workflow, executor, **options):
+    return make_orchestrator(
+        workflow, executor, mode="bulk", batch_poll_interval=0.01, **options
+    )
+
+
+def test_bulk_mode_submits_one_batch_per_model_and_layer():
+    spans = InMemoryExporter()
+    executor = CountingBatchExecutor()
+    orchestrator = _orchestrator(_workflow(), executor, tracer=Tracer([spans]))
+
+    context = orchestrator.run()
+
+    # Layer 1: small and large; layer 2: small (with "a" sent once); layer 3
+    assert [len(requests) for requests in executor.submitted] == [1, 1, 2, 1]
+    models = [requests[0].agent.model for requests in executor.submitted]
+    assert sorted(models[:2]) == ["large", "small"] and models[2:] == ["small", "large"]
+    sections = context["tasks"]["sections"]["output"]
+    assert len(sections) == 3 and sections[0] == sections[2]
+
+    # Outputs match the direct calls'
+    reference = make_orchestrator(_workflow(), FakeAgentExecutor())
+    assert context == reference.run()
+
+    bulk_spans = spans.find("bulk", "fake/small")
+    assert [span.attributes["requests"] for span in bulk_spans] == [1, 2]
+    assert bulk_spans[0].attributes["batch_id"].startswith("fakebatch_")
+
+
+def test_bulk_mode_polls_until_batches_end():
+    executor = CountingBatchExecutor()
+    agent = WRITER.model_copy(update={"params": {"batch_latency": 0.05}})
+    workflow = make_workflow([make_task("t", "Go.")], agents=[agent])
+
+    _orchestrator(workflow, executor).run()
+
+    assert len(executor.submitted) == 1
+    assert executor.polls > 1
+
+
+def test_resumed_runs_poll_the_checkpointed_batch(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints.db")
+    crashed = CountingBatchExecutor(crash_on_poll=True)
+    with pytest.raises(RuntimeError, match="interrupted"):
+        _orchestrator(_workflow(), crashed, checkpoint=store).run()
+    assert len(crashed.submitted) == 2
+
+    spans = InMemoryExporter()
+    executor = CountingBatchExecutor()
+    orchestrator = _orchestrator(
+        _workflow(), executor, checkpoint=store, resume=True, tracer=Tracer([spans])
+    )
+    context = orchestrator.run()
+
+    # The first layer's batches are reused; later layers are submitted anew
+    assert len(executor.submitted) == 2
+    resumed = [span.attributes["resumed"] for span in spans.find("bulk", "fake/small")]
+    assert resumed == [True, False]
+    assert set(context["tasks"]) == {"topics", "intro", "sections", "summary"}
+
+    # Collected batches are forgotten
+    assert store._conn.execute("SELECT COUNT(*) FROM batch_jobs").fetchone() == (0,)
+
+
+def test_failed_batch_calls_fail_their_task():
+    spans = InMemoryExporter()
+    executor = CountingBatchExecutor()
+    orchestrator = _orchestrator(
+        _workflow(error_rate=1.0), executor, tracer=Tracer([spans])
+    )
+
+    with pytest.raises(BatchCallError, match="to fake/large failed: Simulated"):
+        orchestrator.run()
+    # Every failed task in the layer is marked, and later layers never start
+    for name in ("topics", "intro"):
+        (task_span,) = spans.find("task", name)
+        assert "BatchCallError" in task_span.attributes["error"]
+    assert spans.find("task", "sections") == []
+
+
+def test_cached_calls_and_other_providers_skip_the_batch():
+    cache = MemoryResponseCache()
+    workflow = make_workflow(
+        [
+            make_task("one", "One.", agent="batched"),
+            make_task("two", "Two.", agent="direct"),
+        ],
+        agents=[
+            Agent(name="batched", provider="fake", model="m"),
+            Agent(name="direct", provider="direct", model="m"),
+        ],
+    )
+    executor = CountingBatchExecutor()
+    orchestrator = _orchestrator(workflow, executor, response_cache=cache)
+    orchestrator.executor_instances["direct"] = RecordingExecutor()
+
+    first = orchestrator.run()
+    assert first["tasks"]["two"]["output"] == "<Two.>"
+    assert len(executor.submitted) == 1
+
+    orchestrator = _orchestrator(workflow, executor, response_cache=cache)
+    orchestrator.executor_instances["direct"] = RecordingExecutor()
+    assert orchestrator.run() == first
+    assert len(executor.submitted) == 1
+
+
+def test_openai_batches(mocker):
+    mock_openai_class = mocker.patch("orquestra.agents.openai.OpenAI")
+    client = mock_openai_class.return_value
+    client.files.create.return_value.id = "file-in"
+    client.batches.create.return_value.id = "batch_1"
+    client.batches.retrieve.return_value = MagicMock(
+        status="completed", output_file_id="file-out", error_file_id=None
+    )
+    lines = [
+        {
+            "custom_id": "req-0",
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": "Batched output."}}]},
+            },
+        },
+        {
+            "custom_id": "req-1",
+            "response": {"status_code": 400, "body": {"error": "bad request"}},
+        },
+    ]
+    client.files.content.return_value.text = "\n".join(map(json.dumps, lines))
+
+    from orquestra.agents.openai import OpenAIAgentExecutor
+
+    executor = OpenAIAgentExecutor()
+    agent = Agent(name="a", provider="openai", model="gpt-4o")
+    batch_id = executor.submit_batch(
+        [BatchRequest("req-0", agent, "One."), BatchRequest("req-1", agent, "Two.")]
+    )
+
+    assert batch_id == "batch_1"
+    _, kwargs = client.files.create.call_args
+    assert kwargs["purpose"] == "batch"
+    first = json.loads(kwargs["file"][1].decode("utf-8").splitlines()[0])
+    assert first["custom_id"] == "req-0"
+    assert first["body"]["messages"] == [{"role": "user", "content": "One."}]
+    results = executor.poll_batch("batch_1")
+    assert results["req-0"].output == "Batched output."
+    assert results["req-1"].error == "bad request"
+
+    client.batches.retrieve.return_value.status = "in_progress"
+    assert executor.poll_batch("batch_1") is None
+
+
+def test_anthropic_batches_in_bulk_mode(mocker):
+    mock_anthropic_class = mocker.patch("orquestra.agents.anthropic.Anthropic")
+    batches = mock_anthropic_class.return_value.messages.batches
+    batches.create.return_value.id = "msgbatch_1"
+    batches.retrieve.return_value.processing_status = "ended"
+    entry = MagicMock(custom_id="req-0")
+    entry.result.type = "succeeded"
+    entry.result.message.content[0].text = "Batched Claude output."
+    batches.results.return_value = [entry]
+
+    agent = Agent(name="c", provider="anthropic", model="claude-3-opus")
+    workflow = make_workflow([make_task("t", "Hello.", agent="c")], agents=[agent])
+    context = make_orchestrator(workflow, mode="bulk").run()
+
+    assert context["tasks"]["t"]["output"] == "Batched Claude output."
+    (requests,) = batches.create.call_args.kwargs.values()
+    assert requests[0]["custom_id"] == "req-0"
+    assert requests[0]["params"]["model"] == "claude-3-opus"
+    batches.retrieve.assert_called_once_with("msgbatch_1")
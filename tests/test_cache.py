@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+from conftest import WRITER, make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.cache import (
+    CachingAgentExecutor,
+    MemoryResponseCache,
+    SQLiteResponseCache,
+    make_cache_key,
+)
+from orquestra.agents.fake import FakeAgentExecutor
+
+
+def test_cache_key_covers_request_but_not_agent_name():
+    """Keys depend on provider, model, params and instruction only."""
+    key = make_cache_key(WRITER, "Hello")
+    renamed = WRITER.model_copy(update={"name": "other"})
+    assert make_cache_key(renamed, "Hello") == key
+    assert make_cache_key(WRITER, "Hello!") != key
+    assert make_cache_key(WRITER.model_copy(update={"model": "m2"}), "Hello") != key
+    with_params = WRITER.model_copy(update={"params": {"temperature": 0}})
+    assert make_cache_key(with_params, "Hello") != key
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # "a" is now the most recently used
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats() == {"hits": 3, "misses": 1}
+
+
+def test_memory_cache_expires_entries():
+    cache = MemoryResponseCache(ttl=0.05)
+    cache.set("a", "1")
+    assert cache.get("a") == "1"
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    path = tmp_path / "cache" / "responses.db"
+    cache = SQLiteResponseCache(path, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+    cache.close()
+
+    reopened = SQLiteResponseCache(path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("a") is None
+    assert reopened.get("c") == "3"
+
+
+def test_sqlite_cache_expires_entries(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "responses.db", ttl=0.05)
+    cache.set("a", "1")
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_caching_executor_serves_repeated_requests():
+    inner = FakeAgentExecutor()
+    executor = CachingAgentExecutor(inner, MemoryResponseCache())
+
+    first = executor.execute(WRITER, "Hello")
+    assert executor.execute(WRITER, "Hello") == first
+    assert asyncio.run(executor.aexecute(WRITER, "Hello")) == first
+    executor.execute(WRITER, "Goodbye")
+
+    assert inner.calls == 2
+
+
+def _workflow(cache_draft=True):
+    return make_workflow(
+        [
+            make_task("draft", "Draft", cache=cache_draft),
+            make_task("edit", "Edit: {{ tasks.draft.output }}", depends_on=["draft"]),
+        ]
+    )
+
+
+def test_orchestrator_reruns_are_served_from_sqlite_cache(tmp_path):
+    """A second run with the same cache makes no real calls."""
+    path = tmp_path / "responses.db"
+    inner = FakeAgentExecutor()
+
+    orchestrator = make_orchestrator(
+        _workflow(), inner, response_cache=SQLiteResponseCache(path)
+    )
+    first = orchestrator.run()
+    assert inner.calls == 2
+
+    orchestrator = make_orchestrator(
+        _workflow(), inner, response_cache=SQLiteResponseCache(path)
+    )
+    second = orchestrator.run()
+    assert inner.calls == 2
+    assert second == first
+    assert orchestrator.response_cache.stats() == {"hits": 2, "misses": 0}
+
+
+def test_orchestrator_honours_per_task_opt_out():
+    """Tasks with `cache: false` always call the executor."""
+    inner = FakeAgentExecutor()
+    cache = MemoryResponseCache()
+    for _ in range(2):
+        make_orchestrator(
+            _workflow(cache_draft=False), inner, response_cache=cache
+        ).run()
+
+    # draft is called on both runs; edit, rendered the same, is served once
+    assert inner.calls == 3
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from conftest import RecordingExecutor, make_orchestrator, make_task, make_workflow
+
+from orquestra.core import CheckpointStore, Orchestrator
+
+
+def _workflow(summary_instruction="Summarise {{ tasks.a.output }}"):
+    return make_workflow(
+        [
+            make_task("a", "A"),
+            make_task("b", "B"),
+            make_task("summary", summary_instruction, depends_on=["a"]),
+            make_task(
+                "final",
+                "Final {{ tasks.summary.output }} {{ tasks.b.output }}",
+                depends_on=["summary", "b"],
+            ),
+        ],
+        name="Checkpointed Workflow",
+    )
+
+
+def _run(workflow, executor, store, **kwargs):
+    return make_orchestrator(workflow, executor, checkpoint=store, **kwargs).run()
+
+
+def test_outputs_are_checkpointed_and_resumed_after_a_crash(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints.db")
+    crashing = RecordingExecutor(fail_on=["Summarise <A>"])
+    with pytest.raises(RuntimeError, match="provider crashed"):
+        _run(_workflow(), crashing, store)
+
+    # The first batch survived the crash
+    assert set(store.load("Checkpointed Workflow")) == {"a", "b"}
+
+    executor = RecordingExecutor()
+    final_context = _run(_workflow(), executor, store, resume=True)
+
+    assert executor.calls == ["Summarise <A>", "Final <Summarise <A>> <B>"]
+    assert final_context["tasks"]["a"]["output"] == "<A>"
+    assert final_context["tasks"]["final"]["output"] == "<Final <Summarise <A>> <B>>"
+
+
+@pytest.mark.parametrize("mode", ["sequential", "parallel", "dataflow"])
+def test_incremental_rerun_only_executes_changed_tasks(tmp_path, mode):
+    store = CheckpointStore(tmp_path / "checkpoints.db")
+    _run(_workflow(), RecordingExecutor(), store, mode=mode)
+
+    # Nothing changed: nothing is executed
+    executor = RecordingExecutor()
+    _run(_workflow(), executor, store, mode=mode, incremental=True)
+    assert executor.calls == []
+
+    # Editing summary re-runs it and its dependent, but not a or b
+    executor = RecordingExecutor()
+    edited = _workflow("Briefly summarise {{ tasks.a.output }}")
+    final_context = _run(edited, executor, store, mode=mode, incremental=True)
+    assert executor.calls == [
+        "Briefly summarise <A>",
+        "Final <Briefly summarise <A>> <B>",
+    ]
+    assert final_context["tasks"]["b"]["output"] == "<B>"
+
+
+def test_incremental_arun(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints.db")
+    _run(_workflow(), RecordingExecutor(), store)
+
+    executor = RecordingExecutor()
+    orchestrator = make_orchestrator(
+        _workflow("Summarise again {{ tasks.a.output }}"),
+        executor,
+        checkpoint=store,
+        incremental=True,
+    )
+    asyncio.run(orchestrator.arun())
+
+    assert executor.calls == [
+        "Summarise again <A>",
+        "Final <Summarise again <A>> <B>",
+    ]
+
+
+def test_resume_requires_a_checkpoint_store():
+    with pytest.raises(ValueError, match="require a checkpoint store"):
+        Orchestrator(_workflow(), resume=True)
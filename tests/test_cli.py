@@ -0,0 +1,128 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from orquestra.cli.main import app
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "simple_workflow.yaml"
+
+
+def _write_workflow(path):
+    path.write_text(
+        """
+name: CLI Workflow
+agents:
+  - name: writer
+    provider: fake
+    model: fake-model
+    params:
+      output_tokens: 3
+tasks:
+  - name: draft
+    agent: writer
+    instruction: Write.
+  - name: edit
+    agent: writer
+    instruction: "Edit {{ tasks.draft.output }}"
+    depends_on: [draft]
+  - name: title
+    agent: writer
+    instruction: Title.
+"""
+    )
+    return path
+
+
+def test_plan_prints_batches_and_critical_path(capsys):
+    assert app(["plan", str(EXAMPLE), "--json"]) == 0
+    plan = json.loads(capsys.readouterr().out)
+    assert plan == {
+        "batches": [["draft_post"], ["edit_post"]],
+        "critical_path": ["draft_post", "edit_post"],
+        "estimated_makespan": 2.0,
+        "estimates": {"draft_post": 1.0, "edit_post": 1.0},
+    }
+
+
+def test_plan_estimates_come_from_earlier_runs(tmp_path, capsys):
+    workflow = _write_workflow(tmp_path / "workflow.yaml")
+    stats = tmp_path / "stats.json"
+    assert app(["run", str(workflow), "--json", "--stats", str(stats)]) == 0
+    capsys.readouterr()
+
+    assert app(["plan", str(workflow), "--json", "--stats", str(stats)]) == 0
+    plan = json.loads(capsys.readouterr().out)
+    # The fake provider answers instantly, so every estimate is well below
+    # the one-second default for tasks without history
+    assert set(plan["estimates"]) == {"draft", "edit", "title"}
+    assert all(estimate < 0.5 for estimate in plan["estimates"].values())
+    assert plan["estimated_makespan"] < 1.0
+
+
+def test_plan_does_not_import_provider_sdks():
+    """Planning needs no provider, so the CLI must not load any SDK."""
+    code = (
+        "import sys; from orquestra.cli.main import app; "
+        f"app(['plan', {str(EXAMPLE)!r}]); "
+        "print('openai' in sys.modules, 'anthropic' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split()[-2:] == ["False", "False"]
+
+
+def test_run_prints_the_final_context_as_json(tmp_path, capsys):
+    workflow = _write_workflow(tmp_path / "workflow.yaml")
+    argv = ["run", str(workflow), "--json", "--max-workers", "2"]
+    assert app(argv + ["--provider-limit", "fake=1"]) == 0
+
+    context = json.loads(capsys.readouterr().out)
+    assert set(context["tasks"]) == {"draft", "edit", "title"}
+    assert len(context["tasks"]["edit"]["output"].split()) == 3
+
+
+def test_run_resumes_from_the_cache_dir(tmp_path, capsys):
+    workflow = _write_workflow(tmp_path / "workflow.yaml")
+    cache_dir = tmp_path / "cache"
+    assert app(["run", str(workflow), "--cache-dir", str(cache_dir)]) == 0
+    capsys.readouterr()
+
+    assert app(["run", str(workflow), "--cache-dir", str(cache_dir), "--resume"]) == 0
+    out = capsys.readouterr().out
+    assert "Skipping task 'draft' (restored from checkpoint)" in out
+    assert (cache_dir / "workflows").is_dir()
+
+
+def test_run_targets_reuse_known_outputs(tmp_path, capsys):
+    workflow = _write_workflow(tmp_path / "workflow.yaml")
+    known = tmp_path / "context.json"
+    known.write_text(json.dumps({"tasks": {"draft": {"output": "saved draft"}}}))
+
+    argv = ["run", str(workflow), "--json", "--target", "edit"]
+    assert app(argv + ["--known-outputs", str(known)]) == 0
+
+    context = json.loads(capsys.readouterr().out)
+    assert context["tasks"]["draft"]["output"] == "saved draft"
+    assert set(context["tasks"]) == {"draft", "edit"}
+
+
+def test_profile_reports_phase_timings(tmp_path, capsys):
+    workflow = _write_workflow(tmp_path / "workflow.yaml")
+    trace = tmp_path / "trace.json"
+    argv = ["run", str(workflow), "--json", "--profile", "--trace", str(trace)]
+    assert app(argv) == 0
+
+    timings = json.loads(capsys.readouterr().err)["timings"]
+    assert {"load", "setup", "run", "call_total", "total"} <= set(timings)
+    assert json.loads(trace.read_text())["traceEvents"]
+
+
+def test_errors_are_reported_with_a_non_zero_exit_code(tmp_path, capsys):
+    assert app(["run", str(tmp_path / "missing.yaml")]) == 1
+    assert "Error:" in capsys.readouterr().err
+
+    workflow = _write_workflow(tmp_path / "workflow.yaml")
+    assert app(["run", str(workflow), "--resume"]) == 1
+    assert "--resume needs" in capsys.readouterr().err
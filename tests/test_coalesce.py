@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from conftest import (
+    WRITER,
+    RecordingExecutor,
+    make_orchestrator,
+    make_task,
+    make_workflow,
+)
+
+from orquestra.agents.coalesce import CoalescingAgentExecutor, SingleFlight
+from orquestra.core import WorkflowRunner
+from orquestra.tracing import InMemoryExporter, Tracer
+
+
+def _workflow(items, cache=True, **params):
+    agent = WRITER.model_copy(update={"params": params})
+    return make_workflow(
+        [make_task("classify", "{{ item }}", foreach=items, cache=cache)],
+        agents=[agent],
+    )
+
+
+def _orchestrator(workflow, single_flight, tracer=None):
+    executor = RecordingExecutor(delay=0.05, fail_on=["fail"])
+    orchestrator = make_orchestrator(
+        workflow,
+        executor,
+        mode="dataflow",
+        single_flight=single_flight,
+        tracer=tracer or Tracer([]),
+    )
+    return orchestrator, executor
+
+
+def test_identical_concurrent_calls_are_made_once():
+    single_flight = SingleFlight()
+    spans = InMemoryExporter()
+    orchestrator, executor = _orchestrator(
+        _workflow(["a", "b", "a", "a"], cache=False), single_flight, Tracer([spans])
+    )
+
+    context = orchestrator.run()
+
+    assert context["tasks"]["classify"]["output"] == ["<a>", "<b>", "<a>", "<a>"]
+    assert sorted(executor.calls) == ["a", "b"]
+    assert single_flight.stats() == {"calls": 2, "coalesced": 2}
+    coalesced = [span.attributes["coalesced"] for span in spans.find("call")]
+    assert sorted(coalesced) == [False, False, True, True]
+
+
+def test_async_calls_are_coalesced():
+    single_flight = SingleFlight()
+    orchestrator, executor = _orchestrator(_workflow(["a"] * 5), single_flight)
+
+    context = asyncio.run(orchestrator.arun())
+
+    assert context["tasks"]["classify"]["output"] == ["<a>"] * 5
+    assert executor.calls == ["a"]
+
+
+def test_waiters_share_the_error():
+    orchestrator, executor = _orchestrator(_workflow(["fail"] * 3), SingleFlight())
+    with pytest.raises(RuntimeError, match="provider crashed"):
+        orchestrator.run()
+    assert executor.calls == ["fail"]
+
+
+def test_finished_calls_are_not_reused():
+    single_flight = SingleFlight()
+    orchestrator, executor = _orchestrator(_workflow(["a"]), single_flight)
+    orchestrator.run()
+    orchestrator.run()
+    assert executor.calls == ["a", "a"]
+
+
+def test_calls_are_coalesced_across_runs():
+    single_flight = SingleFlight()
+    runner = WorkflowRunner(max_in_flight=4, single_flight=single_flight)
+
+    results = runner.run_all(_workflow(["a"], latency=0.05) for _ in range(4))
+
+    assert all(result.error is None for result in results)
+    assert runner.executor_instances["fake"].calls == 1
+    assert single_flight.coalesced == 3
+
+
+def test_a_cancelled_leader_hands_the_call_to_a_waiter():
+    single_flight = SingleFlight()
+    first, first_executor = _orchestrator(_workflow(["a"]), single_flight)
+    second, second_executor = _orchestrator(_workflow(["a"]), single_flight)
+
+    async def main():
+        leading = asyncio.create_task(first.arun())
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(second.arun())
+        await asyncio.sleep(0.01)
+        leading.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leading
+        return await waiting
+
+    # The other run is not cancelled with the leader: it makes the call
+    context = asyncio.run(main())
+    assert context["tasks"]["classify"]["output"] == ["<a>"]
+    assert first_executor.calls == second_executor.calls == ["a"]
+
+
+def test_a_closed_leading_stream_hands_the_call_to_a_waiter():
+    single_flight = SingleFlight()
+    executor = CoalescingAgentExecutor(RecordingExecutor(delay=0.05), single_flight)
+    outputs = []
+    waiter = threading.Thread(
+        target=lambda: outputs.extend(executor.stream(WRITER, "a"))
+    )
+
+    # Start the leader's call, then wait on it from another thread
+    leading = executor.stream(WRITER, "a")
+    next(leading)
+    waiter.start()
+    time.sleep(0.01)
+    leading.close()
+    waiter.join()
+
+    assert outputs == ["<a>"]
+    assert executor.executor.calls == ["a", "a"]
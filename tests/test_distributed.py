@@ -0,0 +1,179 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from conftest import WRITER, make_orchestrator, make_task, make_workflow
+
+from orquestra.distributed import (
+    Coordinator,
+    RemoteTaskError,
+    SQLiteTaskQueue,
+    Worker,
+)
+from orquestra.tracing import Tracer
+
+
+def _workflow(error_rate=0.0):
+    params = {"latency": 0.01, "output_tokens": 4, "error_rate": error_rate}
+    return make_workflow(
+        [
+            make_task("draft", "Write."),
+            make_task("notes", "Notes."),
+            make_task(
+                "edit",
+                "Edit {{ tasks.draft.output }} {{ tasks.notes.output }}",
+                depends_on=["draft", "notes"],
+            ),
+            make_task(
+                "translate",
+                "Translate {{ item }}",
+                foreach=["a", "b", "c"],
+                depends_on=["edit"],
+            ),
+        ],
+        agents=[WRITER.model_copy(update={"params": params})],
+        name="Distributed Workflow",
+    )
+
+
+def _start_worker(queue, **kwargs):
+    stop = threading.Event()
+    worker = Worker(queue, poll_interval=0.01, **kwargs)
+    thread = threading.Thread(target=worker.run, args=(stop,))
+    thread.start()
+    return worker, stop, thread
+
+
+def test_queue_leases_each_job_once(tmp_path):
+    queue = SQLiteTaskQueue(tmp_path / "queue.db")
+    job_id = queue.put("run", {"x": 1})
+
+    job = queue.lease("w1", lease_seconds=30)
+    assert job.job_id == job_id and job.payload == {"x": 1} and job.attempts == 1
+    assert queue.lease("w2", lease_seconds=30) is None
+
+    assert queue.complete(job_id, "w1", "output")
+    (result,) = queue.results([job_id])
+    assert (result.status, result.output) == ("done", "output")
+
+
+def test_expired_leases_are_redelivered(tmp_path):
+    """A job whose worker stops heartbeating goes to another worker."""
+    queue = SQLiteTaskQueue(tmp_path / "queue.db")
+    job_id = queue.put("run", {})
+
+    queue.lease("dead", lease_seconds=0.05)
+    assert queue.heartbeat(job_id, "dead", lease_seconds=0.05)
+    time.sleep(0.1)
+
+    job = queue.lease("alive", lease_seconds=30)
+    assert job.job_id == job_id and job.attempts == 2
+
+    # The dead worker lost its lease, so its late result is ignored
+    assert not queue.heartbeat(job_id, "dead", lease_seconds=30)
+    assert not queue.complete(job_id, "dead", "stale")
+    assert queue.complete(job_id, "alive", "fresh")
+    assert queue.results([job_id])[0].output == "fresh"
+
+
+def test_jobs_fail_after_max_attempts(tmp_path):
+    queue = SQLiteTaskQueue(tmp_path / "queue.db", max_attempts=2)
+    job_id = queue.put("run", {})
+    for worker_id in ("w1", "w2"):
+        assert queue.lease(worker_id, lease_seconds=0.01) is not None
+        time.sleep(0.02)
+
+    assert queue.lease("w3", lease_seconds=30) is None
+    (result,) = queue.results([job_id])
+    assert result.status == "failed" and "Lease expired" in result.error
+
+
+def test_coordinator_matches_a_local_run(tmp_path):
+    """Workers produce the same context as running in-process."""
+    expected = make_orchestrator(_workflow(), mode="dataflow").run()
+
+    queue = SQLiteTaskQueue(tmp_path / "queue.db")
+    workers = [_start_worker(queue, concurrency=2) for _ in range(2)]
+    try:
+        coordinator = Coordinator(
+            _workflow(), queue, poll_interval=0.01, tracer=Tracer([])
+        )
+        context = coordinator.run()
+    finally:
+        for _, stop, thread in workers:
+            stop.set()
+            thread.join()
+
+    assert context == expected
+    assert sum(worker.processed for worker, _, _ in workers) == 6
+    # Collected jobs are removed from the queue
+    assert queue.counts() == {}
+
+
+def test_jobs_of_a_dead_worker_are_redelivered(tmp_path):
+    """A job leased by a worker that never reports back is run elsewhere."""
+    queue = SQLiteTaskQueue(tmp_path / "queue.db")
+    coordinator = Coordinator(_workflow(), queue, poll_interval=0.01, tracer=Tracer([]))
+
+    worker = Worker(queue, lease_seconds=0.2, poll_interval=0.01)
+    stop = threading.Event()
+
+    # A "worker" leases the first job and dies; only then does a real one start
+    def dead_then_real_worker():
+        while queue.lease("dead", lease_seconds=0.2) is None:
+            time.sleep(0.005)
+        worker.run(stop)
+
+    thread = threading.Thread(target=dead_then_real_worker)
+    thread.start()
+    try:
+        context = coordinator.run()
+    finally:
+        stop.set()
+        thread.join()
+    assert set(context["tasks"]) == {"draft", "notes", "edit", "translate"}
+
+
+def test_worker_errors_fail_the_run(tmp_path):
+    queue = SQLiteTaskQueue(tmp_path / "queue.db")
+    worker, stop, thread = _start_worker(queue)
+    try:
+        coordinator = Coordinator(
+            _workflow(error_rate=1.0), queue, poll_interval=0.01, tracer=Tracer([])
+        )
+        with pytest.raises(RemoteTaskError, match="FakeProviderError"):
+            coordinator.run()
+    finally:
+        stop.set()
+        thread.join()
+    assert worker.failed >= 1
+
+
+def test_worker_processes(tmp_path):
+    """Separate `orquestra-cli worker` processes execute a coordinator's jobs."""
+    queue_path = tmp_path / "queue.db"
+    queue = SQLiteTaskQueue(queue_path)
+    command = [
+        sys.executable,
+        "-c",
+        "import sys; from orquestra.cli.main import app; sys.exit(app())",
+        "worker",
+        str(queue_path),
+        "--idle-timeout",
+        "1",
+    ]
+    processes = [
+        subprocess.Popen(command, stdout=subprocess.PIPE, text=True) for _ in range(2)
+    ]
+    try:
+        coordinator = Coordinator(
+            _workflow(), queue, poll_interval=0.01, tracer=Tracer([])
+        )
+        context = coordinator.run()
+    finally:
+        outputs = [process.communicate(timeout=30)[0] for process in processes]
+
+    assert len(context["tasks"]["translate"]["output"]) == 3
+    assert all("processed" in output for output in outputs)
@@ -0,0 +1,65 @@
+import asyncio
+import statistics
+import time
+
+import pytest
+
+from orquestra.agents.fake import FakeAgentExecutor, FakeProviderError
+from orquestra.core import Orchestrator
+from orquestra.models import Agent, Task, Workflow
+
+
+def _agent(**params):
+    return Agent(name="fake_agent", provider="fake", model="fake-model", params=params)
+
+
+def test_outputs_are_deterministic_and_sized():
+    executor = FakeAgentExecutor()
+    agent = _agent(output_tokens=5)
+    first = executor.execute(agent, "hello")
+    assert first == executor.execute(agent, "hello")
+    assert first != executor.execute(agent, "goodbye")
+    assert len(first.split(" ")) == 5
+    assert "".join(executor.stream(agent, "hello")) == first
+    assert executor.calls == 4
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "exponential", "lognormal"])
+def test_latency_distributions_have_the_configured_mean(distribution):
+    executor = FakeAgentExecutor()
+    agent = _agent(latency=0.5, latency_distribution=distribution, seed=7)
+    samples = [executor.sample_latency(agent) for _ in range(4000)]
+    assert statistics.mean(samples) == pytest.approx(0.5, rel=0.1)
+    assert min(samples) >= 0
+
+
+def test_constant_latency_is_applied():
+    executor = FakeAgentExecutor()
+    start = time.perf_counter()
+    asyncio.run(executor.aexecute(_agent(latency=0.05), "x"))
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_error_rate_injects_transient_errors():
+    executor = FakeAgentExecutor()
+    with pytest.raises(FakeProviderError) as excinfo:
+        executor.execute(_agent(error_rate=1.0), "x")
+    assert excinfo.value.status_code == 503
+
+
+def test_fake_provider_is_registered_with_the_orchestrator():
+    workflow = Workflow(
+        name="Offline Workflow",
+        agents=[_agent(latency=0.01, output_tokens=3)],
+        tasks=[
+            Task(name="a", agent="fake_agent", instruction="A"),
+            Task(
+                name="b",
+                agent="fake_agent",
+                instruction="B {{ tasks.a.output }}",
+                depends_on=["a"],
+            ),
+        ],
+    )
+    final_context = Orchestrator(workflow).run()
+    assert len(final_context["tasks"]["b"]["output"].split(" ")) == 3
@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+from conftest import RecordingExecutor, make_orchestrator, make_workflow
+
+from orquestra.models import Task
+
+
+def _run(tasks, executor, **kwargs):
+    orchestrator = make_orchestrator(make_workflow(tasks), executor, **kwargs)
+    return orchestrator.run()
+
+
+def test_foreach_over_inputs_gathers_outputs_in_order():
+    executor = RecordingExecutor()
+    final_context = _run(
+        [
+            Task(
+                name="summaries",
+                agent="writer",
+                instruction="Summarise {{ item }} ({{ index }})",
+                inputs={"documents": ["doc-a", "doc-b", "doc-c"]},
+                foreach="inputs.documents",
+            ),
+            Task(
+                name="report",
+                agent="writer",
+                instruction="{% for s in tasks.summaries.output %}{{ s }};{% endfor %}",
+                depends_on=["summaries"],
+            ),
+        ],
+        executor,
+    )
+
+    assert final_context["tasks"]["summaries"]["output"] == [
+        "<Summarise doc-a (0)>",
+        "<Summarise doc-b (1)>",
+        "<Summarise doc-c (2)>",
+    ]
+    assert final_context["tasks"]["report"]["output"] == (
+        "<<Summarise doc-a (0)>;<Summarise doc-b (1)>;<Summarise doc-c (2)>;>"
+    )
+
+
+@pytest.mark.parametrize(
+    "split_output", ['["x", "y", "z"]', "x\ny\n\nz\n"], ids=["json", "lines"]
+)
+def test_foreach_over_upstream_output(split_output):
+    executor = RecordingExecutor(outputs={"Split": split_output})
+    final_context = _run(
+        [
+            Task(name="split", agent="writer", instruction="Split"),
+            Task(
+                name="process",
+                agent="writer",
+                instruction="Process {{ item }}",
+                foreach="tasks.split.output",
+                depends_on=["split"],
+            ),
+        ],
+        executor,
+        mode="dataflow",
+    )
+    assert final_context["tasks"]["process"]["output"] == [
+        "<Process x>",
+        "<Process y>",
+        "<Process z>",
+    ]
+
+
+def test_foreach_respects_max_parallel():
+    executor = RecordingExecutor(delay=0.05)
+    _run(
+        [
+            Task(
+                name="fan",
+                agent="writer",
+                instruction="{{ item }}",
+                foreach=list(range(8)),
+                max_parallel=3,
+            )
+        ],
+        executor,
+        mode="parallel",
+    )
+    assert executor.peak == 3
+    assert len(executor.calls) == 8
+
+
+@pytest.mark.parametrize("mode", ["parallel", "dataflow"])
+def test_foreach_items_respect_the_global_cap(mode):
+    executor = RecordingExecutor(delay=0.05)
+    _run(
+        [
+            Task(
+                name=f"fan_{i}",
+                agent="writer",
+                instruction=f"{i}: {{{{ item }}}}",
+                foreach=list(range(8)),
+            )
+            for i in range(4)
+        ],
+        executor,
+        mode=mode,
+        max_workers=4,
+    )
+    assert executor.peak == 4
+    assert len(executor.calls) == 32
+
+
+def test_foreach_chunks_items_per_call():
+    executor = RecordingExecutor()
+    final_context = _run(
+        [
+            Task(
+                name="batched",
+                agent="writer",
+                instruction="{{ item | join(',') }}",
+                foreach=["a", "b", "c", "d", "e"],
+                chunk_size=2,
+            )
+        ],
+        executor,
+    )
+    assert executor.calls == ["a,b", "c,d", "e"]
+    assert final_context["tasks"]["batched"]["output"] == ["<a,b>", "<c,d>", "<e>"]
+
+
+def test_foreach_under_arun():
+    executor = RecordingExecutor(delay=0.05)
+    workflow = make_workflow(
+        [
+            Task(
+                name="fan",
+                agent="writer",
+                instruction="item {{ item }}",
+                foreach=list(range(6)),
+                max_parallel=2,
+            )
+        ]
+    )
+    orchestrator = make_orchestrator(workflow, executor)
+    final_context = asyncio.run(orchestrator.arun())
+
+    assert final_context["tasks"]["fan"]["output"] == [f"<item {i}>" for i in range(6)]
+    assert executor.peak == 2
+
+
+def test_foreach_with_empty_list_makes_no_calls():
+    executor = RecordingExecutor()
+    final_context = _run(
+        [Task(name="fan", agent="writer", instruction="{{ item }}", foreach=[])],
+        executor,
+    )
+    assert final_context["tasks"]["fan"]["output"] == []
+    assert executor.calls == []
+
+
+def test_foreach_must_resolve_to_a_list():
+    with pytest.raises(ValueError, match="must resolve to a list"):
+        _run(
+            [
+                Task(
+                    name="fan",
+                    agent="writer",
+                    instruction="{{ item }}",
+                    inputs={"count": 3},
+                    foreach="inputs.count",
+                )
+            ],
+            RecordingExecutor(),
+        )
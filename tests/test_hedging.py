@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from conftest import (
+    WRITER,
+    RecordingExecutor,
+    make_orchestrator,
+    make_task,
+    make_workflow,
+)
+
+from orquestra.agents.base import BaseAgentExecutor
+from orquestra.agents.fake import FakeAgentExecutor
+from orquestra.agents.hedging import AgentTimeoutError, Hedger
+from orquestra.core import Orchestrator
+from orquestra.models import Agent
+from orquestra.tracing import InMemoryExporter, Tracer
+
+
+class SlowFirstCallExecutor(BaseAgentExecutor):
+    """A fake executor whose first call hangs and later calls are fast."""
+
+    def __init__(self, first_delay=5.0):
+        self.first_delay = first_delay
+        self.calls = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def _next_delay(self):
+        with self._lock:
+            self.calls += 1
+            return self.first_delay if self.calls == 1 else 0.01
+
+    def execute(self, agent, instruction):
+        time.sleep(self._next_delay())
+        return f"{agent.name}: {instruction}"
+
+    async def aexecute(self, agent, instruction):
+        try:
+            await asyncio.sleep(self._next_delay())
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"{agent.name}: {instruction}"
+
+
+def _workflow(**agent_options):
+    return make_workflow(
+        [make_task("draft", "Write.", agent="primary")],
+        agents=[
+            Agent(name="primary", provider="slow", model="m", **agent_options),
+            Agent(name="backup", provider="backup", model="m"),
+        ],
+    )
+
+
+def _warm_hedger(latency=0.01, samples=20):
+    hedger = Hedger(percentile=0.9, min_samples=samples)
+    for _ in range(samples):
+        hedger.record(Agent(name="primary", provider="slow", model="m"), latency)
+    return hedger
+
+
+def test_hedge_delay_is_a_learned_percentile():
+    hedger = Hedger(percentile=0.9, min_samples=10)
+    agent = Agent(name="a", provider="p", model="m")
+    for latency in range(1, 10):
+        hedger.record(agent, float(latency))
+    assert hedger.hedge_delay(agent) is None
+
+    hedger.record(agent, 10.0)
+    assert hedger.hedge_delay(agent) == 9.0
+
+
+def test_slow_calls_are_hedged():
+    hedger = _warm_hedger()
+    executor = SlowFirstCallExecutor()
+    orchestrator = make_orchestrator(_workflow(), executor, "slow", hedger=hedger)
+
+    started = time.perf_counter()
+    context = orchestrator.run()
+
+    assert time.perf_counter() - started < 1.0
+    assert context["tasks"]["draft"]["output"] == "primary: Write."
+    assert executor.calls == 2
+    assert hedger.stats() == {"hedges": 1, "hedge_wins": 1, "timeouts": 0}
+
+
+def test_async_hedging_cancels_the_losing_call():
+    hedger = _warm_hedger()
+    executor = SlowFirstCallExecutor()
+    orchestrator = make_orchestrator(_workflow(), executor, "slow", hedger=hedger)
+
+    context = asyncio.run(orchestrator.arun())
+
+    assert context["tasks"]["draft"]["output"] == "primary: Write."
+    assert executor.cancelled == 1
+
+
+def test_timeouts_fail_the_call():
+    orchestrator = make_orchestrator(
+        _workflow(timeout=0.05), SlowFirstCallExecutor(), "slow"
+    )
+
+    started = time.perf_counter()
+    with pytest.raises(AgentTimeoutError, match="timed out after 0.05s"):
+        orchestrator.run()
+    assert time.perf_counter() - started < 1.0
+
+
+def test_timeouts_and_errors_fall_back_to_other_agents():
+    spans = InMemoryExporter()
+    orchestrator = make_orchestrator(
+        _workflow(timeout=0.05, fallbacks=["backup"]),
+        SlowFirstCallExecutor(),
+        "slow",
+        tracer=Tracer([spans]),
+    )
+    orchestrator.executor_instances["backup"] = SlowFirstCallExecutor(first_delay=0)
+
+    context = orchestrator.run()
+
+    assert context["tasks"]["draft"]["output"] == "backup: Write."
+    (task_span,) = spans.find("task", "draft")
+    assert task_span.attributes["fallbacks"] == 1
+    calls = spans.find("call", "draft")
+    assert [call.attributes["agent"] for call in calls] == ["primary", "backup"]
+
+    # Errors fall back too, and the last agent's error is raised
+    primary = RecordingExecutor(fail_on=["Write."])
+    backup = RecordingExecutor(fail_on=["Write."])
+    orchestrator = make_orchestrator(
+        _workflow(fallbacks=["backup"]), primary, "slow", mode="dataflow"
+    )
+    orchestrator.executor_instances["backup"] = backup
+    with pytest.raises(RuntimeError, match="provider crashed"):
+        orchestrator.run()
+    assert primary.calls == backup.calls == ["Write."]
+
+
+class StalledStreamExecutor(BaseAgentExecutor):
+    """A fake executor whose streams stall before their first chunk."""
+
+    def execute(self, agent, instruction):
+        return instruction
+
+    def stream(self, agent, instruction):
+        time.sleep(5)
+        yield instruction
+
+    async def astream(self, agent, instruction):
+        await asyncio.sleep(5)
+        yield instruction
+
+
+def test_deadlines_keep_streams_chunked():
+    agent = WRITER.model_copy(update={"timeout": 5})
+    workflow = make_workflow([make_task("draft", "Write.")], agents=[agent])
+    for hedger in (None, _warm_hedger()):
+        chunks = []
+        orchestrator = make_orchestrator(
+            workflow,
+            FakeAgentExecutor(),
+            hedger=hedger,
+            on_chunk=lambda task, chunk: chunks.append(chunk),
+        )
+        context = orchestrator.run()
+        assert len(chunks) == 16
+        assert "".join(chunks) == context["tasks"]["draft"]["output"]
+        assert orchestrator.task_metrics["draft"]["chunks"] == 16
+
+        chunks.clear()
+        asyncio.run(orchestrator.arun())
+        assert len(chunks) == 16
+
+
+def test_deadlines_bound_the_first_chunk_of_streams():
+    orchestrator = make_orchestrator(
+        _workflow(timeout=0.05),
+        StalledStreamExecutor(),
+        "slow",
+        on_chunk=lambda task, chunk: None,
+    )
+
+    started = time.perf_counter()
+    with pytest.raises(AgentTimeoutError):
+        orchestrator.run()
+    with pytest.raises(AgentTimeoutError):
+        asyncio.run(orchestrator.arun())
+    assert time.perf_counter() - started < 1.0
+
+
+def test_unknown_fallback_agents_are_rejected():
+    with pytest.raises(ValueError, match="Fallback agent 'missing'"):
+        Orchestrator(_workflow(fallbacks=["missing"]))
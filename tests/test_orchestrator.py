@@ -1,5 +1,11 @@
-from unittest.mock import MagicMock
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
 
+import pytest
+from conftest import RecordingExecutor, make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.base import BaseAgentExecutor
 from orquestra.core import Orchestrator
 from orquestra.models import Agent, Task, Workflow
 
@@ -95,3 +101,236 @@ def test_orchestrator_run_with_mocked_anthropic(mocker):
     # 7. Assert that the final context contains the mocked output
     expected_output = "Mocked Claude output."
     assert final_context["tasks"]["editing_task"]["output"] == expected_output
+
+
+class SyncOnlyExecutor(RecordingExecutor):
+    """The shared recording executor, without native async support."""
+
+    aexecute = BaseAgentExecutor.aexecute
+
+
+def _fan_out_workflow(width):
+    tasks = [make_task(f"task_{i}", f"item {i}") for i in range(width)]
+    tasks.append(
+        make_task(
+            "gather",
+            "{{ tasks.task_0.output }} | {{ tasks.task_1.output }}",
+            depends_on=[f"task_{i}" for i in range(width)],
+        )
+    )
+    return make_workflow(tasks, name="Fan-out Workflow")
+
+
+def test_parallel_mode_runs_batch_concurrently():
+    """Tasks in the same batch overlap when running in parallel mode."""
+    executor = RecordingExecutor(delay=0.2)
+    orchestrator = make_orchestrator(
+        _fan_out_workflow(4), executor, mode="parallel", max_workers=4
+    )
+
+    start = time.perf_counter()
+    final_context = orchestrator.run()
+    elapsed = time.perf_counter() - start
+
+    # Four 0.2s calls plus the gather call: well under the 1.0s sequential cost
+    assert elapsed < 0.8
+    assert executor.peak == 4
+    assert final_context["tasks"]["task_3"]["output"] == "<item 3>"
+    assert final_context["tasks"]["gather"]["output"] == ("<<item 0> | <item 1>>")
+    assert list(final_context["tasks"]) == [f"task_{i}" for i in range(4)] + ["gather"]
+
+
+def test_parallel_mode_respects_provider_limit():
+    """A per-provider cap bounds in-flight calls below the worker count."""
+    executor = RecordingExecutor(delay=0.05)
+    orchestrator = make_orchestrator(
+        _fan_out_workflow(6),
+        executor,
+        mode="parallel",
+        max_workers=6,
+        provider_limits={"fake": 2},
+    )
+    orchestrator.run()
+
+    assert executor.peak == 2
+
+
+def test_sequential_mode_is_default():
+    """The default mode executes one task at a time."""
+    executor = RecordingExecutor(delay=0.01)
+    orchestrator = make_orchestrator(_fan_out_workflow(3), executor)
+    orchestrator.run()
+
+    assert orchestrator.mode == "sequential"
+    assert executor.peak == 1
+
+
+def test_unknown_mode_raises_error():
+    with pytest.raises(ValueError, match="Unknown execution mode"):
+        Orchestrator(_fan_out_workflow(1), mode="turbo")
+
+
+class DelayByInstructionExecutor(BaseAgentExecutor):
+    """A fake executor whose latency is encoded in the instruction."""
+
+    def __init__(self):
+        self.started = {}
+        self.origin = time.perf_counter()
+
+    def execute(self, agent, instruction):
+        name, delay = instruction.split(":")[:2]
+        self.started[name] = time.perf_counter() - self.origin
+        time.sleep(float(delay))
+        return name
+
+
+def test_dataflow_mode_does_not_wait_for_unrelated_tasks():
+    """
+    slow -> after_slow and fast -> after_fast: after_fast must start as
+    soon as fast finishes instead of waiting for slow.
+    """
+    tasks = [
+        make_task("slow", "slow:0.4"),
+        make_task("fast", "fast:0.05"),
+        make_task(
+            "after_slow", "after_slow:0.05:{{ tasks.slow.output }}", depends_on=["slow"]
+        ),
+        make_task(
+            "after_fast", "after_fast:0.05:{{ tasks.fast.output }}", depends_on=["fast"]
+        ),
+    ]
+    workflow = make_workflow(tasks, name="Uneven DAG")
+    executor = DelayByInstructionExecutor()
+    orchestrator = make_orchestrator(workflow, executor, mode="dataflow", max_workers=4)
+
+    final_context = orchestrator.run()
+
+    assert executor.started["after_fast"] < 0.3
+    assert executor.started["after_slow"] >= 0.4
+    assert {name: v["output"] for name, v in final_context["tasks"].items()} == {
+        "slow": "slow",
+        "fast": "fast",
+        "after_slow": "after_slow",
+        "after_fast": "after_fast",
+    }
+
+
+def test_arun_drives_many_calls_on_one_event_loop():
+    """Hundreds of native-async calls overlap without one thread each."""
+    executor = RecordingExecutor(delay=0.2)
+    orchestrator = make_orchestrator(_fan_out_workflow(300), executor, max_workers=1000)
+
+    start = time.perf_counter()
+    final_context = asyncio.run(orchestrator.arun())
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2.0
+    assert executor.peak == 300
+    assert final_context["tasks"]["gather"]["output"] == ("<<item 0> | <item 1>>")
+
+
+def test_arun_respects_limits():
+    """The global and per-provider limits bound in-flight coroutines."""
+    executor = RecordingExecutor(delay=0.01)
+    orchestrator = make_orchestrator(_fan_out_workflow(10), executor, max_workers=5)
+    asyncio.run(orchestrator.arun())
+    assert executor.peak == 5
+
+    executor = RecordingExecutor(delay=0.01)
+    orchestrator = make_orchestrator(
+        _fan_out_workflow(10), executor, max_workers=5, provider_limits={"fake": 3}
+    )
+    asyncio.run(orchestrator.arun())
+    assert executor.peak == 3
+
+
+def test_arun_calls_waiting_on_a_provider_hold_no_global_slot():
+    """A busy provider does not keep calls to other providers waiting."""
+    agents = [
+        Agent(name="slow_agent", provider="slow", model="m"),
+        Agent(name="fast_agent", provider="fast", model="m"),
+    ]
+    # The busy provider's tasks are dispatched first (ties go by name)
+    tasks = [make_task(f"busy_{i}", agent="slow_agent") for i in range(4)] + [
+        make_task(f"other_{i}", agent="fast_agent") for i in range(4)
+    ]
+    workflow = make_workflow(tasks, agents=agents)
+    slow = RecordingExecutor(delay=0.2)
+    fast = RecordingExecutor(delay=0.01)
+    orchestrator = make_orchestrator(
+        workflow, slow, "slow", max_workers=2, provider_limits={"slow": 1}
+    )
+    orchestrator.executor_instances["fast"] = fast
+
+    finished = []
+    aexecute = fast.aexecute
+
+    async def timed_aexecute(agent, instruction):
+        output = await aexecute(agent, instruction)
+        finished.append(time.perf_counter() - start)
+        return output
+
+    fast.aexecute = timed_aexecute
+    start = time.perf_counter()
+    asyncio.run(orchestrator.arun())
+
+    # The fast calls share the free slot while the first slow call runs,
+    # rather than queueing behind slow calls that wait on their provider
+    assert len(finished) == 4
+    assert max(finished) < 0.15
+    assert slow.peak == 1
+
+
+def test_arun_adapts_sync_executors():
+    """Executors that only implement `execute` run in worker threads."""
+    executor = SyncOnlyExecutor(delay=0.1)
+    orchestrator = make_orchestrator(_fan_out_workflow(4), executor, max_workers=4)
+
+    final_context = asyncio.run(orchestrator.arun())
+
+    assert executor.peak == 4
+    assert final_context["tasks"]["task_2"]["output"] == "<item 2>"
+
+
+def test_arun_with_mocked_async_openai(mocker):
+    """The OpenAI executor uses the AsyncOpenAI client under arun."""
+    mocker.patch("orquestra.agents.openai.OpenAI")
+    mock_async_class = mocker.patch("orquestra.agents.openai.AsyncOpenAI")
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "Async LLM output."
+    mock_create = AsyncMock(return_value=mock_response)
+    mock_async_class.return_value.chat.completions.create = mock_create
+
+    test_agent = Agent(name="test_writer", provider="openai", model="gpt-5")
+    test_task = Task(name="writing_task", agent="test_writer", instruction="Hi.")
+    workflow = Workflow(name="Async OpenAI", agents=[test_agent], tasks=[test_task])
+
+    final_context = asyncio.run(Orchestrator(workflow).arun())
+
+    mock_create.assert_awaited_once_with(
+        model="gpt-5", messages=[{"role": "user", "content": "Hi."}]
+    )
+    assert final_context["tasks"]["writing_task"]["output"] == "Async LLM output."
+
+
+def test_arun_with_mocked_async_anthropic(mocker):
+    """The Anthropic executor uses the AsyncAnthropic client under arun."""
+    mocker.patch("orquestra.agents.anthropic.Anthropic")
+    mock_async_class = mocker.patch("orquestra.agents.anthropic.AsyncAnthropic")
+    mock_response = MagicMock()
+    mock_response.content[0].text = "Async Claude output."
+    mock_create = AsyncMock(return_value=mock_response)
+    mock_async_class.return_value.messages.create = mock_create
+
+    test_agent = Agent(name="test_editor", provider="anthropic", model="claude")
+    test_task = Task(name="editing_task", agent="test_editor", instruction="Hi.")
+    workflow = Workflow(name="Async Claude", agents=[test_agent], tasks=[test_task])
+
+    final_context = asyncio.run(Orchestrator(workflow).arun())
+
+    mock_create.assert_awaited_once_with(
+        model="claude",
+        max_tokens=1024,
+        messages=[{"role": "user", "content": "Hi."}],
+    )
+    assert final_context["tasks"]["editing_task"]["output"] == "Async Claude output."
@@ -1,6 +1,10 @@
 from pathlib import Path
 
-from orquestra.parsers import parse_workflow_from_yaml
+from orquestra.parsers import (
+    WorkflowCache,
+    iter_workflows_from_yaml,
+    parse_workflow_from_yaml,
+)
 
 
 def test_parse_valid_yaml_workflow():
@@ -24,3 +28,90 @@ def test_parse_valid_yaml_workflow():
     assert workflow.tasks[1].name == "edit_post"
     assert workflow.tasks[1].depends_on == ["draft_post"]
     print("\nYAML parser test passed successfully!")
+
+
+def _write_workflow(path, name="Cached Workflow", instruction="Say hi."):
+    path.write_text(
+        f"""
+name: {name}
+agents:
+  - name: writer
+    provider: fake
+    model: fake-model
+tasks:
+  - name: greet
+    agent: writer
+    instruction: {instruction}
+"""
+    )
+
+
+def test_workflow_cache_reuses_unchanged_files(tmp_path):
+    """A second parse of an unchanged file is served from the cache."""
+    path = tmp_path / "workflow.yaml"
+    _write_workflow(path)
+    cache = WorkflowCache(tmp_path / "cache")
+
+    first = parse_workflow_from_yaml(path, cache=cache)
+    second = parse_workflow_from_yaml(path, cache=cache)
+
+    assert second == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_workflow_cache_misses_when_the_file_changes(tmp_path):
+    """Editing the file changes the content hash, so it is parsed again."""
+    path = tmp_path / "workflow.yaml"
+    cache = WorkflowCache(tmp_path / "cache")
+    _write_workflow(path)
+    parse_workflow_from_yaml(path, cache=cache)
+
+    _write_workflow(path, instruction="Say bye.")
+    workflow = parse_workflow_from_yaml(path, cache=cache)
+
+    assert workflow.tasks[0].instruction == "Say bye."
+    assert cache.misses == 2
+
+
+def test_workflow_cache_misses_when_the_model_changes(tmp_path, monkeypatch):
+    """Entries pickled for another Workflow schema are never loaded."""
+    from orquestra.parsers import yaml_parser
+
+    cache = WorkflowCache(tmp_path / "cache")
+    before = cache.key(b"name: same")
+    monkeypatch.setattr(
+        yaml_parser.Workflow,
+        "model_json_schema",
+        classmethod(lambda cls: {"properties": {"new_field": {}}}),
+    )
+    yaml_parser._schema_digest.cache_clear()
+    try:
+        assert cache.key(b"name: same") != before
+    finally:
+        yaml_parser._schema_digest.cache_clear()
+
+
+def test_workflow_cache_ignores_corrupt_entries(tmp_path):
+    """An unreadable cache entry is treated as a miss and rewritten."""
+    path = tmp_path / "workflow.yaml"
+    _write_workflow(path)
+    cache = WorkflowCache(tmp_path / "cache")
+    key = cache.key(path.read_bytes())
+    (tmp_path / "cache" / f"{key}.pickle").write_bytes(b"not a pickle")
+
+    assert parse_workflow_from_yaml(path, cache=cache).name == "Cached Workflow"
+    assert cache.get(key) is not None
+
+
+def test_iter_workflows_from_multi_document_yaml(tmp_path):
+    """Each document of a multi-document file is yielded as a workflow."""
+    first, second = tmp_path / "a.yaml", tmp_path / "b.yaml"
+    _write_workflow(first, name="First")
+    _write_workflow(second, name="Second")
+    combined = tmp_path / "workflows.yaml"
+    combined.write_text(first.read_text() + "---\n" + second.read_text() + "---\n")
+
+    workflows = iter_workflows_from_yaml(combined)
+
+    assert next(workflows).name == "First"
+    assert [w.name for w in workflows] == ["Second"]
@@ -0,0 +1,180 @@
+import asyncio
+import pickle
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from conftest import RecordingExecutor, make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.prompts import CacheablePrompt, PrefixDetector, split_prompt
+from orquestra.models import Agent
+from orquestra.tracing import InMemoryExporter, Tracer
+
+# A long shared preamble, above the default minimum prefix length
+PREAMBLE = "You are a meticulous reviewer. " * 200
+
+
+def test_prefix_detector_marks_foreach_items():
+    detector = PrefixDetector(min_length=100)
+    items = detector.tag("anthropic", "claude", [PREAMBLE + "A", PREAMBLE + "B"])
+
+    assert items == [PREAMBLE + "A", PREAMBLE + "B"]
+    assert all(isinstance(item, CacheablePrompt) for item in items)
+    assert split_prompt(items[1]) == (PREAMBLE, "B")
+
+
+def test_prefix_detector_compares_calls_to_the_same_model():
+    detector = PrefixDetector(min_length=100)
+    (first,) = detector.tag("openai", "gpt-5", [PREAMBLE + "first task"])
+    (other_model,) = detector.tag("openai", "gpt-4o", [PREAMBLE + "other"])
+    (second,) = detector.tag("openai", "gpt-5", [PREAMBLE + "second task"])
+
+    # Nothing to share with yet, and a different model has its own cache
+    assert split_prompt(first) == ("", PREAMBLE + "first task")
+    assert split_prompt(other_model)[0] == ""
+    # The breakpoint is moved back to a word boundary
+    assert split_prompt(second) == (PREAMBLE, "second task")
+
+
+def test_short_prefixes_are_ignored():
+    detector = PrefixDetector(min_length=100)
+    items = detector.tag("anthropic", "claude", ["Summarize: A", "Summarize: B"])
+    assert not any(isinstance(item, CacheablePrompt) for item in items)
+
+
+def test_cacheable_prompts_pickle():
+    prompt = pickle.loads(pickle.dumps(CacheablePrompt("shared rest", 7)))
+    assert split_prompt(prompt) == ("shared ", "rest")
+
+
+def test_the_first_call_with_a_prefix_leads_its_warm_up():
+    detector = PrefixDetector(min_length=100)
+    first, second = detector.tag(
+        "anthropic", "claude", [PREAMBLE + "A", PREAMBLE + "B"]
+    )
+
+    future, leader = detector.warm_up("anthropic", "claude", first)
+    assert leader
+    assert detector.warm_up("anthropic", "claude", second) == (future, False)
+    assert detector.warm_up("anthropic", "other", second)[1]
+    assert detector.warm_up("anthropic", "claude", "plain") == (None, False)
+
+
+def _workflow(provider="fake", model="fake-model", items=("a.py", "b.py"), **options):
+    agent = Agent(name="reviewer", provider=provider, model=model)
+    return make_workflow(
+        [
+            make_task(
+                "review",
+                PREAMBLE + "Review {{ item }}",
+                agent="reviewer",
+                foreach=list(items),
+                **options,
+            )
+        ],
+        agents=[agent],
+    )
+
+
+def _run_foreach(workflow, method):
+    spans = InMemoryExporter()
+    executor = RecordingExecutor(delay=0.05)
+    orchestrator = make_orchestrator(
+        workflow, executor, mode="dataflow", tracer=Tracer([spans])
+    )
+    if method == "run":
+        orchestrator.run()
+    else:
+        asyncio.run(orchestrator.arun())
+    return executor, spans
+
+
+@pytest.mark.parametrize("method", ["run", "arun"])
+def test_siblings_wait_for_the_call_writing_the_prompt_cache(method):
+    items = [f"{i}.py" for i in range(4)]
+    executor, spans = _run_foreach(_workflow(items=items), method)
+
+    assert all(isinstance(call, CacheablePrompt) for call in executor.calls)
+    # The first call runs alone; the other three then overlap
+    assert executor.peak == 3
+    assert len(spans.find("queue", "warm_up")) == 3
+
+
+@pytest.mark.parametrize("method", ["run", "arun"])
+def test_tasks_can_opt_out_of_prompt_caching(method):
+    items = [f"{i}.py" for i in range(4)]
+    executor, spans = _run_foreach(_workflow(items=items, prompt_cache=False), method)
+
+    assert not any(isinstance(call, CacheablePrompt) for call in executor.calls)
+    # Every call starts at once
+    assert executor.peak == 4
+    assert spans.find("queue", "warm_up") == []
+
+
+def test_anthropic_requests_get_cache_breakpoints(mocker):
+    mock_anthropic_class = mocker.patch("orquestra.agents.anthropic.Anthropic")
+    mock_create = MagicMock()
+    mock_create.return_value = SimpleNamespace(
+        content=[SimpleNamespace(text="ok")],
+        usage=SimpleNamespace(
+            input_tokens=5,
+            output_tokens=1,
+            cache_read_input_tokens=1200,
+            cache_creation_input_tokens=0,
+        ),
+    )
+    mock_anthropic_class.return_value.messages.create = mock_create
+
+    spans = InMemoryExporter()
+    make_orchestrator(_workflow("anthropic", "claude"), tracer=Tracer([spans])).run()
+
+    content = mock_create.call_args_list[0].kwargs["messages"][0]["content"]
+    assert content == [
+        {
+            "type": "text",
+            "text": PREAMBLE + "Review ",
+            "cache_control": {"type": "ephemeral"},
+        },
+        {"type": "text", "text": "a.py"},
+    ]
+    (call,) = spans.find("call", "review[0]")
+    assert call.attributes["cache_read_tokens"] == 1200
+    assert call.attributes["cache_write_tokens"] == 0
+
+
+def test_openai_requests_share_a_prompt_cache_key(mocker):
+    mock_openai_class = mocker.patch("orquestra.agents.openai.OpenAI")
+    mock_create = MagicMock()
+    mock_create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+        usage=SimpleNamespace(
+            prompt_tokens=1300,
+            completion_tokens=1,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1280),
+        ),
+    )
+    mock_openai_class.return_value.chat.completions.create = mock_create
+
+    spans = InMemoryExporter()
+    make_orchestrator(_workflow("openai", "gpt-5"), tracer=Tracer([spans])).run()
+
+    requests = [call.kwargs for call in mock_create.call_args_list]
+    keys = {request["prompt_cache_key"] for request in requests}
+    assert len(keys) == 1
+    # The shared prefix leads every prompt
+    assert all(
+        request["messages"][0]["content"].startswith(PREAMBLE) for request in requests
+    )
+    (call,) = spans.find("call", "review[1]")
+    assert call.attributes["cache_read_tokens"] == 1280
+
+
+def test_prompt_caching_can_be_disabled(mocker):
+    mock_anthropic_class = mocker.patch("orquestra.agents.anthropic.Anthropic")
+    mock_create = mock_anthropic_class.return_value.messages.create
+    mock_create.return_value.content[0].text = "ok"
+
+    make_orchestrator(_workflow("anthropic", "claude"), prompt_caching=False).run()
+
+    content = mock_create.call_args_list[0].kwargs["messages"][0]["content"]
+    assert content == PREAMBLE + "Review a.py"
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from conftest import make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.cache import SQLiteResponseCache
+from orquestra.models import Agent
+
+
+def _workflow(pool):
+    return make_workflow(
+        [
+            make_task("split", '["alpha beta gamma", "x"]', agent="parse"),
+            make_task(
+                "summarize",
+                "{{ item }}",
+                agent="shorten",
+                foreach="tasks.split.output",
+                depends_on=["split"],
+            ),
+        ],
+        agents=[
+            Agent(
+                name="parse",
+                provider="python",
+                model="json:loads",
+                params={"pool": pool},
+            ),
+            Agent(
+                name="shorten",
+                provider="python",
+                model="textwrap:shorten",
+                params={"pool": pool, "width": 12, "placeholder": "..."},
+            ),
+        ],
+        name="Local Steps",
+    )
+
+
+@pytest.mark.parametrize("pool", ["process", "thread"])
+def test_python_tasks_call_importable_functions(pool):
+    orchestrator = make_orchestrator(_workflow(pool), mode="dataflow")
+    context = orchestrator.run()
+
+    # Non-string outputs are kept as they are, and feed `foreach` directly
+    assert context["tasks"]["split"]["output"] == ["alpha beta gamma", "x"]
+    assert context["tasks"]["summarize"]["output"] == ["alpha...", "x"]
+
+
+def test_orchestrators_shut_down_the_pools_they_own():
+    orchestrator = make_orchestrator(_workflow("process"))
+    orchestrator.run()
+
+    executor = orchestrator.executor_instances["python"]
+    assert executor._process_pool is None
+    # The executor stays usable and starts a new pool on demand
+    agent = Agent(name="a", provider="python", model="json:loads")
+    assert executor.execute(agent, "[1]") == [1]
+    executor.shutdown()
+
+
+def test_non_string_outputs_are_not_cached(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "responses.db")
+    orchestrator = make_orchestrator(_workflow("thread"), response_cache=cache)
+
+    context = orchestrator.run()
+
+    assert context["tasks"]["split"]["output"] == ["alpha beta gamma", "x"]
+    # Only the string outputs of the foreach items are stored
+    assert len(cache) == 2
+    cache.close()
+
+
+@pytest.mark.parametrize("run", ["run", "arun"])
+def test_python_tasks_stream_with_on_chunk(tmp_path, run):
+    from orquestra.agents.coalesce import SingleFlight
+
+    chunks = []
+    cache = SQLiteResponseCache(tmp_path / "responses.db")
+    orchestrator = make_orchestrator(
+        _workflow("thread"),
+        mode="dataflow",
+        on_chunk=lambda task, chunk: chunks.append((task, chunk)),
+        response_cache=cache,
+        single_flight=SingleFlight(),
+    )
+
+    if run == "run":
+        context = orchestrator.run()
+    else:
+        context = asyncio.run(orchestrator.arun())
+
+    # The list is kept whole, and only text reaches the chunk sink
+    assert context["tasks"]["split"]["output"] == ["alpha beta gamma", "x"]
+    assert context["tasks"]["summarize"]["output"] == ["alpha...", "x"]
+    assert all(isinstance(chunk, str) for _, chunk in chunks)
+    assert ("summarize[0]", "alpha...") in chunks
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_python_tasks_run_under_arun():
+    orchestrator = make_orchestrator(_workflow("process"))
+    context = asyncio.run(orchestrator.arun())
+    assert context["tasks"]["summarize"]["output"] == ["alpha...", "x"]
+
+
+def test_bad_callables_and_pools_are_rejected():
+    from orquestra.agents.python import PythonAgentExecutor
+
+    executor = PythonAgentExecutor()
+    agent = Agent(name="a", provider="python", model="json:missing")
+    with pytest.raises(ValueError, match="Could not import 'json:missing'"):
+        executor.execute(agent, "{}")
+
+    agent = Agent(name="a", provider="python", model="json:loads", params={"pool": "x"})
+    with pytest.raises(ValueError, match="Unknown pool 'x'"):
+        executor.execute(agent, "{}")
@@ -0,0 +1,233 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from conftest import WRITER, make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.base import BaseAgentExecutor
+from orquestra.agents.ratelimit import (
+    ModelLimiter,
+    RateLimit,
+    RateLimitedAgentExecutor,
+    RateLimiter,
+    RetryPolicy,
+    TokenBucket,
+    classify_error,
+)
+from orquestra.models import Agent
+
+FAST_RETRIES = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeAPIError(Exception):
+    """Mimics the SDK error shape: a status code and the HTTP response."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(status_code, headers)
+
+
+class ThrottlingExecutor(BaseAgentExecutor):
+    """A fake executor that fails with the queued errors before succeeding."""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def execute(self, agent, instruction):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            error = self.errors.pop(0) if self.errors else None
+        try:
+            time.sleep(self.delay)
+            if error is not None:
+                raise error
+            return f"done: {instruction}"
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_classify_error():
+    throttled = classify_error(FakeAPIError(429, {"retry-after": "2"}))
+    assert throttled.retryable and throttled.throttled
+    assert throttled.retry_after == 2.0
+    assert classify_error(FakeAPIError(503)).retryable
+    assert classify_error(FakeAPIError(529)).retryable
+    assert not classify_error(FakeAPIError(400)).retryable
+    assert classify_error(ConnectionError()).retryable
+    assert not classify_error(ValueError("bad")).retryable
+
+
+def test_retry_policy_honours_retry_after_and_bounds():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    assert all(0 <= policy.delay(10) <= 4.0 for _ in range(100))
+    assert policy.delay(0, retry_after=3.0) >= 3.0
+    assert policy.delay(0, retry_after=100.0) == 4.0
+
+
+def test_token_bucket_reports_wait_time():
+    bucket = TokenBucket(per_minute=60)  # one token per second
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(2) == pytest.approx(2.0, abs=0.05)
+
+
+def test_transient_errors_are_retried():
+    inner = ThrottlingExecutor([FakeAPIError(429), FakeAPIError(503)])
+    limiter = RateLimiter(retry_policy=FAST_RETRIES)
+    executor = RateLimitedAgentExecutor(inner, limiter)
+
+    assert executor.execute(WRITER, "hello") == "done: hello"
+    assert inner.calls == 3
+    assert limiter.stats() == {"retries": 2, "throttled": 1}
+
+
+def test_retries_are_bounded_and_permanent_errors_raise():
+    limiter = RateLimiter(retry_policy=FAST_RETRIES)
+    always_throttled = ThrottlingExecutor([FakeAPIError(429)] * 10)
+    with pytest.raises(FakeAPIError, match="429"):
+        RateLimitedAgentExecutor(always_throttled, limiter).execute(WRITER, "x")
+    assert always_throttled.calls == 4
+
+    bad_request = ThrottlingExecutor([FakeAPIError(400)])
+    with pytest.raises(FakeAPIError, match="400"):
+        RateLimitedAgentExecutor(bad_request, limiter).execute(WRITER, "x")
+    assert bad_request.calls == 1
+
+
+def test_aimd_backs_off_on_throttle_and_recovers():
+    model_limiter = ModelLimiter(RateLimit(max_concurrency=8))
+    model_limiter.acquire(1)
+    model_limiter.release(throttled=True, retry_after=0.05)
+    assert model_limiter.concurrency == 4
+    assert model_limiter.paused_until > time.monotonic()
+
+    for _ in range(20):
+        model_limiter.acquire(1)
+        model_limiter.release()
+    assert 4 < model_limiter.concurrency <= 8
+
+
+def test_requests_per_minute_is_enforced():
+    # Capacity 600 per minute = 10 per second, starting with a full bucket
+    limiter = RateLimiter(default=RateLimit(requests_per_minute=600))
+    bucket = limiter.limiter_for(WRITER).request_bucket
+    bucket.tokens = 0
+    executor = RateLimitedAgentExecutor(ThrottlingExecutor(), limiter)
+
+    start = time.perf_counter()
+    for _ in range(3):
+        executor.execute(WRITER, "x")
+    assert time.perf_counter() - start >= 0.25
+
+
+def test_limits_are_resolved_by_model_then_provider():
+    limiter = RateLimiter(
+        limits={
+            "fake": RateLimit(max_concurrency=2),
+            "fake/special": RateLimit(max_concurrency=3),
+        }
+    )
+    special = WRITER.model_copy(update={"model": "special"})
+    assert limiter.limiter_for(WRITER).limit.max_concurrency == 2
+    assert limiter.limiter_for(special).limit.max_concurrency == 3
+    assert limiter.limiter_for(WRITER) is limiter.limiter_for(WRITER)
+
+
+def test_async_execution_is_retried():
+    inner = ThrottlingExecutor([FakeAPIError(429)])
+    limiter = RateLimiter(retry_policy=FAST_RETRIES)
+    executor = RateLimitedAgentExecutor(inner, limiter)
+    assert asyncio.run(executor.aexecute(WRITER, "hi")) == "done: hi"
+    assert inner.calls == 2
+
+
+def test_orchestrator_survives_throttling_under_load():
+    """A burst of 429s no longer kills a parallel run."""
+    inner = ThrottlingExecutor([FakeAPIError(429)] * 4, delay=0.01)
+    limiter = RateLimiter(
+        default=RateLimit(max_concurrency=4), retry_policy=FAST_RETRIES
+    )
+    workflow = make_workflow([make_task(f"t{i}", f"{i}") for i in range(8)])
+    orchestrator = make_orchestrator(
+        workflow, inner, mode="parallel", max_workers=8, rate_limiter=limiter
+    )
+
+    final_context = orchestrator.run()
+
+    assert final_context["tasks"]["t7"]["output"] == "done: 7"
+    assert inner.peak <= 4
+    assert limiter.stats()["throttled"] == 4
+
+
+def test_cancelled_calls_release_their_slots():
+    """Timed-out hedged calls must not leak slots of a shared limiter."""
+    from orquestra.agents.hedging import AgentTimeoutError, Hedger
+
+    limiter = RateLimiter(default=RateLimit(max_concurrency=2))
+    slow = Agent(
+        name="slow", provider="fake", model="slow", timeout=0.05, params={"latency": 5}
+    )
+    workflow = make_workflow([make_task("t", "hi", agent="slow")], agents=[slow])
+    # Warm, so every call is hedged and both attempts are cancelled
+    hedger = Hedger(min_samples=1)
+    hedger.record(slow, 0.01)
+    for _ in range(3):
+        orchestrator = make_orchestrator(workflow, rate_limiter=limiter, hedger=hedger)
+        with pytest.raises(AgentTimeoutError):
+            asyncio.run(orchestrator.arun())
+    assert limiter.limiter_for(slow).in_flight == 0
+
+    # A cancel while waiting for quota, after the slot was taken, frees it too
+    model_limiter = ModelLimiter(RateLimit(requests_per_minute=1))
+    model_limiter.request_bucket.reserve(1)
+
+    async def cancel_while_waiting():
+        task = asyncio.ensure_future(model_limiter.aacquire(1))
+        await asyncio.sleep(0.01)
+        assert model_limiter.in_flight == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_waiting())
+    assert model_limiter.in_flight == 0
+
+
+def test_waiting_coroutines_are_woken_per_slot():
+    model_limiter = ModelLimiter(RateLimit(max_concurrency=2))
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        await model_limiter.aacquire(1)
+        peak = max(peak, model_limiter.in_flight)
+        await asyncio.sleep(0.001)
+        model_limiter.release()
+
+    async def main():
+        waiters = [asyncio.ensure_future(call()) for _ in range(200)]
+        await asyncio.sleep(0)
+        # Cancelled waiters drop out of the queue without stalling the rest
+        for waiter in waiters[10:20]:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+    asyncio.run(main())
+    assert peak == 2
+    assert model_limiter.in_flight == 0
+    assert not model_limiter._async_waiters
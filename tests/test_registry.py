@@ -0,0 +1,76 @@
+import subprocess
+import sys
+from importlib import metadata
+
+import pytest
+from conftest import RecordingExecutor, make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.fake import FakeAgentExecutor
+from orquestra.agents.registry import ENTRY_POINT_GROUP, ExecutorRegistry
+from orquestra.models import Agent
+
+
+def test_importing_core_does_not_import_provider_sdks():
+    """Provider SDKs are only imported once a workflow uses them."""
+    code = (
+        "import sys; import orquestra.core, orquestra.parsers; "
+        "print('openai' in sys.modules, 'anthropic' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["False", "False"]
+
+
+def test_builtin_providers_resolve_lazily():
+    registry = ExecutorRegistry(entry_points=False)
+    assert {"openai", "anthropic", "fake"} <= set(registry.providers())
+    assert registry.resolve("fake") is FakeAgentExecutor
+
+
+def test_providers_resolve_by_import_path():
+    """A provider name with a colon is imported directly."""
+    registry = ExecutorRegistry(entry_points=False)
+    path = "orquestra.agents.fake:FakeAgentExecutor"
+    assert registry.resolve(path) is FakeAgentExecutor
+
+    registry.register("simulated", path)
+    assert registry.resolve("simulated") is FakeAgentExecutor
+
+
+def test_providers_resolve_through_entry_points(mocker):
+    """Installed packages can contribute executors via entry points."""
+    entry_point = metadata.EntryPoint(
+        name="simulated",
+        value="orquestra.agents.fake:FakeAgentExecutor",
+        group=ENTRY_POINT_GROUP,
+    )
+    entry_points = mocker.patch(
+        "orquestra.agents.registry.metadata.entry_points", return_value=[entry_point]
+    )
+    registry = ExecutorRegistry()
+
+    assert registry.resolve("simulated") is FakeAgentExecutor
+    assert "simulated" in registry.providers()
+    entry_points.assert_called_once_with(group=ENTRY_POINT_GROUP)
+
+
+def test_invalid_providers_raise():
+    registry = ExecutorRegistry(entry_points=False)
+    with pytest.raises(ValueError, match="No executor found for provider: nope"):
+        registry.resolve("nope")
+    with pytest.raises(ValueError, match="Could not import"):
+        registry.resolve("orquestra.agents.fake:Missing")
+    with pytest.raises(ValueError, match="BaseAgentExecutor subclass"):
+        registry.resolve("orquestra.agents.registry:load_object")
+
+
+def test_orchestrator_uses_its_registry():
+    """A custom registry plugs a new provider into the orchestrator."""
+    registry = ExecutorRegistry({"echo": RecordingExecutor}, entry_points=False)
+    agent = Agent(name="echoer", provider="echo", model="any")
+    workflow = make_workflow([make_task("greet", "hi", agent="echoer")], agents=[agent])
+    orchestrator = make_orchestrator(workflow, executor_registry=registry)
+
+    context = orchestrator.run()
+    assert context["tasks"]["greet"]["output"] == "<hi>"
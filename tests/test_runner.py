@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+from conftest import WRITER, RecordingExecutor, make_task, make_workflow
+
+from orquestra.agents.registry import ExecutorRegistry
+from orquestra.core import FairShareLimiter, WorkflowRunner
+
+
+class CountingExecutor(RecordingExecutor):
+    """The shared recording executor, counting how many the registry makes."""
+
+    instances = 0
+
+    def __init__(self):
+        super().__init__(delay=0.01, fail_on=["fail"])
+        CountingExecutor.instances += 1
+
+
+def _workflow(i, instruction="hello"):
+    agent = WRITER.model_copy(update={"provider": "counting"})
+    return make_workflow(
+        [make_task(f"t{j}", instruction) for j in range(4)],
+        agents=[agent],
+        name=f"Document {i}",
+    )
+
+
+def _runner(**kwargs):
+    CountingExecutor.instances = 0
+    registry = ExecutorRegistry({"counting": CountingExecutor}, entry_points=False)
+    return WorkflowRunner(executor_registry=registry, **kwargs)
+
+
+def test_runs_share_one_executor_and_a_global_limit():
+    """Every run reuses one executor, and calls never exceed the shared cap."""
+    runner = _runner(max_concurrency=3, max_in_flight=5)
+    results = runner.run_all(_workflow(i) for i in range(10))
+
+    assert [r.index for r in results] == list(range(10))
+    assert all(r.error is None for r in results)
+    assert results[3].context["tasks"]["t0"]["output"] == "<hello>"
+
+    executor = runner.executor_instances["counting"]
+    assert CountingExecutor.instances == 1
+    assert len(executor.calls) == 40
+    assert executor.peak <= 3
+
+
+def test_provider_limits_are_shared_across_runs():
+    runner = _runner(max_concurrency=8, provider_limits={"counting": 2})
+    runner.run_all(_workflow(i) for i in range(6))
+    assert runner.executor_instances["counting"].peak <= 2
+
+
+def test_workflows_are_consumed_lazily():
+    """Only a bounded window of workflows is pulled from the input at once."""
+    pulled = []
+
+    def workflows():
+        for i in range(20):
+            pulled.append(i)
+            yield _workflow(i)
+
+    runner = _runner(max_in_flight=2)
+    results = runner.run_iter(workflows())
+    next(results)
+    assert len(pulled) <= 3
+
+    assert len(list(results)) == 19
+
+
+def test_failed_runs_are_reported_not_raised():
+    runner = _runner()
+    results = runner.run_all([_workflow(0), _workflow(1, "fail"), _workflow(2)])
+
+    assert [r.error is None for r in results] == [True, False, True]
+    assert "provider crashed" in str(results[1].error)
+    assert results[1].context is None
+
+
+def test_fair_share_limiter_serves_runs_round_robin():
+    """Freed slots alternate between runs instead of draining one run first."""
+    limiter = FairShareLimiter(1)
+    limiter.acquire("holder")
+    order = []
+
+    def wait_for_slot(run_id):
+        limiter.acquire(run_id)
+        order.append(run_id)
+        limiter.release()
+
+    threads = []
+    for run_id in ["a", "a", "a", "b"]:
+        thread = threading.Thread(target=wait_for_slot, args=(run_id,))
+        thread.start()
+        threads.append(thread)
+        # Wait until the call has queued so the queue order is known
+        while sum(len(q) for q in limiter._waiting.values()) < len(threads):
+            time.sleep(0.001)
+
+    limiter.release()
+    for thread in threads:
+        thread.join()
+
+    assert order == ["a", "b", "a", "a"]
+    assert limiter.in_use == 0
+
+
+def test_fair_share_limiter_rejects_zero_capacity():
+    with pytest.raises(ValueError):
+        FairShareLimiter(0)
@@ -1,6 +1,6 @@
 import pytest
 
-from orquestra.core import resolve_task_order
+from orquestra.core import DataflowScheduler, TaskGraph, resolve_task_order
 from orquestra.models import Task
 
 
@@ -60,3 +60,128 @@ def test_missing_dependency_raises_error():
     task_a = T("A", deps=["B"])
     with pytest.raises(ValueError, match="depends on non-existent task 'B'"):
         resolve_task_order([task_a])
+
+
+def test_dataflow_scheduler_releases_tasks_per_dependency():
+    """A -> C and B -> D: finishing A releases C without waiting for B."""
+    scheduler = DataflowScheduler([T("A"), T("B"), T("C", ["A"]), T("D", ["B"])])
+    assert [t.name for t in scheduler.get_ready()] == ["A", "B"]
+    assert scheduler.get_ready() == []
+
+    assert scheduler.mark_complete("A") == ["C"]
+    assert [t.name for t in scheduler.get_ready()] == ["C"]
+    assert scheduler.running == {"B", "C"}
+
+    scheduler.mark_complete("C")
+    assert not scheduler.is_finished()
+    assert scheduler.mark_complete("B") == ["D"]
+    assert [t.name for t in scheduler.get_ready()] == ["D"]
+    scheduler.mark_complete("D")
+    assert scheduler.is_finished()
+
+
+def test_dataflow_scheduler_waits_for_all_dependencies():
+    """Tests A, B -> C: C is only released once both A and B complete."""
+    scheduler = DataflowScheduler([T("A"), T("B"), T("C", ["A", "B"])])
+    scheduler.get_ready()
+    assert scheduler.mark_complete("B") == []
+    assert scheduler.mark_complete("A") == ["C"]
+
+
+def test_dataflow_scheduler_rejects_invalid_graphs():
+    with pytest.raises(ValueError, match="Circular dependency detected"):
+        DataflowScheduler([T("A", ["B"]), T("B", ["A"])])
+    with pytest.raises(ValueError, match="depends on non-existent task 'B'"):
+        DataflowScheduler([T("A", ["B"])])
+
+
+def test_dataflow_scheduler_rejects_unknown_completion():
+    scheduler = DataflowScheduler([T("A")])
+    with pytest.raises(ValueError, match="is not running"):
+        scheduler.mark_complete("A")
+
+
+def test_circular_dependency_reports_cycle_members():
+    """Tests X -> A -> B -> C -> A: the message names A, B and C only."""
+    tasks = [T("X"), T("A", ["X", "C"]), T("B", ["A"]), T("C", ["B"]), T("D", ["C"])]
+    with pytest.raises(ValueError) as excinfo:
+        resolve_task_order(tasks)
+    message = str(excinfo.value)
+    assert "A -> B -> C -> A" in message or "B -> C -> A -> B" in message
+    assert "X" not in message and "D" not in message
+
+
+def test_self_dependency_is_a_cycle():
+    with pytest.raises(ValueError, match="A -> A"):
+        resolve_task_order([T("A", ["A"])])
+
+
+def test_duplicate_task_names_raise_error():
+    with pytest.raises(ValueError, match="Duplicate task name 'A'"):
+        resolve_task_order([T("A"), T("A")])
+
+
+def test_task_graph_levels_and_batches():
+    graph = TaskGraph([T("D", ["B", "C"]), T("C", ["A"]), T("B", ["A"]), T("A")])
+    assert [t.name for t in graph.tasks] == ["A", "B", "C", "D"]
+    assert graph.levels() == [0, 1, 1, 2]
+    assert graph.successors[graph.index["A"]] == [1, 2]
+    assert [[t.name for t in batch] for batch in graph.batches()] == [
+        ["A"],
+        ["B", "C"],
+        ["D"],
+    ]
+
+
+def test_large_deep_and_wide_graphs():
+    """A 20k-deep chain plus 20k independent tasks plan without recursion."""
+    chain = [T("c00000")] + [T(f"c{i:05d}", [f"c{i - 1:05d}"]) for i in range(1, 20000)]
+    wide = [T(f"w{i:05d}") for i in range(20000)]
+    plan = resolve_task_order(chain + wide)
+    assert len(plan) == 20000
+    assert len(plan[0]) == 20001
+    assert plan[0][0].name == "c00000" and plan[0][1].name == "w00000"
+
+
+def test_critical_path():
+    """The critical path follows the longest chain, or the slowest one."""
+    tasks = [
+        Task(name="a", agent="x", instruction="..."),
+        Task(name="b", agent="x", instruction="...", depends_on=["a"]),
+        Task(name="c", agent="x", instruction="...", depends_on=["b"]),
+        Task(name="d", agent="x", instruction="..."),
+        Task(name="e", agent="x", instruction="...", depends_on=["d"]),
+    ]
+    graph = TaskGraph(tasks)
+
+    assert [t.name for t in graph.critical_path()] == ["a", "b", "c"]
+    durations = {"a": 1, "b": 1, "c": 1, "d": 5, "e": 1}
+    assert [t.name for t in graph.critical_path(durations)] == ["d", "e"]
+    assert TaskGraph([]).critical_path() == []
+
+
+def test_upward_ranks_and_makespan():
+    """Ranks measure the remaining path; long chains first shortens makespan."""
+    # One chain of three tasks and three independent tasks
+    tasks = [T("z1"), T("z2", ["z1"]), T("z3", ["z2"]), T("a"), T("b"), T("c")]
+    graph = TaskGraph(tasks)
+
+    ranks = dict(zip((t.name for t in graph.tasks), graph.upward_ranks()))
+    assert ranks == {"a": 1, "b": 1, "c": 1, "z1": 3, "z2": 2, "z3": 1}
+
+    assert graph.estimate_makespan() == 3
+    # With two workers the chain runs alongside the independent tasks
+    assert graph.estimate_makespan(max_workers=2) == 3
+    assert graph.estimate_makespan(max_workers=1) == 6
+    assert graph.estimate_makespan({"z1": 4}, max_workers=2) == 4
+    assert TaskGraph([]).estimate_makespan() == 0
+
+
+def test_dataflow_scheduler_hands_out_by_priority():
+    tasks = [T("z1"), T("z2", ["z1"]), T("a"), T("b")]
+    graph = TaskGraph(tasks)
+    priorities = dict(zip((t.name for t in graph.tasks), graph.upward_ranks()))
+    scheduler = DataflowScheduler(graph, priorities)
+
+    # The chain's head first, then ties in name order
+    assert [t.name for t in scheduler.get_ready()] == ["z1", "a", "b"]
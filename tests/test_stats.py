@@ -0,0 +1,83 @@
+from conftest import (
+    WRITER,
+    RecordingExecutor,
+    make_orchestrator,
+    make_task,
+    make_workflow,
+)
+
+from orquestra.core import LatencyStats
+
+
+def _workflow():
+    return make_workflow(
+        [
+            make_task("a_quick"),
+            make_task("b_quick"),
+            make_task("x_research"),
+            make_task("y_draft", depends_on=["x_research"]),
+        ],
+        name="Ranked Workflow",
+    )
+
+
+def test_stats_are_smoothed_and_persisted(tmp_path):
+    path = tmp_path / "stats.json"
+    workflow = _workflow()
+    agent, task = workflow.agents[0], workflow.tasks[0]
+
+    stats = LatencyStats(path, smoothing=0.5)
+    assert stats.estimate("Ranked Workflow", task, agent) == stats.default_latency
+    stats.record("Ranked Workflow", task, agent, 2.0, "four")
+    stats.record("Ranked Workflow", task, agent, 4.0, ["x"])
+    stats.save()
+
+    reloaded = LatencyStats(path)
+    history = reloaded.get("Ranked Workflow", task, agent)
+    assert (history.latency, history.output_size, history.count) == (3.0, 4.5, 2)
+    # Other tasks on the same model fall back to the model's history
+    other = workflow.tasks[1]
+    assert reloaded.estimate("Ranked Workflow", other, agent) == 3.0
+
+
+def test_long_chains_start_first_with_limited_workers(tmp_path):
+    stats = LatencyStats(tmp_path / "stats.json")
+    executor = RecordingExecutor(delay=0.01)
+    orchestrator = make_orchestrator(
+        _workflow(), executor, mode="dataflow", max_workers=1, latency_stats=stats
+    )
+
+    orchestrator.run()
+
+    # Without ranking, name order would start `a_quick` first
+    assert executor.calls[0] == "x_research"
+    assert (
+        LatencyStats(tmp_path / "stats.json")
+        .get("Ranked Workflow", _workflow().tasks[3], _workflow().agents[0])
+        .count
+        == 1
+    )
+
+
+def test_queueing_is_not_recorded_as_latency():
+    # The fake provider answers every call in a fixed 0.05s
+    agent = WRITER.model_copy(update={"params": {"latency": 0.05}})
+    workflow = make_workflow(
+        [make_task(f"t{i}") for i in range(5)], agents=[agent], name="Queued Workflow"
+    )
+    for mode, options in [
+        ("parallel", {}),
+        ("dataflow", {}),
+        ("dataflow", {"provider_limits": {"fake": 1}, "max_workers": 5}),
+    ]:
+        stats = LatencyStats()
+        orchestrator = make_orchestrator(
+            workflow,
+            mode=mode,
+            **{"max_workers": 1, **options},
+            latency_stats=stats,
+        )
+        orchestrator.run()
+
+        latencies = [stats.tasks[f"Queued Workflow/t{i}"].latency for i in range(5)]
+        assert max(latencies) < 0.09, (mode, options, latencies)
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+from conftest import RecordingExecutor, make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.base import BaseAgentExecutor
+from orquestra.models import Agent
+
+
+class WordStreamingExecutor(BaseAgentExecutor):
+    """A fake executor that streams its instruction word by word."""
+
+    def execute(self, agent, instruction):
+        return instruction.upper()
+
+    def stream(self, agent, instruction):
+        time.sleep(0.02)
+        for word in instruction.upper().split(" "):
+            yield word + " "
+
+    async def astream(self, agent, instruction):
+        await asyncio.sleep(0.02)
+        for word in instruction.upper().split(" "):
+            yield word + " "
+
+
+def _workflow():
+    return make_workflow(
+        [
+            make_task("draft", "one two three"),
+            make_task("edit", "edit {{ tasks.draft.output }}", depends_on=["draft"]),
+        ],
+        name="Streaming Workflow",
+    )
+
+
+def test_run_forwards_chunks_and_records_metrics():
+    received = []
+    orchestrator = make_orchestrator(
+        _workflow(),
+        WordStreamingExecutor(),
+        on_chunk=lambda name, chunk: received.append((name, chunk)),
+    )
+    final_context = orchestrator.run()
+
+    assert received[:3] == [("draft", "ONE "), ("draft", "TWO "), ("draft", "THREE ")]
+    assert final_context["tasks"]["draft"]["output"] == "ONE TWO THREE "
+    assert final_context["tasks"]["edit"]["output"] == "EDIT ONE TWO THREE  "
+
+    metrics = orchestrator.task_metrics["draft"]
+    assert metrics["chunks"] == 3
+    assert metrics["time_to_first_token"] >= 0.02
+    assert metrics["duration"] >= metrics["time_to_first_token"]
+    assert metrics["tokens_per_second"] > 0
+
+
+def test_arun_streams_through_astream():
+    received = []
+    orchestrator = make_orchestrator(
+        _workflow(),
+        WordStreamingExecutor(),
+        on_chunk=lambda name, chunk: received.append(name),
+    )
+    final_context = asyncio.run(orchestrator.arun())
+
+    assert received == ["draft"] * 3 + ["edit"] * 5
+    assert final_context["tasks"]["draft"]["output"] == "ONE TWO THREE "
+    assert orchestrator.task_metrics["edit"]["chunks"] == 5
+
+
+def test_executors_without_streaming_yield_one_chunk():
+    received = []
+    orchestrator = make_orchestrator(
+        _workflow(),
+        RecordingExecutor(),
+        mode="dataflow",
+        on_chunk=lambda name, chunk: received.append((name, chunk)),
+    )
+    orchestrator.run()
+
+    assert received == [
+        ("draft", "<one two three>"),
+        ("edit", "<edit <one two three>>"),
+    ]
+    assert orchestrator.task_metrics["draft"]["chunks"] == 1
+
+
+def test_openai_stream_uses_stream_flag(mocker):
+    mock_openai_class = mocker.patch("orquestra.agents.openai.OpenAI")
+    deltas = ["Hel", "lo", None]
+    chunks = []
+    for delta in deltas:
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = delta
+        chunks.append(chunk)
+    mock_create = MagicMock(return_value=iter(chunks))
+    mock_openai_class.return_value.chat.completions.create = mock_create
+
+    from orquestra.agents.openai import OpenAIAgentExecutor
+
+    agent = Agent(name="writer", provider="openai", model="gpt-5")
+    output = list(OpenAIAgentExecutor().stream(agent, "Say hello"))
+
+    assert output == ["Hel", "lo"]
+    mock_create.assert_called_once_with(
+        model="gpt-5",
+        messages=[{"role": "user", "content": "Say hello"}],
+        stream=True,
+    )
+
+
+def test_anthropic_stream_uses_messages_stream(mocker):
+    mock_anthropic_class = mocker.patch("orquestra.agents.anthropic.Anthropic")
+    mock_stream = MagicMock()
+    mock_stream.__enter__.return_value.text_stream = iter(["Hi", " there"])
+    mock_anthropic_class.return_value.messages.stream.return_value = mock_stream
+
+    from orquestra.agents.anthropic import AnthropicAgentExecutor
+
+    agent = Agent(name="editor", provider="anthropic", model="claude")
+    output = list(AnthropicAgentExecutor().stream(agent, "Greet me"))
+
+    assert output == ["Hi", " there"]
+    mock_anthropic_class.return_value.messages.stream.assert_called_once_with(
+        model="claude",
+        max_tokens=1024,
+        messages=[{"role": "user", "content": "Greet me"}],
+    )
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from conftest import RecordingExecutor, make_orchestrator, make_task, make_workflow
+
+
+def _workflow(outputs=None):
+    return make_workflow(
+        [
+            make_task("research", "Research."),
+            make_task("outline", "Outline."),
+            # Reads `research` without declaring it
+            make_task(
+                "draft", "Draft {{ tasks.research.output }}", depends_on=["outline"]
+            ),
+            make_task("edit", "Edit {{ tasks.draft.output }}", depends_on=["draft"]),
+            make_task("title", "Title."),
+        ],
+        outputs=outputs,
+    )
+
+
+@pytest.mark.parametrize("mode", ["sequential", "parallel", "dataflow"])
+def test_targets_run_only_the_tasks_they_need(mode):
+    executor = RecordingExecutor()
+    orchestrator = make_orchestrator(_workflow(), executor, mode=mode)
+    context = orchestrator.run(targets=["draft"])
+
+    # `research` is kept, and runs first, because the template reads it
+    assert set(context["tasks"]) == {"research", "outline", "draft"}
+    assert context["tasks"]["draft"]["output"] == "<Draft <Research.>>"
+    assert "Title." not in executor.calls
+
+
+def test_known_outputs_replace_upstream_tasks():
+    executor = RecordingExecutor()
+    orchestrator = make_orchestrator(_workflow(), executor, mode="dataflow")
+    context = orchestrator.run(
+        targets=["edit"],
+        known_outputs={"draft": "an old draft", "research": "unused", "edit": "x"},
+    )
+
+    # Only the target runs; known outputs are not re-run, targets always are
+    assert executor.calls == ["Edit an old draft"]
+    assert context["tasks"]["edit"]["output"] == "<Edit an old draft>"
+
+
+def test_targets_outside_the_declared_outputs_are_kept():
+    orchestrator = make_orchestrator(
+        _workflow(outputs=["edit"]), RecordingExecutor(), mode="dataflow"
+    )
+    context = asyncio.run(orchestrator.arun(targets=["draft"]))
+    assert context["tasks"]["draft"]["output"] == "<Draft <Research.>>"
+
+
+def test_unknown_targets_are_rejected():
+    orchestrator = make_orchestrator(_workflow(), RecordingExecutor())
+    with pytest.raises(ValueError, match="Task 'missing' is not in the workflow."):
+        orchestrator.run(targets=["missing"])
+
+
+def test_dynamic_reads_depend_only_on_upstream_tasks():
+    workflow = make_workflow(
+        [
+            make_task("a", "A."),
+            make_task("b", "B."),
+            make_task(
+                "summary",
+                "{% for n in ['a'] %}{{ tasks[n].output }}{% endfor %}",
+                depends_on=["a"],
+            ),
+            make_task("via_get", "{{ tasks.get('b').output }}", depends_on=["b"]),
+            make_task(
+                "post", "Post {{ tasks.summary.output }}", depends_on=["summary"]
+            ),
+        ]
+    )
+
+    # A downstream consumer is not mistaken for a dependency
+    orchestrator = make_orchestrator(workflow, RecordingExecutor(), mode="dataflow")
+    context = orchestrator.run(targets=["summary"])
+    assert set(context["tasks"]) == {"a", "summary"}
+    assert context["tasks"]["summary"]["output"] == "<<A.>>"
+
+    # `tasks.get('b')` keeps `b`, instead of looking for a task named "get"
+    orchestrator = make_orchestrator(workflow, RecordingExecutor(), mode="dataflow")
+    context = orchestrator.run(targets=["via_get"])
+    assert context["tasks"]["via_get"]["output"] == "<<B.>>"
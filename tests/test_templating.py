@@ -1,7 +1,8 @@
 import pytest
 from jinja2.exceptions import UndefinedError
 
-from orquestra.core import render_template
+from orquestra.core import clear_template_cache, render_template, template_cache_info
+from orquestra.core.templating import find_task_references
 
 
 def test_simple_rendering():
@@ -42,3 +43,39 @@ def test_missing_variable_raises_error():
     context = {"wrong_key": "Orquestra"}
     with pytest.raises(UndefinedError, match="'name' is undefined"):
         render_template(template, context)
+
+
+def test_compiled_templates_are_cached():
+    """Rendering the same source twice compiles it only once."""
+    clear_template_cache()
+    template = "Summarise: {{ text }}"
+
+    assert render_template(template, {"text": "one"}) == "Summarise: one"
+    assert render_template(template, {"text": "two"}) == "Summarise: two"
+    assert render_template("Other {{ text }}", {"text": "x"}) == "Other x"
+
+    info = template_cache_info()
+    assert info["misses"] == 2
+    assert info["hits"] == 1
+    assert info["size"] == 2
+
+    clear_template_cache()
+    assert template_cache_info()["size"] == 0
+
+
+def test_find_task_references():
+    """Static analysis finds which upstream outputs a template reads."""
+    template = "{{ tasks.draft.output }} {{ tasks['notes'].output | upper }} {{ x }}"
+    assert find_task_references(template) == {"draft", "notes"}
+    assert find_task_references("tasks.split.output", expression=True) == {"split"}
+    assert find_task_references("No references.") == frozenset()
+
+    # Dynamic lookups cannot be resolved
+    assert find_task_references("{{ tasks[name].output }}") is None
+    assert find_task_references("{% for t in tasks %}{{ t }}{% endfor %}") is None
+    # Dict methods and calls on `tasks` are not task names
+    assert find_task_references("{{ tasks.get('a').output }}") is None
+    assert find_task_references("{{ tasks.items() }}") is None
+    assert find_task_references("{{ tasks.keys }}") is None
+    # Calls on a task's output are fine
+    assert find_task_references("{{ tasks.a.output.strip() }}") == {"a"}
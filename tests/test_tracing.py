@@ -0,0 +1,172 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from conftest import WRITER, make_orchestrator, make_task, make_workflow
+
+from orquestra.agents.base import BaseAgentExecutor
+from orquestra.agents.cache import CachingAgentExecutor, MemoryResponseCache
+from orquestra.core import CheckpointStore, Orchestrator
+from orquestra.tracing import (
+    ChromeTraceExporter,
+    InMemoryExporter,
+    JsonLinesExporter,
+    Tracer,
+    annotate,
+)
+
+
+class UsageReportingExecutor(BaseAgentExecutor):
+    """A fake executor that annotates token usage like the real ones do."""
+
+    def execute(self, agent, instruction):
+        annotate(input_tokens=len(instruction.split()), output_tokens=2)
+        return instruction.upper()
+
+
+def _workflow():
+    return make_workflow(
+        [
+            make_task("draft", "one two"),
+            make_task("edit", "edit {{ tasks.draft.output }}", depends_on=["draft"]),
+        ],
+        name="Traced Workflow",
+    )
+
+
+def _orchestrator(mode="parallel", **kwargs):
+    exporter = InMemoryExporter()
+    orchestrator = make_orchestrator(
+        _workflow(),
+        UsageReportingExecutor(),
+        mode=mode,
+        tracer=Tracer([exporter]),
+        **kwargs,
+    )
+    return orchestrator, exporter
+
+
+def test_spans_form_a_tree_in_every_mode():
+    """Every task has a span under the workflow, with render and call children."""
+    for mode in ("sequential", "parallel", "dataflow"):
+        orchestrator, exporter = _orchestrator(mode)
+        orchestrator.run()
+
+        (workflow,) = exporter.find(kind="workflow")
+        assert workflow.name == "Traced Workflow"
+        by_id = {span.span_id: span for span in exporter.spans}
+        for name in ("draft", "edit"):
+            (task,) = exporter.find(kind="task", name=name)
+            assert task.trace_id == workflow.span_id
+            assert task.attributes["provider"] == "fake"
+            assert task.end >= task.start
+
+            children = [s for s in exporter.spans if s.parent_id == task.span_id]
+            assert {s.kind for s in children} == {"render", "call"}
+
+            # Batch spans sit between the workflow and tasks in batch modes
+            parent = by_id[task.parent_id]
+            expected = "workflow" if mode == "dataflow" else "batch"
+            assert parent.kind == expected
+
+
+def test_executors_annotate_the_call_span():
+    """Token usage reported by an executor lands on its call span."""
+    orchestrator, exporter = _orchestrator()
+    orchestrator.run()
+
+    (call,) = exporter.find(kind="call", name="edit")
+    assert call.attributes["input_tokens"] == 3
+    assert call.attributes["output_tokens"] == 2
+
+
+def test_cache_hits_are_annotated():
+    """The response cache marks each call as a hit or a miss."""
+    cache = MemoryResponseCache()
+    exporter = InMemoryExporter()
+    tracer = Tracer([exporter])
+    executor = CachingAgentExecutor(UsageReportingExecutor(), cache)
+
+    for _ in range(2):
+        with tracer.span("call", "call"):
+            executor.execute(WRITER, "hello")
+
+    assert [s.attributes["cache_hit"] for s in exporter.spans] == [False, True]
+
+
+def test_restored_tasks_are_traced(tmp_path):
+    """Tasks restored from a checkpoint get a zero-work span flagged as such."""
+    store = CheckpointStore(tmp_path / "checkpoints.db")
+    first, _ = _orchestrator(checkpoint=store)
+    first.run()
+
+    second, exporter = _orchestrator(checkpoint=store, resume=True)
+    second.run()
+
+    tasks = exporter.find(kind="task")
+    assert {t.name for t in tasks} == {"draft", "edit"}
+    assert all(t.attributes["restored"] for t in tasks)
+    assert not exporter.find(kind="call")
+
+
+def test_failed_tasks_record_the_error():
+    """A failing task's span is still ended, with the error attached."""
+    orchestrator, exporter = _orchestrator()
+    failing = MagicMock(spec=BaseAgentExecutor)
+    failing.execute.side_effect = RuntimeError("boom")
+    orchestrator.executor_instances["fake"] = failing
+
+    try:
+        orchestrator.run()
+    except RuntimeError:
+        pass
+
+    (task,) = exporter.find(kind="task", name="draft")
+    assert "boom" in task.attributes["error"]
+    assert "error" in exporter.find(kind="workflow")[0].attributes
+
+
+def test_arun_is_traced():
+    """The asyncio path produces the same task and call spans."""
+    orchestrator, exporter = _orchestrator("dataflow")
+    asyncio.run(orchestrator.arun())
+
+    assert {s.name for s in exporter.find(kind="task")} == {"draft", "edit"}
+    (call,) = exporter.find(kind="call", name="draft")
+    assert call.attributes["output_tokens"] == 2
+
+
+def test_default_tracer_prints_progress(capsys):
+    """Without a tracer, the orchestrator prints progress as before."""
+    orchestrator = Orchestrator(_workflow())
+    orchestrator.executor_instances["fake"] = UsageReportingExecutor()
+    orchestrator.run()
+
+    out = capsys.readouterr().out
+    assert "Executing workflow: 'Traced Workflow'" in out
+    assert "--> Running Batch 2..." in out
+    assert "    - Executing task 'edit'..." in out
+    assert "Workflow execution finished." in out
+
+
+def test_file_exporters(tmp_path):
+    """Spans can be written as JSON lines and as a Chrome trace."""
+    jsonl = JsonLinesExporter(tmp_path / "spans.jsonl")
+    chrome = ChromeTraceExporter(tmp_path / "trace.json")
+    tracer = Tracer([jsonl, chrome])
+    make_orchestrator(_workflow(), UsageReportingExecutor(), tracer=tracer).run()
+    tracer.shutdown()
+
+    lines = (tmp_path / "spans.jsonl").read_text().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert {r["kind"] for r in records} >= {"workflow", "batch", "task", "call"}
+
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    events = trace["traceEvents"]
+    assert len(events) == len(records)
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+
+
+def test_annotate_without_a_span_is_a_no_op():
+    annotate(anything=SimpleNamespace())